@@ -0,0 +1,215 @@
+"""Time the AppData read and write paths and the CSV and Markdown exports on
+a large synthetic data file (see benchmarks.datagen).
+
+    python -m benchmarks.bench_app_data [--years N] [--sessions-per-day N]
+        [--repeat N] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from benchmarks.datagen import END_DATE, DataSpec, write_data_file
+from pomodorable.app_data import AppData
+from pomodorable.output_csv import write_to_sessions_csv, write_to_timesheet_csv
+from pomodorable.output_md import rows_as_md, write_to_daily_md
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+#  Days of sections in the large Markdown file.
+MD_DAYS = 500
+
+
+def summarize(name: str, seconds: list[float]) -> dict:
+    msec = [s * 1000 for s in seconds]
+    return {
+        "name": name,
+        "count": len(msec),
+        "mean_ms": round(statistics.fmean(msec), 3),
+        "stdev_ms": round(statistics.stdev(msec), 3) if len(msec) > 1 else 0.0,
+        "min_ms": round(min(msec), 3),
+        "p50_ms": round(statistics.median(msec), 3),
+        "max_ms": round(max(msec), 3),
+    }
+
+
+def time_calls(func: Callable[[int], object], repeat: int) -> list[float]:
+    """Call func(n) for n in range(repeat), with output discarded. Return the
+    time of each call.
+    """
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for n in range(repeat):
+            t0 = time.perf_counter()
+            func(n)
+            times.append(time.perf_counter() - t0)
+    return times
+
+
+def large_md_file(md_file: Path, app_data: AppData, last_day: datetime) -> None:
+    """Write a Markdown file with a section for each of MD_DAYS days."""
+    lines = []
+    for days_back in range(MD_DAYS, 0, -1):
+        day = last_day - timedelta(days=days_back)
+        rows = app_data.get_session_rows_for_date(day)
+        if rows:
+            lines.extend(["", f"# Pomodori {day.strftime('%Y-%m-%d')}", "", *rows_as_md("", rows)])
+    md_file.write_text("\n".join(lines) + "\n")
+
+
+def run(spec: DataSpec, repeat: int) -> dict:
+    last_day = datetime(END_DATE.year, END_DATE.month, END_DATE.day)
+    mid_day = last_day - timedelta(days=round(spec.years * 365) // 2)
+    #  The middle day may be on a weekend, with no sessions.
+    while mid_day.weekday() >= 5:  # noqa: PLR2004
+        mid_day -= timedelta(days=1)
+    month_start = last_day - timedelta(days=30)
+    year_start = last_day - timedelta(days=364)
+    week_start = last_day - timedelta(days=6)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "data"
+        data_dir.mkdir()
+        data_file = write_data_file(data_dir, spec)
+        data = {
+            "spec": spec.as_dict(),
+            "data_rows": len(data_file.read_bytes().splitlines()) - 1,
+            "data_bytes": data_file.stat().st_size,
+        }
+        out_dir = Path(tmp) / "out"
+        out_dir.mkdir()
+
+        def new_out(n: int) -> Path:
+            #  Exports do not overwrite files, so each call gets a new folder.
+            path = out_dir / f"{len(list(out_dir.iterdir()))}-{n}"
+            path.mkdir()
+            return path
+
+        results = []
+        t0 = time.perf_counter()
+        app_data = AppData(init_data_path=data_dir, init_logging=False)
+        results.append(summarize("AppData startup (first)", [time.perf_counter() - t0]))
+
+        operations: list[tuple[str, Callable[[int], object]]] = [
+            ("AppData startup", lambda _: AppData(init_data_path=data_dir, init_logging=False)),
+            ("get_latest_session_rows", lambda _: app_data.get_latest_session_rows()),
+            ("get_session_rows_for_date (latest)", lambda _: app_data.get_session_rows_for_date(last_day)),
+            ("get_session_rows_for_date (middle)", lambda _: app_data.get_session_rows_for_date(mid_day)),
+            ("cli_export_daily_csv", lambda n: app_data.cli_export_daily_csv(last_day, False, "", new_out(n))),
+            (
+                "cli_export_daily_csv (timesheet)",
+                lambda n: app_data.cli_export_daily_csv(last_day, True, "", new_out(n)),
+            ),
+            (
+                "cli_export_date_range_csv (month)",
+                lambda n: app_data.cli_export_date_range_csv(month_start, last_day, False, "", new_out(n)),
+            ),
+            (
+                "cli_export_date_range_csv (year)",
+                lambda n: app_data.cli_export_date_range_csv(year_start, last_day, False, "PR", new_out(n)),
+            ),
+            (
+                "cli_export_date_range_csv (year, timesheet)",
+                lambda n: app_data.cli_export_date_range_csv(year_start, last_day, True, "", new_out(n)),
+            ),
+            ("cli_export_daily_markdown", lambda n: app_data.cli_export_daily_markdown(last_day, "", new_out(n))),
+            (
+                "cli_export_date_range_markdown (week)",
+                lambda n: app_data.cli_export_date_range_markdown(week_start, last_day, "", new_out(n)),
+            ),
+        ]
+        for name, func in operations:
+            results.append(summarize(name, time_calls(func, repeat)))
+
+        md_file = Path(tmp) / "large.md"
+        large_md_file(md_file, app_data, last_day)
+        last_rows = app_data.get_session_rows_for_date(last_day)
+        results.append(
+            summarize(
+                f"write_to_daily_md ({MD_DAYS} day file)",
+                time_calls(lambda _: write_to_daily_md(md_file, "", "", False, False, last_rows), repeat),
+            )
+        )
+        #  The exporters on rows already read, without the reading.
+        year_rows = list(app_data.iter_rows_for_dates(year_start, last_day))
+        results.append(
+            summarize(
+                "write_to_sessions_csv (year)",
+                time_calls(lambda n: write_to_sessions_csv(new_out(n) / "s.csv", "", year_rows, 1), repeat),
+            )
+        )
+        results.append(
+            summarize(
+                "write_to_timesheet_csv (year)",
+                time_calls(lambda n: write_to_timesheet_csv(new_out(n) / "t.csv", year_rows), repeat),
+            )
+        )
+        results.append(summarize("rows_as_md (year)", time_calls(lambda _: rows_as_md("", year_rows), repeat)))
+
+        #  A session written with all outputs configured, as when a session
+        #  is finished in the application. The first session resolves the
+        #  output folders and creates the output files, so it is not timed.
+        writer = AppData(init_data_path=data_dir, init_logging=False)
+        for set_dir in (writer.set_daily_csv_dir, writer.set_running_csv_dir, writer.set_daily_md_dir):
+            set_dir(str(out_dir))
+        session_start = last_day + timedelta(days=1, hours=8)
+
+        def write_session(n: int) -> None:
+            start_time = session_start + timedelta(minutes=30 * n)
+            writer.write_start(start_time, f"Benchmark session {n}", 1500)
+            writer.write_pause(start_time, start_time + timedelta(minutes=5), "Benchmark", 60, False)
+            writer.write_finish(start_time + timedelta(minutes=26), start_time)
+
+        write_session(0)
+        results.append(
+            summarize("write session (start, pause, finish)", time_calls(lambda n: write_session(n + 1), repeat))
+        )
+
+        data["md_bytes"] = md_file.stat().st_size
+    return {"data": data, "results": results}
+
+
+def add_spec_args(parser: argparse.ArgumentParser) -> None:
+    defaults = DataSpec()
+    parser.add_argument("--years", type=float, default=defaults.years, help="Years of history in the data file.")
+    parser.add_argument("--sessions-per-day", type=int, default=defaults.sessions_per_day)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=5, help="Number of times each operation is timed.")
+
+
+def spec_from_args(args: argparse.Namespace) -> DataSpec:
+    return DataSpec(years=args.years, sessions_per_day=args.sessions_per_day, seed=args.seed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AppData read and export benchmark")
+    add_spec_args(parser)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    result = run(spec_from_args(args), args.repeat)
+    if args.json:
+        sys.stdout.write(json.dumps(result, indent=2) + "\n")
+        return
+    data = result["data"]
+    sys.stdout.write(f"Data file: {data['data_rows']:,} rows, {data['data_bytes']:,} bytes\n\n")
+    for r in result["results"]:
+        sys.stdout.write(
+            f"{r['name']:<44} n={r['count']:<3} mean={r['mean_ms']:>9.2f}ms  p50={r['p50_ms']:>9.2f}ms  "
+            f"min={r['min_ms']:>9.2f}ms  max={r['max_ms']:>9.2f}ms\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
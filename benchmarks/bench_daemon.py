@@ -0,0 +1,117 @@
+"""Round-trip latency of commands sent to the timer daemon.
+
+The daemon runs in a separate process with a temporary data folder, and
+commands are sent over one client connection, as the attached user interface
+does.
+
+    python -m benchmarks.bench_daemon [--count N] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pomodorable.daemon import DaemonClient, socket_path
+
+STARTUP_TIMEOUT = 10.0
+
+
+def percentile(values: list[float], pct: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def summarize(name: str, seconds: list[float]) -> dict:
+    usec = [s * 1_000_000 for s in seconds]
+    return {
+        "name": name,
+        "count": len(usec),
+        "mean_us": round(statistics.fmean(usec), 1),
+        "p50_us": round(percentile(usec, 50), 1),
+        "p90_us": round(percentile(usec, 90), 1),
+        "p99_us": round(percentile(usec, 99), 1),
+        "max_us": round(max(usec), 1),
+    }
+
+
+def time_commands(client: DaemonClient, lines: list[str]) -> list[float]:
+    times = []
+    for line in lines:
+        t0 = time.perf_counter()
+        response = client.command(line)
+        times.append(time.perf_counter() - t0)
+        if not response["ok"]:
+            raise RuntimeError(f"{line}: {response['error']}")
+    return times
+
+
+def start_daemon(data_dir: Path) -> subprocess.Popen:
+    env = dict(os.environ, POMODORABLE_TEST_DATA_DIR=str(data_dir))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "pomodorable.cli", "--daemon"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while not socket_path(data_dir).exists():
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.kill()
+            raise RuntimeError("Daemon did not start")
+        time.sleep(0.05)
+    return proc
+
+
+def run(count: int) -> list[dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        proc = start_daemon(data_dir)
+        client = DaemonClient(socket_path(data_dir))
+        try:
+            #  Warm up the connection and the daemon.
+            time_commands(client, ["status"] * 10)
+            results = [summarize("status", time_commands(client, ["status"] * count))]
+
+            time_commands(client, ["start --seconds 3600 Benchmark"])
+            #  Pause and resume; resume writes a row to the data file.
+            pause_resume = time_commands(client, ["pause", "resume Benchmark"] * (count // 10))
+            results.append(summarize("pause", pause_resume[0::2]))
+            results.append(summarize("resume (writes)", pause_resume[1::2]))
+            time_commands(client, ["stop Benchmark"])
+            client.command("shutdown")
+        finally:
+            client.close()
+            try:
+                proc.wait(timeout=STARTUP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Timer daemon round-trip latency")
+    parser.add_argument("--count", type=int, default=2000, help="Number of status commands to time.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.count)
+    if args.json:
+        sys.stdout.write(json.dumps(results, indent=2) + "\n")
+        return
+    for r in results:
+        sys.stdout.write(
+            f"{r['name']:<16} n={r['count']:<6} mean={r['mean_us']:>8.1f}us  p50={r['p50_us']:>8.1f}us  "
+            f"p90={r['p90_us']:>8.1f}us  p99={r['p99_us']:>8.1f}us  max={r['max_us']:>8.1f}us\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
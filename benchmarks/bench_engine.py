@@ -0,0 +1,138 @@
+"""CPU and memory per active timer in the multi-timer engine.
+
+Creates N timers (one per user, each with its own AppData in a temporary
+folder) and starts a session on each. Measures idle CPU while they run, then
+lets them all finish and measures how late each finish was relative to its
+deadline.
+
+    python -m benchmarks.bench_engine [--timers N] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pomodorable.app_data import AppData
+from pomodorable.timer_engine import TimerEngine
+
+IDLE_SECONDS = 1.0
+SESSION_SECONDS = 3  # Shortest session; sessions end over 3 seconds.
+MEMORY_SAMPLE = 200
+
+
+def percentile(values: list[float], pct: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def make_engine(data_dir: Path, on_finish=None) -> TimerEngine:
+    def app_data_for(user: str) -> AppData:
+        user_dir = data_dir / user
+        user_dir.mkdir(exist_ok=True)
+        return AppData(init_data_path=user_dir, init_logging=False, data_only=True)
+
+    return TimerEngine(app_data_for, on_finish=on_finish)
+
+
+def start_timers(engine: TimerEngine, users: list[str]) -> None:
+    for n, user in enumerate(users):
+        response = engine.handle_command(user, f"start --seconds {SESSION_SECONDS + n % 3} Load test {n}")
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+
+
+def memory_per_timer(data_dir: Path, count: int) -> int:
+    """Return bytes allocated per timer for the timer, its AppData, and its
+    heap entry, measured on a separate engine so tracing does not slow the
+    timed run.
+    """
+    engine = make_engine(data_dir)
+    users = [f"mem{n:05d}" for n in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for user in users:
+        engine.get_timer(user)
+    start_timers(engine, users)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used // count
+
+
+async def run(timer_count: int, data_dir: Path) -> dict:
+    memory = memory_per_timer(data_dir, min(timer_count, MEMORY_SAMPLE))
+
+    lateness: list[float] = []
+    deadlines: dict[str, float] = {}
+
+    def finished(user: str, _) -> None:
+        lateness.append(time.time() - deadlines[user])
+
+    engine = make_engine(data_dir, on_finish=finished)
+    engine.start()
+    users = [f"user{n:05d}" for n in range(timer_count)]
+
+    #  Creating a timer for a new user writes the user's config and data
+    #  files, which is only done once.
+    cpu0 = time.process_time()
+    for user in users:
+        engine.get_timer(user)
+    create_cpu = time.process_time() - cpu0
+
+    cpu0 = time.process_time()
+    start_timers(engine, users)
+    start_cpu = time.process_time() - cpu0
+    for user in users:
+        deadlines[user] = engine.timers[user].deadline().timestamp()
+
+    #  While timers are running but none are due, the engine does no work.
+    cpu0 = time.process_time()
+    await asyncio.sleep(IDLE_SECONDS)
+    idle_cpu = time.process_time() - cpu0
+    due_early = timer_count - engine.running_count
+
+    cpu0 = time.process_time()
+    while engine.running_count:
+        await asyncio.sleep(0.1)
+    finish_cpu = time.process_time() - cpu0
+    engine.stop()
+
+    return {
+        "timers": timer_count,
+        "memory_bytes_per_timer": memory,
+        "create_cpu_us_per_timer": round(create_cpu / timer_count * 1_000_000, 1),
+        "start_cpu_us_per_timer": round(start_cpu / timer_count * 1_000_000, 1),
+        "idle_cpu_pct": round(idle_cpu / IDLE_SECONDS * 100, 2),
+        "finished_during_idle": due_early,
+        "finish_cpu_us_per_timer": round(finish_cpu / timer_count * 1_000_000, 1),
+        "finish_late_p50_ms": round(percentile(lateness, 50) * 1000, 1),
+        "finish_late_p99_ms": round(percentile(lateness, 99) * 1000, 1),
+        "finish_late_mean_ms": round(statistics.fmean(lateness) * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Multi-timer engine load benchmark")
+    parser.add_argument("--timers", type=int, default=2000, help="Number of concurrent timers.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = asyncio.run(run(args.timers, Path(tmp)))
+    if args.json:
+        sys.stdout.write(json.dumps(result, indent=2) + "\n")
+        return
+    for key, value in result.items():
+        sys.stdout.write(f"{key:<26} {value}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Run the AppData benchmark (see benchmarks.bench_app_data), save the results
+with the environment they were measured in, and compare them with a saved
+baseline. Exits with status 1 if any operation is slower than the baseline
+by more than the noise threshold.
+
+    python -m benchmarks.compare [--save-baseline] [--baseline FILE]
+        [--results FILE] [--threshold PCT] [--min-ms MS] [--repeat N]
+
+An operation is reported as slower (or faster) only if its mean time changed
+by more than the largest of: --threshold percent of the baseline mean,
+NOISE_FACTOR standard errors of the difference, and --min-ms.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from benchmarks.bench_app_data import add_spec_args, run, spec_from_args
+from pomodorable.__about__ import __version__
+
+RESULTS_DIR = Path(".benchmarks")
+BASELINE_FILE = RESULTS_DIR / "baseline.json"
+
+THRESHOLD_PCT = 15.0
+MIN_DIFF_MS = 0.5
+NOISE_FACTOR = 3.0
+
+#  More samples than bench_app_data takes by default, for a smaller error.
+COMPARE_REPEAT = 10
+
+#  Environment values that make results not comparable when they differ.
+ENVIRONMENT_KEYS = ("python", "implementation", "machine", "system", "cpu_count")
+
+SLOWER = "slower"
+FASTER = "faster"
+SAME = "same"
+NEW = "new"
+MISSING = "missing"
+
+
+def git_commit() -> str:
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return ""
+    return proc.stdout.strip()
+
+
+def environment() -> dict:
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "pomodorable": __version__,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "system": platform.system(),
+        "release": platform.release(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def noise_ms(base: dict, current: dict, threshold_pct: float, min_diff_ms: float) -> float:
+    """Return the smallest change in mean time that is not counted as noise."""
+    std_error = math.sqrt(base["stdev_ms"] ** 2 / base["count"] + current["stdev_ms"] ** 2 / current["count"])
+    return max(base["mean_ms"] * threshold_pct / 100, NOISE_FACTOR * std_error, min_diff_ms)
+
+
+def compare(baseline: dict, current: dict, threshold_pct: float, min_diff_ms: float) -> list[dict]:
+    """Return a row for each operation in either set of results, with the
+    change in mean time and whether it is more than the noise.
+    """
+    base_results = {r["name"]: r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        base = base_results.pop(r["name"], None)
+        if base is None:
+            rows.append({"name": r["name"], "current_ms": r["mean_ms"], "result": NEW})
+            continue
+        change = r["mean_ms"] - base["mean_ms"]
+        noise = noise_ms(base, r, threshold_pct, min_diff_ms)
+        if change > noise:
+            result = SLOWER
+        elif change < -noise:
+            result = FASTER
+        else:
+            result = SAME
+        rows.append(
+            {
+                "name": r["name"],
+                "baseline_ms": base["mean_ms"],
+                "current_ms": r["mean_ms"],
+                "change_pct": change / base["mean_ms"] * 100 if base["mean_ms"] else 0.0,
+                "noise_ms": noise,
+                "result": result,
+            }
+        )
+    rows.extend(
+        {"name": name, "baseline_ms": base["mean_ms"], "result": MISSING} for name, base in base_results.items()
+    )
+    return rows
+
+
+def differences(baseline: dict, current: dict) -> list[str]:
+    """Return descriptions of differences in environment or data that make
+    the results not comparable.
+    """
+    base_env = baseline.get("environment", {})
+    env = current.get("environment", {})
+    found = [
+        f"{key}: {base_env.get(key)} -> {env.get(key)}" for key in ENVIRONMENT_KEYS if base_env.get(key) != env.get(key)
+    ]
+    if baseline["data"]["spec"] != current["data"]["spec"]:
+        found.append("synthetic data options differ")
+    return found
+
+
+def print_report(rows: list[dict], baseline: dict, current: dict) -> None:
+    console = Console()
+    base_env = baseline.get("environment", {})
+    env = current.get("environment", {})
+    table = Table(
+        title=f"Benchmark: {base_env.get('commit') or 'baseline'} ({base_env.get('time', '?')}) -> "
+        f"{env.get('commit') or 'current'} ({env.get('time', '?')})"
+    )
+    table.add_column("Operation")
+    for heading in ("Baseline ms", "Current ms", "Change", "Noise ms"):
+        table.add_column(heading, justify="right")
+    table.add_column("Result")
+    styles = {SLOWER: "bold red", FASTER: "green"}
+    for row in rows:
+        table.add_row(
+            row["name"],
+            f"{row['baseline_ms']:.2f}" if "baseline_ms" in row else "",
+            f"{row['current_ms']:.2f}" if "current_ms" in row else "",
+            f"{row['change_pct']:+.1f}%" if "change_pct" in row else "",
+            f"{row['noise_ms']:.2f}" if "noise_ms" in row else "",
+            row["result"],
+            style=styles.get(row["result"]),
+        )
+    console.print(table)
+    for difference in differences(baseline, current):
+        console.print(f"[yellow]Not comparable:[/] {difference}")
+
+
+def save_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare AppData benchmark results with a baseline")
+    add_spec_args(parser)
+    parser.set_defaults(repeat=COMPARE_REPEAT)
+    parser.add_argument("--save-baseline", action="store_true", help="Save the results as the new baseline.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline results file.")
+    parser.add_argument("--results", type=Path, default=None, help="Compare a saved results file instead of running.")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD_PCT, help="Percent change counted as noise.")
+    parser.add_argument("--min-ms", type=float, default=MIN_DIFF_MS, help="Change in ms counted as noise.")
+    args = parser.parse_args()
+
+    if args.results:
+        current = json.loads(args.results.read_text())
+    else:
+        current = run(spec_from_args(args), args.repeat)
+        current["environment"] = environment()
+        results_file = RESULTS_DIR / f"results-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        save_json(results_file, current)
+        sys.stdout.write(f"Saved {results_file}\n")
+
+    if args.save_baseline:
+        save_json(args.baseline, current)
+        sys.stdout.write(f"Saved baseline {args.baseline}\n")
+        return
+    if not args.baseline.exists():
+        sys.stdout.write(f"No baseline at {args.baseline}. Run with --save-baseline to save one.\n")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    rows = compare(baseline, current, args.threshold, args.min_ms)
+    print_report(rows, baseline, current)
+    if any(row["result"] == SLOWER for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""Deterministic synthetic data files for benchmarks.
+
+Writes a version 2 data file with years of history, in the same format as
+AppData writes it. The same options (and seed) always give the same file.
+
+    python -m benchmarks.datagen OUTPUT_DIR [--years N] [--sessions-per-day N]
+        [--pause-rate R] [--stop-rate R] [--long-task-rate R] [--seed N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pomodorable.app_data import APP_DATA_CSV, DATA_CSV_HEADER_V2
+from pomodorable.app_utils import sec_to_hms
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+#  The last day of history is fixed, so the file does not depend on today.
+END_DATE = date(2025, 6, 30)
+
+SESSION_SECONDS = 25 * 60
+LONG_SESSION_SECONDS = 50 * 60
+MAX_PAUSES = 3
+
+PROJECTS = ["Budget report", "Code review", "Release notes", "Customer call", "Design doc", "Inbox", "Planning"]
+DETAILS = ["draft", "follow-up", "section 2", "for Alex", "cleanup", "", "", ""]
+REASONS = ["Phone call", "Coffee", "Question from Sam", "Meeting ran over", "Build broke", "Lunch"]
+STOP_REASONS = ["Interrupted", "Done early", "Have to leave", ""]
+WORDS = ["refactor", "module", "parser", "export", "filter", "review", "notes", "report", "summary", "data"]
+
+
+@dataclass
+class DataSpec:
+    years: float = 3.0
+    sessions_per_day: int = 10
+    #  Chance of each of up to MAX_PAUSES pauses in a session.
+    pause_rate: float = 0.3
+    #  Chance that a pause is an extension rather than a resume.
+    extend_rate: float = 0.2
+    stop_rate: float = 0.1
+    long_session_rate: float = 0.1
+    #  Chance that a task description is long (about long_task_length chars).
+    long_task_rate: float = 0.05
+    long_task_length: int = 400
+    workdays_only: bool = True
+    seed: int = 1
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def data_line(
+    started: datetime, when: datetime, action: str, *, message: str = "", duration: str = "", notes: str = ""
+) -> str:
+    """Return a data file line as AppData._append_data_csv writes it."""
+    return (
+        f'2,{started.isoformat()},"{when.strftime("%Y-%m-%d")}","{when.strftime("%H:%M:%S")}",'
+        f'"{action}","{message}","{duration}","{notes}"\n'
+    )
+
+
+def task_text(rng: random.Random, spec: DataSpec) -> str:
+    if rng.random() < spec.long_task_rate:
+        words = []
+        while sum(len(w) + 1 for w in words) < spec.long_task_length:
+            words.append(rng.choice(WORDS))
+        return " ".join(words)
+    task = f"{rng.choice(PROJECTS)} {rng.choice(DETAILS)}".strip()
+    if rng.random() < 0.2:  # noqa: PLR2004
+        task += f" #{rng.randint(100, 999)}"
+    return task
+
+
+def session_lines(rng: random.Random, spec: DataSpec, start: datetime) -> tuple[list[str], datetime]:
+    """Return the lines for one session, and the time it ended."""
+    started = start.replace(microsecond=rng.randint(0, 999_999))
+    start = started.replace(microsecond=0)
+    long_session = rng.random() < spec.long_session_rate
+    seconds = LONG_SESSION_SECONDS if long_session else SESSION_SECONDS
+    notes = f"(> {sec_to_hms(SESSION_SECONDS)})" if long_session else ""
+    lines = [
+        data_line(started, start, "Start", message=task_text(rng, spec), duration=sec_to_hms(seconds), notes=notes)
+    ]
+
+    t = start
+    added = 0
+    for _ in range(MAX_PAUSES):
+        if rng.random() >= spec.pause_rate:
+            break
+        t += timedelta(seconds=rng.randint(60, seconds // (MAX_PAUSES + 1)))
+        pause = rng.randint(30, 600)
+        t += timedelta(seconds=pause)
+        added += pause
+        reason = rng.choice(REASONS) if rng.random() < 0.5 else ""  # noqa: PLR2004
+        notes = "extended" if rng.random() < spec.extend_rate else ""
+        lines.append(data_line(started, t, "Pause", message=reason, duration=sec_to_hms(pause), notes=notes))
+
+    if rng.random() < spec.stop_rate:
+        t += timedelta(seconds=rng.randint(10, seconds // 2))
+        lines.append(data_line(started, t, "Stop", message=rng.choice(STOP_REASONS)))
+        return lines, t
+    end = start + timedelta(seconds=seconds + added)
+    lines.append(data_line(started, end, "Finish", notes=f"Started at {start.strftime('%H:%M:%S')}"))
+    return lines, end
+
+
+def generate_lines(spec: DataSpec) -> Iterator[str]:
+    """Yield the lines of a data file (with the header) for the spec."""
+    rng = random.Random(spec.seed)  # noqa: S311
+    yield f"{DATA_CSV_HEADER_V2}\n"
+    day = END_DATE - timedelta(days=round(spec.years * 365) - 1)
+    while day <= END_DATE:
+        if not spec.workdays_only or day.weekday() < 5:  # noqa: PLR2004
+            count = rng.randint(max(1, spec.sessions_per_day - 2), spec.sessions_per_day + 2)
+            t = datetime(day.year, day.month, day.day, 8) + timedelta(seconds=rng.randint(0, 3600))
+            for _ in range(count):
+                lines, t = session_lines(rng, spec, t)
+                yield from lines
+                t += timedelta(seconds=rng.randint(120, 900))
+        day += timedelta(days=1)
+
+
+def write_data_file(data_dir: Path, spec: DataSpec) -> Path:
+    """Write the data file for the spec to data_dir. Return its path."""
+    data_file = data_dir / APP_DATA_CSV
+    with data_file.open("w") as f:
+        f.writelines(generate_lines(spec))
+    return data_file
+
+
+def main() -> None:
+    defaults = DataSpec()
+    parser = argparse.ArgumentParser(description="Write a synthetic pomodorable data file")
+    parser.add_argument("output_dir", help="Folder for the data file.")
+    parser.add_argument("--years", type=float, default=defaults.years, help="Years of history.")
+    parser.add_argument("--sessions-per-day", type=int, default=defaults.sessions_per_day)
+    parser.add_argument("--pause-rate", type=float, default=defaults.pause_rate)
+    parser.add_argument("--stop-rate", type=float, default=defaults.stop_rate)
+    parser.add_argument("--long-task-rate", type=float, default=defaults.long_task_rate)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    spec = DataSpec(
+        years=args.years,
+        sessions_per_day=args.sessions_per_day,
+        pause_rate=args.pause_rate,
+        stop_rate=args.stop_rate,
+        long_task_rate=args.long_task_rate,
+        seed=args.seed,
+    )
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    data_file = write_data_file(output_dir, spec)
+    sys.stdout.write(f"Wrote {data_file} ({data_file.stat().st_size:,} bytes)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,28 @@
+from __future__ import annotations
+
+import copy
 import logging
-from pathlib import Path
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
 
 from tomlkit import document, dumps, parse
 
+from pomodorable.export_filter import checked_filter_spec
+from pomodorable.file_watcher import file_signature
+from pomodorable.io_timing import OP_CONFIG, io_timings
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from tomlkit import TOMLDocument
+
 LOG_RETENTION_DEFAULT = 30
 LOG_RETENTION_MIN = 5
+LOG_MAX_TOTAL_MB_DEFAULT = 20
+LOG_MAX_TOTAL_MB_MIN = 1
+LOG_MAX_LINES_DEFAULT = 500
+LOG_MAX_LINES_MIN = 20
 SESSION_MINUTES_DEFAULT = 25
 RUNNING_CSV_NAME_DEFAULT = "pomodorable-sessions.csv"
 
@@ -17,11 +35,32 @@ KEY_DAILY_MD_HEADING = "daily_md_heading"
 KEY_DAILY_MD_APPEND = "daily_md_append"
 KEY_DAILY_MD_NODUP = "daily_md_no_dup_headings"
 KEY_LOG_RETENTION_DAYS = "log_retention_days"
+KEY_LOG_MAX_TOTAL_MB = "log_max_total_mb"
+KEY_LOG_MAX_LINES = "log_max_lines"
 KEY_FILTER_CSV = "filter_csv"
 KEY_FILTER_MD = "filter_md"
 KEY_WAV_FILE = "wav_file"
 KEY_NOTIFY = "notify"
 
+#  Configuration keys and the AppConfig attribute for each.
+CONFIG_ATTRS = {
+    KEY_SESSION_MINUTES: "session_minutes",
+    KEY_DAILY_CSV_DIR: "daily_csv_dir",
+    KEY_RUNNING_CSV_DIR: "running_csv_dir",
+    KEY_RUNNING_CSV_NAME: "running_csv_name",
+    KEY_DAILY_MD_DIR: "daily_md_dir",
+    KEY_DAILY_MD_HEADING: "daily_md_heading",
+    KEY_DAILY_MD_APPEND: "daily_md_append",
+    KEY_DAILY_MD_NODUP: "daily_md_nodup",
+    KEY_LOG_RETENTION_DAYS: "log_retention_days",
+    KEY_LOG_MAX_TOTAL_MB: "log_max_total_mb",
+    KEY_LOG_MAX_LINES: "log_max_lines",
+    KEY_FILTER_CSV: "filter_csv",
+    KEY_FILTER_MD: "filter_md",
+    KEY_WAV_FILE: "wav_file",
+    KEY_NOTIFY: "do_notify",
+}
+
 
 class AppConfig:
     def __init__(self, config_file: Path) -> None:
@@ -35,12 +74,25 @@ class AppConfig:
         self.daily_md_append: bool = False
         self.daily_md_nodup: bool = False
         self.log_retention_days: int = LOG_RETENTION_DEFAULT
+        self.log_max_total_mb: int = LOG_MAX_TOTAL_MB_DEFAULT
+        self.log_max_lines: int = LOG_MAX_LINES_DEFAULT
         self.filter_csv: str = ""
         self.filter_md: str = ""
         self.wav_file: str = ""
         self.do_notify: bool = True
 
-    def _load_toml_doc(self) -> document:
+        #  The parsed document is kept so saving does not need to read and
+        #  parse the file again. The file signature (mtime, size) is used to
+        #  detect when the file was changed by something else.
+        self._doc: TOMLDocument | None = None
+        self._doc_signature: tuple[int, int] | None = None
+        self._batch_depth = 0
+
+    @property
+    def config_file(self) -> Path:
+        return self._config_file
+
+    def _load_toml_doc(self) -> TOMLDocument:
         """Load the TOML document from the configuration file. If the file
         doesn't exist or there is an error parsing it, return an empty
         document. If there is an error parsing the file, rename it with a
@@ -70,58 +122,116 @@ class AppConfig:
         if not self.daily_md_heading.startswith("#"):
             self.daily_md_heading = f"# {self.daily_md_heading}"
 
+    def _set_from_doc(self, doc: TOMLDocument, signature: tuple[int, int] | None) -> None:
+        self._doc = doc
+        self._doc_signature = signature
+        self.session_minutes = doc.get(KEY_SESSION_MINUTES, SESSION_MINUTES_DEFAULT)
+        self.daily_csv_dir = doc.get(KEY_DAILY_CSV_DIR, "")
+        self.running_csv_dir = doc.get(KEY_RUNNING_CSV_DIR, "")
+        self.running_csv_name = doc.get(KEY_RUNNING_CSV_NAME, RUNNING_CSV_NAME_DEFAULT)
+        self.daily_md_dir = doc.get(KEY_DAILY_MD_DIR, "")
+        self.daily_md_heading = doc.get(KEY_DAILY_MD_HEADING, "")
+        self.daily_md_append = doc.get(KEY_DAILY_MD_APPEND, False)
+        self.daily_md_nodup = doc.get(KEY_DAILY_MD_NODUP, False)
+        self.log_retention_days = doc.get(KEY_LOG_RETENTION_DAYS, LOG_RETENTION_DEFAULT)
+        self.log_max_total_mb = doc.get(KEY_LOG_MAX_TOTAL_MB, LOG_MAX_TOTAL_MB_DEFAULT)
+        self.log_max_lines = doc.get(KEY_LOG_MAX_LINES, LOG_MAX_LINES_DEFAULT)
+        self.filter_csv = checked_filter_spec(doc.get(KEY_FILTER_CSV, ""))
+        self.filter_md = checked_filter_spec(doc.get(KEY_FILTER_MD, ""))
+        self.wav_file = doc.get(KEY_WAV_FILE, "")
+        self.do_notify = doc.get(KEY_NOTIFY, True)
+        self._fix_daily_md_heading()
+
     def load(self) -> None:
         if self._config_file.exists():
             logging.info("Load '%s'", self._config_file)
             try:
-                doc = self._load_toml_doc()
-                self.session_minutes = doc.get(KEY_SESSION_MINUTES, SESSION_MINUTES_DEFAULT)
-                self.daily_csv_dir = doc.get(KEY_DAILY_CSV_DIR, "")
-                self.running_csv_dir = doc.get(KEY_RUNNING_CSV_DIR, "")
-                self.running_csv_name = doc.get(KEY_RUNNING_CSV_NAME, RUNNING_CSV_NAME_DEFAULT)
-                self.daily_md_dir = doc.get(KEY_DAILY_MD_DIR, "")
-                self.daily_md_heading = doc.get(KEY_DAILY_MD_HEADING, "")
-                self.daily_md_append = doc.get(KEY_DAILY_MD_APPEND, False)
-                self.daily_md_nodup = doc.get(KEY_DAILY_MD_NODUP, False)
-                self.log_retention_days = doc.get(KEY_LOG_RETENTION_DAYS, LOG_RETENTION_DEFAULT)
-                self.filter_csv = doc.get(KEY_FILTER_CSV, "").upper()
-                self.filter_md = doc.get(KEY_FILTER_MD, "").upper()
-                self.wav_file = doc.get(KEY_WAV_FILE, "")
-                self.do_notify = doc.get(KEY_NOTIFY, True)
-                self._fix_daily_md_heading()
+                signature = file_signature(self._config_file)
+                self._set_from_doc(self._load_toml_doc(), signature)
             except Exception:
                 logging.exception("Error loading configuration.")
         else:
             # Save initial config.
             self.save()
 
+    def read(self) -> None:
+        """Load the settings from the configuration file without changing the
+        file. Unlike load(), a file that cannot be parsed is not renamed (it
+        may be half written by another program); the error is raised.
+        """
+        signature = file_signature(self._config_file)
+        self._set_from_doc(parse(self._config_file.read_text()), signature)
+
+    def as_dict(self) -> dict:
+        """Return the settings as a dictionary of configuration key: value."""
+        return {key: getattr(self, attr) for key, attr in CONFIG_ATTRS.items()}
+
+    def _set_from_dict(self, values: dict) -> None:
+        for key, value in values.items():
+            setattr(self, CONFIG_ATTRS[key], value)
+
+    def _doc_is_current(self) -> bool:
+        """Return True if the cached document matches the file on disk."""
+        return self._doc is not None and self._doc_signature == file_signature(self._config_file)
+
+    def _write_doc(self, doc: TOMLDocument) -> None:
+        self._config_file.write_text(dumps(doc))
+        self._doc = doc
+        self._doc_signature = file_signature(self._config_file)
+
     def save(self) -> None:
-        logging.info("Save '%s'", self._config_file)
+        """Write the settings to the configuration file.
+
+        Inside batch_update, the write is deferred until the batch ends.
+        Nothing is written if the file already has the current settings.
+        """
+        if self._batch_depth:
+            return
         try:
-            if self._config_file.exists():
-                logging.info("Save to existing file")
+            if self._doc_is_current():
+                #  Change a copy, so the cached document still matches the
+                #  file if the write fails.
+                doc = copy.deepcopy(self._doc)
+            elif self._config_file.exists():
+                logging.info("Load existing file before save")
                 doc = self._load_toml_doc()
             else:
                 logging.info("Save to new file")
                 doc = document()
-            doc[KEY_SESSION_MINUTES] = self.session_minutes
-            doc[KEY_DAILY_CSV_DIR] = self.daily_csv_dir
-            doc[KEY_RUNNING_CSV_DIR] = self.running_csv_dir
-            doc[KEY_RUNNING_CSV_NAME] = self.running_csv_name
-            doc[KEY_DAILY_MD_DIR] = self.daily_md_dir
-            doc[KEY_DAILY_MD_HEADING] = self.daily_md_heading
-            doc[KEY_DAILY_MD_APPEND] = self.daily_md_append
-            doc[KEY_DAILY_MD_NODUP] = self.daily_md_nodup
-            doc[KEY_LOG_RETENTION_DAYS] = self.log_retention_days
-            doc[KEY_FILTER_CSV] = self.filter_csv
-            doc[KEY_FILTER_MD] = self.filter_md
-            doc[KEY_WAV_FILE] = self.wav_file
-            doc[KEY_NOTIFY] = self.do_notify
-            text = dumps(doc)
-            self._config_file.write_text(text)
+
+            values = self.as_dict()
+            changed = {key: value for key, value in values.items() if key not in doc or doc[key] != value}
+            if not changed and self._config_file.exists():
+                logging.debug("Configuration unchanged. Skip save.")
+                return
+
+            logging.info("Save '%s'", self._config_file)
+            for key, value in changed.items():
+                doc[key] = value
+            with io_timings.timed(OP_CONFIG):
+                self._write_doc(doc)
         except Exception:
             logging.exception("Error saving configuration.")
 
+    @contextmanager
+    def batch_update(self) -> Iterator[AppConfig]:
+        """Group changes to settings so they are saved once, when the outermost
+        batch ends. Calls to save() inside the batch are deferred.
+
+        If an exception is raised inside the batch, the settings are restored
+        to their values at the start of the batch and nothing is saved.
+        """
+        snapshot = self.as_dict()
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._set_from_dict(snapshot)
+            raise
+        finally:
+            self._batch_depth -= 1
+        self.save()
+
     @property
     def session_seconds(self) -> int:
         """Return the configured session_minutes as seconds."""
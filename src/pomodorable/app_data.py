@@ -1,22 +1,45 @@
 from __future__ import annotations
 
+import atexit
 import csv
 import logging
 import os
+import queue
 import sys
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from itertools import chain
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import dotenv
 from platformdirs import user_config_path, user_data_path
 from rich import print as rprint
-
-from pomodorable.app_config import LOG_RETENTION_MIN, AppConfig
-from pomodorable.app_utils import get_date_from_str, sec_to_hms, str_true
+from rich.table import Table
+
+from pomodorable.app_config import (
+    LOG_MAX_TOTAL_MB_DEFAULT,
+    LOG_MAX_TOTAL_MB_MIN,
+    LOG_RETENTION_DEFAULT,
+    LOG_RETENTION_MIN,
+    AppConfig,
+)
+from pomodorable.app_logging import DailyLogFileHandler, list_log_files, log_file_name
+from pomodorable.app_utils import get_date_from_str, minutes_as_hm, sec_to_hms, str_true
+from pomodorable.data_reader import OUT_OF_ORDER_ROWS, DataCursor, iter_data_rows, tail_offset
+from pomodorable.incremental_export import EXPORT_CURSORS_FILE, IncrementalExport
+from pomodorable.io_timing import OP_DAILY_CSV, OP_DAILY_MD, OP_DATA_CSV, OP_RUNNING_CSV, io_timings
 from pomodorable.mru_list import MRUList
-from pomodorable.output_csv import write_to_sessions_csv, write_to_timesheet_csv
+from pomodorable.output_csv import TaskSession, iter_task_sessions, write_to_sessions_csv, write_to_timesheet_csv
 from pomodorable.output_md import write_to_daily_md
+from pomodorable.profiling import Profiler, ProfileSetting, parse_profile_setting
+from pomodorable.rollups import PERIOD_DAY, PERIOD_TASK, PERIOD_WEEK, ROLLUP_FILE, SessionRollups, summarize
+from pomodorable.search_index import SEARCH_INDEX_FILE, SearchIndex
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
 
 APP_NAME = "pomodorable"
 APP_CONFIG_FILE = f"{APP_NAME}-config.toml"
@@ -24,6 +47,10 @@ APP_DATA_CSV = f"{APP_NAME}-data.csv"
 APP_DATA_VERSION = "2"
 DATA_CSV_HEADER_V1 = "version,date,time,action,message,duration,notes"
 DATA_CSV_HEADER_V2 = "version,started,date,time,action,message,duration,notes"
+BYTES_PER_MB = 1024 * 1024
+
+#  Seconds before a resolved output folder is checked again.
+OUTPUT_DIR_TTL = 300.0
 
 
 @dataclass
@@ -43,9 +70,25 @@ class AppData:
         self,
         init_app_config: AppConfig | None = None,
         init_data_path: Path | None = None,
+        init_logging: bool = True,
+        data_only: bool = False,
     ) -> None:
         self._errors = []
+        #  data_only is True for the AppData of each user of the timer daemon,
+        #  which only writes sessions: the MRU lists are not loaded or saved,
+        #  and the rollups and search index are not updated (they catch up
+        #  from the data file when next used).
+        self.data_only = data_only
         self.data_path = init_data_path
+        #  Rows written for the current session (see latest_session).
+        self._session_rows: list[dict] = []
+        #  Byte offset of the current session's first row (None if its rows
+        #  are not known to be together), and a cursor after the last row.
+        self._session_start: int | None = None
+        self._data_cursor = DataCursor()
+
+        #  Resolved output folders, by setting value: (path, time checked).
+        self._output_dirs: dict[str, tuple[Path, float]] = {}
 
         self.do_debug = str_true(os.environ.get("POMODORABLE_DEBUG", "n"))
 
@@ -75,15 +118,24 @@ class AppData:
 
         self._log_handler = None
         self._log_formatter = None
-        log_name = f"{APP_NAME}-{datetime.now().strftime('%Y%m%d')}.log"
-        self.log_file = self.data_path / log_name
-        self._init_logging()
+        self._log_file_handler = None
+        self._log_listener = None
+        self.profiler = None
+        #  init_logging is False when there are many AppData instances in one
+        #  process (one for each user of the timer daemon), which share the
+        #  process's logging.
+        if init_logging:
+            self._init_logging()
+            profile_setting = parse_profile_setting(os.environ.get("POMODORABLE_PROFILE", ""))
+            if profile_setting:
+                self._init_profiling(profile_setting)
 
         if init_app_config:
             self.config = init_app_config
         else:
             self.config = AppConfig(self.config_file)
-            self.config.load()
+            if not data_only or self.config_file.exists():
+                self.config.load()
 
         self._convert_data_csv()
         self._check_data_csv()
@@ -91,17 +143,25 @@ class AppData:
         self._purge_log_files()
 
         self.mru_list = MRUList(self.data_path)
-        self.mru_list.load()
+        if not data_only:
+            self.mru_list.load()
+
+        self.rollups = SessionRollups(self._data_csv, self.data_path / ROLLUP_FILE)
+        self.search_index = SearchIndex(self._data_csv, self.data_path / SEARCH_INDEX_FILE)
 
     def _init_logging(self) -> None:
-        """Add a file handler to the root logger.
+        """Add a queue handler to the root logger.
+
+        Records are written to the log file by a QueueListener on a background
+        thread, so logging calls in the UI do not wait on file writes.
+
+        The log file is switched to a new dated file at midnight. Files from
+        previous days are compressed and purged in the background.
 
         Do this before loading configuration so any errors in that process
-        are logged.
+        are logged. The retention settings are applied once the configuration
+        is loaded.
         """
-        if not self.log_file:
-            return
-
         logger = logging.getLogger()
 
         if self.do_debug:
@@ -109,11 +169,96 @@ class AppData:
         else:
             logger.setLevel(logging.INFO)
 
-        self._log_handler = logging.FileHandler(self.log_file)
+        self._log_file_handler = DailyLogFileHandler(
+            self.data_path,
+            APP_NAME,
+            LOG_RETENTION_DEFAULT,
+            LOG_MAX_TOTAL_MB_DEFAULT * BYTES_PER_MB,
+        )
         self._log_formatter = logging.Formatter("%(asctime)s %(levelname)s (%(module)s %(funcName)s): %(message)s")
-        self._log_handler.setFormatter(self._log_formatter)
+        self._log_file_handler.setFormatter(self._log_formatter)
+
+        log_queue = queue.SimpleQueue()
+        self._log_handler = QueueHandler(log_queue)
+        self._log_listener = QueueListener(log_queue, self._log_file_handler)
+        self._log_listener.start()
         logger.addHandler(self._log_handler)
 
+        # Make sure queued records are written when the process exits.
+        atexit.register(self.stop_logging)
+
+    def _init_profiling(self, setting: ProfileSetting) -> None:
+        """Profile the run, or only calls to the AppData methods named in
+        the setting. The profile is written to the data folder when logging
+        is stopped (at exit).
+        """
+        self.profiler = Profiler(self.data_path, sample_only=setting.sample_only)
+        if not setting.hot_paths:
+            logging.info("Profiling the run.")
+            self.profiler.start()
+            return
+        for name in setting.hot_paths:
+            if name.startswith("_") or not callable(getattr(AppData, name, None)):
+                logging.warning("Cannot profile '%s': not an AppData method.", name)
+                continue
+            logging.info("Profiling calls to %s.", name)
+            setattr(self, name, self.profiler.wrap(getattr(self, name)))
+
+    def stop_logging(self) -> None:
+        """Remove the queue handler from the root logger and stop the listener.
+
+        The listener writes any records still in the queue before its thread
+        exits, so the log file is complete when this returns. Unsaved search
+        index changes are saved, and if profiling, the profile is written
+        first. The I/O timings are written to the log.
+        The exit hook is removed, so a stopped AppData is not kept alive
+        until the process exits.
+        """
+        if self._log_listener is None:
+            return
+        self.search_index.flush()
+        io_timings.log_summary()
+        if self.profiler is not None:
+            self.profiler.save()
+        logging.getLogger().removeHandler(self._log_handler)
+        self._log_listener.stop()
+        self._log_listener = None
+        self._log_file_handler.close()
+        atexit.unregister(self.stop_logging)
+
+    def reload_config(self) -> bool:
+        """Load the configuration file again, after it was changed by another
+        program. The new settings replace self.config in a single assignment,
+        so readers see either the old or the new settings, never a mix. Changed
+        log retention settings are applied to the log file handler.
+
+        If the file cannot be read or parsed, such as while another program
+        is still writing it, the current settings are kept and the file is
+        left as it is. It is read again on the next change.
+
+        Return True if any setting changed.
+        """
+        config_file = self.config.config_file
+        if not config_file.exists():
+            return False
+        new_config = AppConfig(config_file)
+        try:
+            new_config.read()
+        except Exception:
+            logging.exception("Cannot reload '%s'. Keeping current settings.", config_file)
+            return False
+        if new_config.as_dict() == self.config.as_dict():
+            return False
+        logging.info("Configuration changed. Reloaded '%s'", config_file)
+        old_config = self.config
+        self.config = new_config
+        if (new_config.log_retention_days, new_config.log_max_total_mb) != (
+            old_config.log_retention_days,
+            old_config.log_max_total_mb,
+        ):
+            self._purge_log_files()
+        return True
+
     def _convert_data_csv(self):
         """Convert the data file from version 1 to version 2."""
         if not self._data_csv.exists():
@@ -166,18 +311,38 @@ class AppData:
             logging.info("Create new data file '%s'", str(self._data_csv))
             self._data_csv.write_text(f"{DATA_CSV_HEADER_V2}\n")
 
+    @property
+    def log_file(self) -> Path:
+        """The current log file. It changes when the log rolls over at midnight."""
+        if self._log_file_handler:
+            return self._log_file_handler.current_file
+        return self.data_path / log_file_name(APP_NAME, datetime.now())
+
+    def log_files(self) -> list[Path]:
+        """Return the current log file followed by the log files and archives
+        of previous days, newest first.
+        """
+        current = self.log_file
+        older = [path for _, path in reversed(list_log_files(self.data_path, APP_NAME)) if path != current]
+        return [current, *older]
+
     def _purge_log_files(self) -> None:
-        """Purge log files older than the configured retention period."""
+        """Apply the configured retention settings to the log file handler and
+        start compressing and purging old log files in the background.
+
+        Files older than the retention period are removed, then the oldest
+        files are removed until the total size is within the configured limit.
+        """
+        if not self._log_file_handler:
+            return
 
         if self.config.log_retention_days < LOG_RETENTION_MIN:
             logging.error("Log retention days is less than the minimum.")
             return
 
-        # Purge based on distinct dates in filenames (not by date range).
-        log_files = sorted(self.log_file.parent.glob(f"{APP_NAME}-*.log"))
-        if len(log_files) > self.config.log_retention_days:
-            for file in log_files[: -self.config.log_retention_days]:
-                file.unlink()
+        self._log_file_handler.retention_days = self.config.log_retention_days
+        self._log_file_handler.max_total_bytes = max(self.config.log_max_total_mb, LOG_MAX_TOTAL_MB_MIN) * BYTES_PER_MB
+        self._log_file_handler.archive_in_background()
 
     def _append_data_csv(self, data_row: AppDataRow) -> None:
         """Append a line to the CSV file."""
@@ -190,8 +355,31 @@ class AppData:
             f'"{data_row.duration}","{data_row.notes}"'
         )
 
-        with self._data_csv.open("a") as f:
+        with io_timings.timed(OP_DATA_CSV), self._data_csv.open("a") as f:
+            start = f.tell()
             f.write(f"{csv_str}\n")
+            end = f.tell()
+
+        #  Keep the rows of the current session, as they would be read back.
+        if data_row.action == "Start":
+            self._session_rows = []
+            self._session_start = start
+        elif start != self._data_cursor.offset:
+            #  Rows were written by something else during the session.
+            self._session_start = None
+        self._data_cursor = DataCursor(end, f"{csv_str}\n")
+        self._session_rows.append(
+            {
+                "version": data_row.version,
+                "started": data_row.started.isoformat(),
+                "date": data_row.date_time.strftime("%Y-%m-%d"),
+                "time": data_row.date_time.strftime("%H:%M:%S"),
+                "action": data_row.action,
+                "message": data_row.message,
+                "duration": data_row.duration,
+                "notes": data_row.notes,
+            }
+        )
 
     def _csv_date_time(self, dt: datetime) -> str:
         """Return datetime as CSV string with the date and time in separate columns."""
@@ -230,8 +418,9 @@ class AppData:
                 notes=note,
             )
         )
-        self.mru_list.add_task(task)
-        self.mru_list.save()
+        if not self.data_only:
+            self.mru_list.add_task(task, start_time)
+            self.mru_list.save()
 
     def write_pause(
         self,
@@ -251,12 +440,16 @@ class AppData:
                 notes="extended" if session_extended else "",
             )
         )
-        self.mru_list.add_reason(reason)
-        self.mru_list.save()
+        if not self.data_only:
+            self.mru_list.add_reason(reason, pause_time)
+            self.mru_list.save()
 
     def write_stop(self, start_time: datetime, stop_time: datetime, reason: str) -> None:
         self._append_data_csv(AppDataRow(started=start_time, date_time=stop_time, action="Stop", message=reason))
         self.write_session_to_output_files()
+        if not self.data_only:
+            self._update_rollups()
+            self._add_to_search_index()
         # Stop should be infrequent, so do not add reason to the MRU list.
 
     def write_finish(self, finish_time: datetime, start_time: datetime) -> None:
@@ -269,21 +462,69 @@ class AppData:
             )
         )
         self.write_session_to_output_files()
+        if not self.data_only:
+            self._update_rollups()
+            self._add_to_search_index()
+
+    def _update_rollups(self) -> None:
+        """Add the session that just ended to the rollups (only the rows
+        after the rollup cursor are read). A failure is logged, so writing a
+        session does not raise; the rollups catch up on the next update.
+        """
+        try:
+            self.rollups.update()
+        except Exception:
+            logging.exception("Cannot update rollups from '%s'", self._data_csv)
+
+    def _add_to_search_index(self) -> None:
+        """Add the session that just ended to the search index, from the rows
+        kept in memory. The index is saved when logging is stopped (at exit)
+        or by the next search. A failure is logged, as for the rollups.
+        """
+        start = self._session_start if self._session_rows and self._session_rows[0]["action"] == "Start" else None
+        try:
+            self.search_index.add_ended_session(self._session_rows, start, self._data_cursor)
+        except Exception:
+            logging.exception("Cannot update search index from '%s'", self._data_csv)
 
     def set_daily_csv_dir(self, daily_csv_dir: str) -> None:
         self.config.daily_csv_dir = daily_csv_dir
         self.config.save()
 
-    def get_daily_csv_path(self) -> Path | None:
-        if not self.config.daily_csv_dir:
+    def get_output_dir(self, dir_setting: str) -> Path | None:
+        """Return the resolved folder for an output folder setting, or None if
+        the setting is empty or the folder does not exist.
+
+        Resolved folders are cached by setting value, so a changed setting is
+        resolved again. A cached folder is checked again after OUTPUT_DIR_TTL
+        seconds, or after a write to it fails. A missing folder is not cached.
+        """
+        if not dir_setting:
             return None
-        path = Path(self.config.daily_csv_dir).expanduser().resolve()
+        now = time.monotonic()
+        cached = self._output_dirs.get(dir_setting)
+        if cached and now - cached[1] < OUTPUT_DIR_TTL:
+            return cached[0]
+        path = Path(dir_setting).expanduser().resolve()
         if not path.exists():
+            self._output_dirs.pop(dir_setting, None)
             logging.error("Directory does not exist: %s", path)
             self.queue_error(f"Directory does not exist: {path}")
             return None
+        self._output_dirs[dir_setting] = (path, now)
         return path
 
+    def _output_write_failed(self, dir_setting: str, out_file: Path) -> None:
+        """Log and queue the error for a failed write, and drop the cached
+        folder so it is checked again on the next write.
+        """
+        self._output_dirs.pop(dir_setting, None)
+        logging.exception("Failed to write '%s'", out_file)
+        self.queue_error(f"Failed to write '{out_file}'")
+
+    def get_daily_csv_path(self) -> Path | None:
+        return self.get_output_dir(self.config.daily_csv_dir)
+
     def set_running_csv_dir(self, running_csv_dir: str) -> None:
         self.config.running_csv_dir = running_csv_dir
         self.config.save()
@@ -293,36 +534,29 @@ class AppData:
         self.config.save()
 
     def get_running_csv_path(self) -> Path | None:
-        if not self.config.running_csv_dir:
-            return None
-        path = Path(self.config.running_csv_dir).expanduser().resolve()
-        if not path.exists():
-            logging.error("Directory does not exist: %s", path)
-            self.queue_error(f"Directory does not exist: {path}")
-            return None
-        return path
+        return self.get_output_dir(self.config.running_csv_dir)
 
     def set_daily_md_dir(self, daily_md_dir: str) -> None:
         self.config.daily_md_dir = daily_md_dir
         self.config.save()
 
     def get_daily_md_path(self) -> Path | None:
-        if not self.config.daily_md_dir:
-            return None
-        path = Path(self.config.daily_md_dir).expanduser().resolve()
-        if not path.exists():
-            logging.error("Directory does not exist: %s", path)
-            self.queue_error(f"Directory does not exist: {path}")
-            return None
-        return path
+        return self.get_output_dir(self.config.daily_md_dir)
 
-    def get_latest_session_rows(self) -> list[dict]:
-        """Return the latest session rows from the CSV file."""
+    @property
+    def data_file(self) -> Path:
+        return self._data_csv
+
+    def get_data_rows(self) -> list[dict]:
+        """Return all rows from the CSV file."""
         if not self._data_csv.exists():
             return []
         with self._data_csv.open(newline="") as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
+            return list(csv.DictReader(f))
+
+    def get_latest_session_rows(self) -> list[dict]:
+        """Return the latest session rows from the CSV file."""
+        rows = self.get_data_rows()
 
         #  Get the index of the last row where action = "Start".
         #  If there is a "Start" action, return the rows from that index to
@@ -336,14 +570,42 @@ class AppData:
             return []
         return rows[last_start:]
 
+    def latest_session(self) -> TaskSession | None:
+        """Return the latest session written by this instance, without
+        reading the data file, or None if no session was started.
+        """
+        sessions = list(iter_task_sessions(self._session_rows))
+        return sessions[-1] if sessions else None
+
     def get_session_rows_for_date(self, date: datetime) -> list[dict]:
         """Return the session rows for a given date from the CSV file."""
-        if not self._data_csv.exists():
-            return []
-        with self._data_csv.open(newline="") as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
-        return [row for row in rows if row["date"] == date.strftime("%Y-%m-%d")]
+        return list(self.iter_rows_for_dates(date, date))
+
+    def iter_rows_for_dates(self, start_date: datetime | None, end_date: datetime | None) -> Iterator[dict]:
+        """Yield the rows dated from start_date to end_date from the CSV file,
+        as they are read. Reading starts near the first of those rows (see
+        tail_offset) and stops after the last, so other rows are not kept.
+        A date of None is no limit: reading starts at the start of the file,
+        or continues to its end.
+
+        Rows are expected in date order, but a few may be out of place (such
+        as rows synced from another computer). Reading stops only after
+        OUT_OF_ORDER_ROWS rows in a row are dated after end_date.
+        """
+        since = "" if start_date is None else start_date.strftime("%Y-%m-%d")
+        until = "9999-12-31" if end_date is None else end_date.strftime("%Y-%m-%d")
+        offset = tail_offset(self._data_csv, since) if since else 0
+        later_rows = 0
+        for line in iter_data_rows(self._data_csv, offset, partial_last=True):
+            row_date = line.row["date"]
+            if row_date > until:
+                later_rows += 1
+                if later_rows >= OUT_OF_ORDER_ROWS:
+                    break
+                continue
+            later_rows = 0
+            if row_date >= since:
+                yield line.row
 
     def write_session_to_output_files(self) -> None:
         """Write the latest session to the CSV and markdown output files.
@@ -364,14 +626,22 @@ class AppData:
         if path:
             date_str = rows[0]["date"]
             csv_file = path / f"{date_str}.csv"
-            write_to_sessions_csv(csv_file, self.config.filter_csv, rows)
+            try:
+                with io_timings.timed(OP_DAILY_CSV):
+                    write_to_sessions_csv(csv_file, self.config.filter_csv, rows)
+            except OSError:
+                self._output_write_failed(self.config.daily_csv_dir, csv_file)
 
     def write_session_to_running_csv(self, rows: list[dict]) -> None:
         """Write the latest session to the running CSV file."""
         path = self.get_running_csv_path()
         if path:
             csv_file = path / self.config.running_csv_name
-            write_to_sessions_csv(csv_file, self.config.filter_csv, rows)
+            try:
+                with io_timings.timed(OP_RUNNING_CSV):
+                    write_to_sessions_csv(csv_file, self.config.filter_csv, rows)
+            except OSError:
+                self._output_write_failed(self.config.running_csv_dir, csv_file)
 
     def write_sessions_to_daily_md(self) -> None:
         """Write sessions to the daily markdown file.
@@ -380,31 +650,47 @@ class AppData:
         sessions completed before the file was created by an external
         application, so all rows for the date are passed to the write_to_daily_md
         function.
+
+        The time taken, including reading the rows for the date, is recorded
+        in io_timings.
         """
         path = self.get_daily_md_path()
         if not path:
             return
-        #  Get the date from the latest session.
-        rows = self.get_latest_session_rows()
-        if not rows:
-            logging.error("Call to get_latest_session_rows returned no rows.")
-            return
-        date_str = rows[0]["date"]
-        date_val = get_date_from_str(date_str)
-        #  Get the rows for that date.
-        rows = self.get_session_rows_for_date(date=date_val)
-        if not rows:
-            logging.error("Call to get_session_rows_for_date returned no rows.")
+        with io_timings.timed(OP_DAILY_MD):
+            #  Get the date from the latest session.
+            rows = self.get_latest_session_rows()
+            if not rows:
+                logging.error("Call to get_latest_session_rows returned no rows.")
+                return
+            date_str = rows[0]["date"]
+            date_val = get_date_from_str(date_str)
+            #  Get the rows for that date.
+            rows = self.get_session_rows_for_date(date=date_val)
+            if not rows:
+                logging.error("Call to get_session_rows_for_date returned no rows.")
+                return
+            self.write_day_to_daily_md(date_str, rows)
+
+    def write_day_to_daily_md(self, date_str: str, rows: list[dict]) -> None:
+        """Write the section for a date to the daily markdown file, from all
+        the rows for that date.
+        """
+        path = self.get_daily_md_path()
+        if not path:
             return
         md_file = path / f"{date_str}.md"
-        write_to_daily_md(
-            md_file,
-            self.config.filter_md,
-            self.config.daily_md_heading,
-            self.config.daily_md_append,
-            self.config.daily_md_nodup,
-            rows,
-        )
+        try:
+            write_to_daily_md(
+                md_file,
+                self.config.filter_md,
+                self.config.daily_md_heading,
+                self.config.daily_md_append,
+                self.config.daily_md_nodup,
+                rows,
+            )
+        except OSError:
+            self._output_write_failed(self.config.daily_md_dir, md_file)
 
     def cli_export_daily_csv(
         self,
@@ -449,7 +735,7 @@ class AppData:
         rprint(f"\nExporting to {csv_file}\n")
 
         if do_timesheet:
-            write_to_timesheet_csv(csv_file, rows)
+            write_to_timesheet_csv(csv_file, rows, filters)
         else:
             write_to_sessions_csv(csv_file, filters, rows, start_num=1)
 
@@ -474,13 +760,13 @@ class AppData:
         if not csv_path:
             return
 
-        rows = []
-        for day in range((end_date - start_date).days + 1):
-            rows.extend(self.get_session_rows_for_date(start_date + timedelta(days=day)))
-
-        if not rows:
+        #  Rows are streamed to the writer, so a long range is not held in memory.
+        rows = self.iter_rows_for_dates(start_date, end_date)
+        first_row = next(rows, None)
+        if first_row is None:
             rprint("\nNo data found for given date range.\n")
             return
+        rows = chain([first_row], rows)
 
         prefix = "ts-" if do_timesheet else "po-"
 
@@ -492,10 +778,26 @@ class AppData:
             csv_file.unlink()
 
         if do_timesheet:
-            write_to_timesheet_csv(csv_file, rows)
+            write_to_timesheet_csv(csv_file, rows, filters)
         else:
             write_to_sessions_csv(csv_file, filters, rows, start_num=1)
 
+    def cli_append_csv(self, csv_file: Path, do_timesheet: bool, filters: str) -> None:
+        """Append the sessions ended since the last export to csv_file (see
+        IncrementalExport). Intended for scheduled exports.
+
+        For CLI export the filters are passed as a command line argument.
+        The filter_csv AppConfig setting is not used.
+        """
+        export = IncrementalExport(self._data_csv, self.data_path / EXPORT_CURSORS_FILE)
+        try:
+            count = export.export(csv_file, filters, do_timesheet)
+        except OSError:
+            logging.exception("Cannot append to '%s'", csv_file)
+            sys.stderr.write(f"\nCannot append to {csv_file}\n")
+            sys.exit(1)
+        rprint(f"\nAppended {count} sessions to {csv_file}\n")
+
     def cli_export_daily_markdown(self, export_date: datetime, filters: str, export_path: Path | None) -> None:
         """Export a daily markdown file for a given date.
 
@@ -549,3 +851,77 @@ class AppData:
 
         for day in range((end_date - start_date).days + 1):
             self.cli_export_daily_markdown(start_date + timedelta(days=day), filters, out_path)
+
+    def cli_stats(self, period: str, since: datetime | None, until: datetime | None) -> None:
+        """Print session totals by day, week, or task.
+
+        The totals come from the rollup file, which is brought up to date with
+        the data file first (only sessions not already in the rollup file are
+        read).
+        """
+        try:
+            days = self.rollups.update()
+        except Exception:
+            logging.exception("Cannot update rollups from '%s'", self._data_csv)
+            sys.stderr.write(f"\nCannot read session totals from {self._data_csv}\n")
+            return
+        items = summarize(
+            days,
+            period,
+            since.strftime("%Y-%m-%d") if since else None,
+            until.strftime("%Y-%m-%d") if until else None,
+        )
+        if not items:
+            rprint("\nNo sessions found.\n")
+            return
+
+        headings = {PERIOD_DAY: "Date", PERIOD_WEEK: "Week", PERIOD_TASK: "Task"}
+        table = Table(title="Pomodorable Sessions")
+        table.add_column(headings[period])
+        for heading in ("Sessions", "Finished", "Stopped", "Focus", "Paused"):
+            table.add_column(heading, justify="right")
+
+        grand = [0] * 5
+        for key, (sessions, finished, stopped, task_minutes, pause_minutes, *_) in items:
+            table.add_row(
+                key,
+                str(sessions),
+                str(finished),
+                str(stopped),
+                minutes_as_hm(task_minutes),
+                minutes_as_hm(pause_minutes),
+            )
+            for i, value in enumerate((sessions, finished, stopped, task_minutes, pause_minutes)):
+                grand[i] += value
+        table.add_section()
+        table.add_row("Total", *(str(v) for v in grand[:3]), minutes_as_hm(grand[3]), minutes_as_hm(grand[4]))
+        rprint(table)
+
+    def cli_search(self, query: str) -> None:
+        """Print the sessions matching the query, most recent first."""
+        self.search_index.update()
+        results = self.search_index.search(query)
+        if not results:
+            rprint(f"\nNo sessions found for '{query}'.\n")
+            return
+        table = Table(title=f"Sessions matching '{query}'")
+        for heading in ("Date", "Start", "Task", "Notes"):
+            table.add_column(heading)
+        for session in results:
+            table.add_row(session["date"], session["start_time"], session["task"], session["notes"])
+        rprint(table)
+
+    def cli_check_rollups(self) -> bool:
+        """Compare the rollup file with totals computed from the data file,
+        and rebuild it if any day differs. Return True if it matched.
+        """
+        differ = self.rollups.check()
+        if not differ:
+            rprint(f"\nRollup file matches the data file ({len(self.rollups.days)} days).\n")
+            return True
+        rprint(f"\nRollup totals differ from the data file for {len(differ)} days:")
+        for day in differ:
+            rprint(f"  {day}")
+        self.rollups.rebuild()
+        rprint(f"\nRebuilt '{self.rollups.rollup_file}'\n")
+        return False
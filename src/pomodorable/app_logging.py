@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import gzip
+import logging
+import shutil
+import threading
+from datetime import datetime, time, timedelta
+from logging.handlers import BaseRotatingHandler
+from pathlib import Path
+
+LOG_DATE_FMT = "%Y%m%d"
+LOG_SUFFIX = ".log"
+ARCHIVE_SUFFIX = ".log.gz"
+ARCHIVE_JOIN_TIMEOUT = 5.0
+
+
+def log_file_name(prefix: str, when: datetime) -> str:
+    return f"{prefix}-{when.strftime(LOG_DATE_FMT)}{LOG_SUFFIX}"
+
+
+def next_midnight(when: datetime) -> float:
+    """Return the timestamp of the local midnight following 'when'."""
+    return datetime.combine(when.date() + timedelta(days=1), time.min).timestamp()
+
+
+def compress_log_file(log_file: Path) -> Path | None:
+    """Write log_file to a gzip archive and remove the original.
+
+    The archive is written to a temporary name first, so an interrupted
+    compression never leaves a partial archive in place of the log file.
+    Return the path of the archive, or None if it could not be written.
+    """
+    gz_file = log_file.with_suffix(ARCHIVE_SUFFIX)
+    tmp_file = gz_file.with_suffix(".gz.tmp")
+    try:
+        with log_file.open("rb") as src, gzip.open(tmp_file, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        tmp_file.replace(gz_file)
+        log_file.unlink()
+    except OSError:
+        logging.exception("Failed to compress log file '%s'", log_file)
+        tmp_file.unlink(missing_ok=True)
+        return None
+    return gz_file
+
+
+def log_file_date(prefix: str, log_file: Path) -> datetime | None:
+    """Return the date in the name of a log file or archive, or None if the
+    name does not match the expected pattern.
+    """
+    name = log_file.name
+    if not name.startswith(f"{prefix}-"):
+        return None
+    date_str = name[len(prefix) + 1 :].split(".", 1)[0]
+    try:
+        return datetime.strptime(date_str, LOG_DATE_FMT)
+    except ValueError:
+        return None
+
+
+def list_log_files(log_dir: Path, prefix: str) -> list[tuple[datetime, Path]]:
+    """Return (date, path) for log files and archives, oldest first."""
+    files = []
+    for pattern in (f"{prefix}-*{LOG_SUFFIX}", f"{prefix}-*{ARCHIVE_SUFFIX}"):
+        for path in log_dir.glob(pattern):
+            file_date = log_file_date(prefix, path)
+            if file_date is not None:
+                files.append((file_date, path))
+    return sorted(files)
+
+
+def purge_log_files(
+    log_dir: Path,
+    prefix: str,
+    current: Path,
+    *,
+    retention_days: int,
+    max_total_bytes: int,
+    today: datetime | None = None,
+) -> list[Path]:
+    """Remove log files and archives older than retention_days, then remove
+    the oldest remaining files until the total size is within max_total_bytes.
+
+    The current log file is never removed. Return the list of removed files.
+    """
+    today = today or datetime.now()
+    cutoff = datetime.combine(today.date(), time.min) - timedelta(days=retention_days)
+    removed = []
+    kept = []
+    for file_date, path in list_log_files(log_dir, prefix):
+        if path == current:
+            continue
+        if file_date < cutoff:
+            path.unlink(missing_ok=True)
+            removed.append(path)
+        else:
+            kept.append(path)
+
+    total = sum(p.stat().st_size for p in kept)
+    if current.exists():
+        total += current.stat().st_size
+    for path in kept:
+        if total <= max_total_bytes:
+            break
+        total -= path.stat().st_size
+        path.unlink(missing_ok=True)
+        removed.append(path)
+
+    return removed
+
+
+class DailyLogFileHandler(BaseRotatingHandler):
+    """Log file handler that switches to a new dated file at local midnight.
+
+    Files from previous days are compressed to '.log.gz' archives, and old
+    files are purged, on a background thread.
+    """
+
+    def __init__(self, log_dir: Path, prefix: str, retention_days: int, max_total_bytes: int) -> None:
+        self.log_dir = log_dir.absolute()
+        self.prefix = prefix
+        self.retention_days = retention_days
+        self.max_total_bytes = max_total_bytes
+        self._archive_lock = threading.Lock()
+        self._archive_requested = False
+        self._archive_running = False
+        self._archive_thread: threading.Thread | None = None
+        now = datetime.now()
+        self._rollover_at = next_midnight(now)
+        super().__init__(str(self.log_dir / log_file_name(prefix, now)), mode="a", encoding="utf-8")
+
+    @property
+    def current_file(self) -> Path:
+        return Path(self.baseFilename)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        return record.created >= self._rollover_at
+
+    def doRollover(self) -> None:
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        now = datetime.now()
+        self.baseFilename = str(self.log_dir / log_file_name(self.prefix, now))
+        self._rollover_at = next_midnight(now)
+        self.stream = self._open()
+        self.archive_in_background()
+
+    def archive_old_files(self) -> None:
+        """Compress log files from previous days, then purge old files."""
+        current = self.current_file
+        for _, path in list_log_files(self.log_dir, self.prefix):
+            if path.suffix == LOG_SUFFIX and path != current:
+                compress_log_file(path)
+        purge_log_files(
+            self.log_dir,
+            self.prefix,
+            current,
+            retention_days=self.retention_days,
+            max_total_bytes=self.max_total_bytes,
+        )
+
+    def archive_in_background(self) -> None:
+        """Run archive_old_files on a background thread. If it is already
+        running, it runs again when finished so new settings are applied.
+        """
+        with self._archive_lock:
+            self._archive_requested = True
+            if self._archive_running:
+                return
+            self._archive_running = True
+            self._archive_thread = threading.Thread(target=self._archive_worker, name="log-archive", daemon=True)
+            self._archive_thread.start()
+
+    def _archive_worker(self) -> None:
+        while True:
+            with self._archive_lock:
+                if not self._archive_requested:
+                    self._archive_running = False
+                    return
+                self._archive_requested = False
+            self.archive_old_files()
+
+    def join_archive(self, timeout: float | None = None) -> None:
+        """Wait for the background archive thread to finish."""
+        if self._archive_thread:
+            self._archive_thread.join(timeout)
+
+    def close(self) -> None:
+        self.join_archive(ARCHIVE_JOIN_TIMEOUT)
+        super().close()
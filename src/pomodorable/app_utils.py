@@ -10,6 +10,11 @@ def sec_to_hms(seconds: int) -> str:
     return f"{hours}:{minutes:02}:{seconds:02}"
 
 
+def minutes_as_hm(minutes: int) -> str:
+    """Convert minutes to a string in the form H:MM."""
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
 def hms_to_sec(hms: str) -> int:
     """Convert a string in the form "HH:MM:SS" or "MM:SS" to seconds."""
     parts = hms.split(":")
@@ -1,3 +1,4 @@
+import json
 import sys
 from importlib import metadata
 from pathlib import Path
@@ -6,6 +7,13 @@ import click
 
 from pomodorable.app_data import AppData
 from pomodorable.app_utils import get_date_from_str
+from pomodorable.daemon import DaemonClient, DaemonError, daemon_supported, run_daemon, socket_path
+from pomodorable.export_filter import compile_filter, normalize_filter_spec
+from pomodorable.http_api import API_PORT_DEFAULT, run_http_api
+from pomodorable.incremental_export import EXPORT_CURSORS_FILE
+from pomodorable.metrics_file import METRICS_SUFFIX
+from pomodorable.output_watcher import run_output_watcher
+from pomodorable.rollups import PERIODS
 from pomodorable.ui import PomodorableApp
 
 DIST_NAME = "pomodorable"
@@ -19,6 +27,35 @@ def get_app_version() -> str:
         return MOD_VERSION
 
 
+def checked_filters(filters: str | None) -> str:
+    """Return the --filters value normalized. If it is not valid, print an
+    error message and exit.
+    """
+    filters = "" if filters is None else normalize_filter_spec(filters)
+    try:
+        compile_filter(filters)
+    except ValueError as e:
+        sys.stderr.write(f"\nInvalid filters: {e}\n")
+        sys.exit(1)
+    return filters
+
+
+def checked_metrics_file(metrics_file: str | None) -> Path | None:
+    """Return the --metrics-file value as a Path. If it is not valid, print
+    an error message and exit.
+    """
+    if metrics_file is None:
+        return None
+    path = Path(metrics_file).expanduser().resolve()
+    if path.suffix != METRICS_SUFFIX:
+        sys.stderr.write(f"\nThe metrics file name must end with '{METRICS_SUFFIX}'.\n")
+        sys.exit(1)
+    if not path.parent.exists():
+        sys.stderr.write(f"\nInvalid path: {path.parent}\n")
+        sys.exit(1)
+    return path
+
+
 def handled_option(csv_date, md_date, end_date, do_timesheet, export_path, filters) -> bool:
     """Handle the command-line options for exporting CSV or Markdown files.
     If there are errors in the options, print an error message and exit.
@@ -58,9 +95,9 @@ def handled_option(csv_date, md_date, end_date, do_timesheet, export_path, filte
             sys.stderr.write(f"\nInvalid date: {md_date}\n")
             sys.exit(1)
 
-    app_data = AppData()
+    filters = checked_filters(filters)
 
-    filters = "" if filters is None else filters.upper()
+    app_data = AppData()
 
     if csv_date is not None:
         if end_date is not None:
@@ -77,9 +114,165 @@ def handled_option(csv_date, md_date, end_date, do_timesheet, export_path, filte
     return True
 
 
-def run(enable_screenshots: bool, enable_testkey: bool) -> None:
-    ui = PomodorableApp(enable_screenshots=enable_screenshots, enable_testkey=enable_testkey)
+def handled_append_option(append_to: str | None, exporting: bool, do_timesheet: bool, filters: str | None) -> bool:
+    """Handle the command-line option for appending new sessions to a CSV file.
+    If there are errors in the options, print an error message and exit.
+    If options are handled, return True; otherwise, return False.
+    """
+    if append_to is None:
+        return False
+    if exporting:
+        sys.stderr.write("\n--append-to option cannot be used with --csv-date or --md-date options.\n")
+        sys.exit(1)
+    target = Path(append_to)
+    if not target.parent.exists():
+        sys.stderr.write(f"\nInvalid path: {target.parent}\n")
+        sys.exit(1)
+    filters = checked_filters(filters)
+    app_data = AppData()
+    app_data.cli_append_csv(target, do_timesheet, filters)
+    return True
+
+
+def handled_stats_option(stats: str | None, since: str | None, end_date: str | None, check_rollups: bool) -> bool:
+    """Handle the command-line options for printing session statistics.
+    If there are errors in the options, print an error message and exit.
+    If options are handled, return True; otherwise, return False.
+    """
+    if check_rollups:
+        app_data = AppData()
+        sys.exit(0 if app_data.cli_check_rollups() else 1)
+
+    if stats is None:
+        if since is not None:
+            sys.stderr.write("\n--since option requires the --stats option.\n")
+            sys.exit(1)
+        return False
+
+    since_date = None
+    if since is not None:
+        since_date = get_date_from_str(since)
+        if since_date is None:
+            sys.stderr.write(f"\nInvalid date: {since}\n")
+            sys.exit(1)
+
+    until_date = None
+    if end_date is not None:
+        until_date = get_date_from_str(end_date)
+        if until_date is None:
+            sys.stderr.write(f"\nInvalid date: {end_date}\n")
+            sys.exit(1)
+
+    app_data = AppData()
+    app_data.cli_stats(stats.lower(), since_date, until_date)
+    return True
+
+
+def handled_search_option(search: str | None) -> bool:
+    """Handle the command-line option for searching the session history.
+    If options are handled, return True; otherwise, return False.
+    """
+    if search is None:
+        return False
+    if not search.strip():
+        sys.stderr.write("\n--search option requires words to search for.\n")
+        sys.exit(1)
+    app_data = AppData()
+    app_data.cli_search(search)
+    return True
+
+
+def handled_daemon_option(daemon: bool, send: str | None, team_dir: str | None, metrics_file: Path | None) -> bool:
+    """Handle the command-line options for running or controlling the timer
+    daemon. If options are handled, return True; otherwise, return False.
+    """
+    if team_dir is not None and not daemon:
+        sys.stderr.write("\n--team-dir option requires the --daemon option.\n")
+        sys.exit(1)
+
+    if not daemon and send is None:
+        return False
+
+    if team_dir is not None:
+        team_dir = Path(team_dir).expanduser().resolve()
+        if not team_dir.exists():
+            sys.stderr.write(f"\nInvalid path: {team_dir}\n")
+            sys.exit(1)
+
+    if not daemon_supported():
+        sys.stderr.write("\nThe timer daemon requires Unix domain sockets.\n")
+        sys.exit(1)
+
+    app_data = AppData()
+
+    if daemon:
+        exit_code = run_daemon(app_data, team_dir, metrics_file)
+        app_data.stop_logging()
+        if exit_code:
+            sys.exit(exit_code)
+        return True
+
+    client = DaemonClient(socket_path(app_data.data_path))
+    try:
+        response = client.command(send)
+    except DaemonError as e:
+        sys.stderr.write(f"\n{e}\n")
+        sys.exit(1)
+    finally:
+        client.close()
+    sys.stdout.write(json.dumps(response) + "\n")
+    if not response["ok"]:
+        sys.exit(1)
+    return True
+
+
+def handled_http_option(http_api: bool, http_port: int) -> bool:
+    """Handle the command-line option for running the HTTP API. If the option
+    is handled, return True; otherwise, return False.
+    """
+    if not http_api:
+        return False
+    app_data = AppData()
+    exit_code = run_http_api(app_data, http_port)
+    app_data.stop_logging()
+    if exit_code:
+        sys.exit(exit_code)
+    return True
+
+
+def handled_watch_option(watch_outputs: bool) -> bool:
+    """Handle the command-line option for writing outputs as the data file
+    changes. If the option is handled, return True; otherwise, return False.
+    """
+    if not watch_outputs:
+        return False
+    app_data = AppData()
+    exit_code = run_output_watcher(app_data)
+    app_data.stop_logging()
+    if exit_code:
+        sys.exit(exit_code)
+    return True
+
+
+def run(enable_screenshots: bool, enable_testkey: bool, attach: bool = False, metrics_file: Path | None = None) -> None:
+    app_data = AppData()
+    daemon_client = None
+    if attach:
+        daemon_client = DaemonClient(socket_path(app_data.data_path))
+        try:
+            daemon_client.connect()
+        except DaemonError as e:
+            sys.stderr.write(f"\n{e}\nStart the daemon with 'pomodorable --daemon'.\n")
+            sys.exit(1)
+    ui = PomodorableApp(
+        init_app_data=app_data,
+        enable_screenshots=enable_screenshots,
+        enable_testkey=enable_testkey,
+        daemon_client=daemon_client,
+        metrics_file=metrics_file,
+    )
     ui.run()
+    ui.app_data.stop_logging()
 
 
 CLICK_CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
@@ -108,14 +301,14 @@ CLICK_CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
     default=None,
     help="Export a range of sessions from the start date to the end date "
     "(provide the dates as YYYY-MM-DD or YY-MM-DD). This option is only valid "
-    "with the --csv-date or --md-date option.",
+    "with the --csv-date, --md-date, or --stats option.",
 )
 @click.option(
     "--timesheet",
     is_flag=True,
     default=False,
     help="Export in Time Sheet format with one row per session. "
-    "This option is only valid with the --csv-date option. "
+    "This option is only valid with the --csv-date or --append-to option. "
     "The --end-date option can be used to export a range of dates.",
 )
 @click.option(
@@ -132,7 +325,110 @@ CLICK_CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
     "The filter is specified as a string with no spaces, where each character "
     "represents a type of action to exclude. The characters are: "
     "F (Finish), P (Pause - all), R (pause w/o Reason), X (Stop),"
-    "and D (Date value if same as previous; does not exclude action).",
+    "and D (Date value if same as previous; does not exclude action). "
+    "The characters may be followed by options that select sessions, each as "
+    "';name=value': task (regular expression), min (minutes on task), "
+    "from and to (dates), after and before (HH:MM start time). "
+    "Options also apply to --timesheet exports.",
+)
+@click.option(
+    "--append-to",
+    default=None,
+    help="Append the sessions ended since the last --append-to export to the given CSV "
+    "file (in Time Sheet format with --timesheet), for scheduled exports. Only rows "
+    f"added to the data file since then are read; the position is kept in '{EXPORT_CURSORS_FILE}' "
+    "in the data folder. The --filters option can be used. Exits when finished.",
+)
+@click.option(
+    "--stats",
+    type=click.Choice(PERIODS, case_sensitive=False),
+    default=None,
+    help="Print the number of sessions (finished and stopped), focus time, and "
+    "pause time for each day, week, or task. Totals are kept in a rollup file "
+    "in the data folder, updated when each session ends. "
+    "Exits when finished.",
+)
+@click.option(
+    "--check-rollups",
+    is_flag=True,
+    default=False,
+    help="Check the rollup file used by --stats against totals computed from "
+    "the data file, and rebuild it if any day differs. Exits with status 1 if "
+    "the rollup file was rebuilt.",
+)
+@click.option(
+    "--since",
+    default=None,
+    help="Only include sessions on or after the date (provide the date as "
+    "YYYY-MM-DD or YY-MM-DD). This option is only valid with the --stats option. "
+    "The --end-date option can be used to end the range.",
+)
+@click.option(
+    "--search",
+    default=None,
+    help="Print the most recent sessions with all the given words in the task "
+    "or in a pause or stop reason (a word may be the start of a longer word). "
+    "Exits when finished.",
+)
+@click.option(
+    "--daemon",
+    is_flag=True,
+    default=False,
+    help="Run the timer without the user interface, controlled through a Unix "
+    "socket in the data folder. Use --send to control it from scripts, or "
+    "--attach to control it from the user interface. Runs until stopped with "
+    "Ctrl+C or the 'shutdown' command.",
+)
+@click.option(
+    "--team-dir",
+    default=None,
+    help="Folder for the data of named users' timers, with a subfolder for "
+    "each user. Commands prefixed with '@name ' are for that user's timer. "
+    "This option is only valid with the --daemon option.",
+)
+@click.option(
+    "--attach",
+    is_flag=True,
+    default=False,
+    help="Run the user interface as a client of the timer daemon. The daemon "
+    "keeps the session running when the user interface is closed.",
+)
+@click.option(
+    "--send",
+    default=None,
+    help="Send a command to the timer daemon and print the JSON response. "
+    "Commands are: status, start [--seconds N] [task], pause, resume [reason], "
+    "extend [reason], stop [reason], and shutdown.",
+)
+@click.option(
+    "--http-api",
+    is_flag=True,
+    default=False,
+    help="Serve the session history as JSON on localhost, at /sessions?from=&to=, "
+    "/today, and /summary?from=&to= (dates as YYYY-MM-DD or YY-MM-DD). "
+    "Runs until stopped with Ctrl+C.",
+)
+@click.option(
+    "--watch-outputs",
+    is_flag=True,
+    default=False,
+    help="Watch the data file for rows added by another instance or a sync tool, "
+    "and write the configured daily CSV, running CSV, and daily Markdown outputs "
+    "for them. Only the newly added rows are read. Runs until stopped with Ctrl+C.",
+)
+@click.option(
+    "--http-port",
+    default=API_PORT_DEFAULT,
+    show_default=True,
+    help="Port for the --http-api option.",
+)
+@click.option(
+    "--metrics-file",
+    default=None,
+    help=f"Write metrics for the Prometheus node_exporter textfile collector to the given file "
+    f"(the name must end with '{METRICS_SUFFIX}'): session counts, pause time, the timer state, "
+    "write times, and the size of the data file. The file is replaced when values change, "
+    "checked every few seconds. Used by the user interface and the --daemon option.",
 )
 @click.option(
     "--ctrl-s",
@@ -146,11 +442,44 @@ CLICK_CONTEXT_SETTINGS = {"help_option_names": ["-h", "--help"]}
     default=False,
     help="Enable [Ctrl]+[t] to run manual testing functions.",
 )
-def cli(csv_date, md_date, end_date, timesheet, export_path, filters, ctrl_s, ctrl_t) -> None:
+def cli(
+    csv_date,
+    md_date,
+    end_date,
+    timesheet,
+    export_path,
+    filters,
+    append_to,
+    stats,
+    check_rollups,
+    since,
+    search,
+    daemon,
+    team_dir,
+    attach,
+    send,
+    http_api,
+    watch_outputs,
+    http_port,
+    metrics_file,
+    ctrl_s,
+    ctrl_t,
+) -> None:
     """Handle command-line options or run the Textual User Interface."""
+    if handled_append_option(append_to, csv_date is not None or md_date is not None, timesheet, filters):
+        return
     if handled_option(csv_date, md_date, end_date, timesheet, export_path, filters):
         return
-    run(enable_screenshots=ctrl_s, enable_testkey=ctrl_t)
+    if handled_stats_option(stats, since, end_date, check_rollups):
+        return
+    if handled_search_option(search):
+        return
+    metrics_path = checked_metrics_file(metrics_file)
+    if handled_daemon_option(daemon, send, team_dir, metrics_path):
+        return
+    if handled_http_option(http_api, http_port) or handled_watch_option(watch_outputs):
+        return
+    run(enable_screenshots=ctrl_s, enable_testkey=ctrl_t, attach=attach, metrics_file=metrics_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import re
+import signal
+import socket
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from plyer import notification
+from rich import print as rprint
+
+from pomodorable.app_data import AppData
+from pomodorable.file_watcher import FileWatcher
+from pomodorable.metrics_file import MetricsFile, MetricsThread
+from pomodorable.session_timer import STATE_PAUSED, STATE_READY, STATE_RUNNING
+from pomodorable.timer_engine import TimerEngine
+
+if TYPE_CHECKING:
+    from pomodorable.app_config import AppConfig
+    from pomodorable.session_timer import SessionTimer
+
+SOCKET_NAME = "pomodorable.sock"
+CLIENT_TIMEOUT = 5.0
+CONFIG_CHECK_INTERVAL = 2.0
+
+APP_NAME = "Pomodorable"
+
+#  User names are used as folder names in the team folder.
+USER_NAME_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")
+
+
+class DaemonError(Exception):
+    """Raised when the daemon cannot be started or reached."""
+
+
+def socket_path(data_path: Path) -> Path:
+    return data_path / SOCKET_NAME
+
+
+def daemon_supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+def daemon_running(sock_path: Path) -> bool:
+    """Return True if a daemon is accepting connections on sock_path."""
+    if not sock_path.exists():
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(sock_path))
+        except OSError:
+            return False
+    return True
+
+
+def alert_finished(config: AppConfig) -> None:
+    """Show a notification and play the sound file, as configured. Errors are
+    logged, since there is no user interface to show them.
+    """
+    if config.do_notify:
+        try:
+            notification.notify(
+                title=APP_NAME,
+                message=f"{APP_NAME}:  Session finished.",
+                app_name=APP_NAME,
+                timeout=15,
+            )
+        except Exception:
+            logging.exception("Exception in notification")
+
+    if config.wav_file:
+        wav_path = Path(config.wav_file).expanduser().resolve()
+        if not wav_path.exists():
+            logging.error("Sound file not found: %s", wav_path)
+            return
+        try:
+            from playsound3 import playsound  # noqa: PLC0415
+
+            playsound(str(wav_path), block=False)
+        except Exception:
+            logging.exception("Exception in playsound")
+
+
+class TimerDaemon:
+    """Run session timers without the user interface, controlled through a
+    Unix domain socket.
+
+    Each command is one line of text, and each response is one line of JSON
+    with "ok": true and the timer status, or "ok": false and an "error".
+    Errors queued by AppData (such as an output folder that does not exist)
+    are added to the response as "errors".
+
+        status
+        start [--seconds N] [task]
+        pause
+        resume [reason]
+        extend [reason]
+        stop [reason]
+        shutdown
+
+    A command prefixed with '@name ' is for the named user's timer, which
+    writes to the 'name' folder in team_dir. Without the prefix, a command is
+    for the timer that writes through app_data.
+    """
+
+    def __init__(self, app_data: AppData, sock_path: Path | None = None, team_dir: Path | None = None) -> None:
+        self.app_data = app_data
+        self.team_dir = team_dir
+        self.engine = TimerEngine(self._app_data_for, on_finish=self._session_finished)
+        self.sock_path = sock_path or socket_path(app_data.data_path)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stopping: asyncio.Event | None = None
+
+    @property
+    def timer(self) -> SessionTimer:
+        """The timer for commands without a user name."""
+        return self.engine.get_timer("")
+
+    def timer_state(self) -> str:
+        """Return the state of the timer for commands without a user name."""
+        timer = self.engine.timers.get("")
+        return timer.state if timer else STATE_READY
+
+    def _app_data_for(self, user: str) -> AppData:
+        if not user:
+            return self.app_data
+        if self.team_dir is None:
+            raise ValueError("Timers for named users require a team folder (--team-dir).")
+        if not USER_NAME_PATTERN.fullmatch(user):
+            raise ValueError(f"Invalid user name: '{user}'")
+        user_dir = self.team_dir / user
+        user_dir.mkdir(exist_ok=True)
+        #  Called once for each user (the engine keeps the user's timer).
+        return AppData(init_data_path=user_dir, init_logging=False, data_only=True)
+
+    def _session_finished(self, user: str, _: SessionTimer) -> None:
+        #  Only the daemon's own user is alerted on this machine.
+        if not user:
+            self._loop.run_in_executor(None, alert_finished, self.app_data.config)
+
+    def handle_line(self, line: str) -> dict:
+        """Run one command and return the response."""
+        line = line.strip()
+        user = ""
+        if line.startswith("@"):
+            user, _, line = line[1:].partition(" ")
+        if line == "shutdown" and not user:
+            logging.info("daemon: shutdown")
+            self.shutdown()
+            return {"ok": True}
+        try:
+            return self.engine.handle_command(user, line)
+        except (ValueError, OSError) as e:
+            return {"ok": False, "error": str(e)}
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                response = self.handle_line(line.decode(errors="replace"))
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _watch_config(self) -> None:
+        """Reload the configuration when the file is changed (such as by the
+        Settings screen in an attached user interface).
+        """
+        watcher = FileWatcher(self.app_data.config.config_file)
+        try:
+            while True:
+                await asyncio.sleep(CONFIG_CHECK_INTERVAL)
+                if watcher.changed():
+                    self.app_data.reload_config()
+        finally:
+            watcher.close()
+
+    def shutdown(self) -> None:
+        if self._stopping:
+            self._stopping.set()
+
+    async def serve(self) -> None:
+        """Accept connections until a shutdown command or signal."""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+
+        if daemon_running(self.sock_path):
+            raise DaemonError(f"Daemon is already running: {self.sock_path}")
+        self.sock_path.unlink(missing_ok=True)
+
+        server = await asyncio.start_unix_server(self._handle_client, path=str(self.sock_path))
+        self.sock_path.chmod(0o600)
+        self.engine.start(self._loop)
+
+        signals = (signal.SIGINT, signal.SIGTERM)
+        for sig in signals:
+            with contextlib.suppress(NotImplementedError, RuntimeError, ValueError):
+                self._loop.add_signal_handler(sig, self.shutdown)
+
+        config_task = asyncio.create_task(self._watch_config())
+        logging.info("daemon: listening on '%s'", self.sock_path)
+        try:
+            async with server:
+                await self._stopping.wait()
+        finally:
+            config_task.cancel()
+            self.engine.stop()
+            for sig in signals:
+                with contextlib.suppress(NotImplementedError, RuntimeError, ValueError):
+                    self._loop.remove_signal_handler(sig)
+            self.sock_path.unlink(missing_ok=True)
+            unfinished = sum(t.state in (STATE_RUNNING, STATE_PAUSED) for t in self.engine.timers.values())
+            if unfinished:
+                logging.warning("daemon: shut down with %d unfinished sessions", unfinished)
+            logging.info("daemon: stopped")
+
+
+def run_daemon(app_data: AppData, team_dir: Path | None = None, metrics_file: Path | None = None) -> int:
+    """Run the timer daemon in the foreground. Return the exit code.
+
+    If metrics_file is set, metrics for the daemon's own timer are written
+    to it (see MetricsFile).
+    """
+    if not daemon_supported():
+        sys.stderr.write("\nThe timer daemon requires Unix domain sockets.\n")
+        return 1
+    daemon = TimerDaemon(app_data, team_dir=team_dir)
+    metrics = None
+    if metrics_file is not None:
+        metrics = MetricsThread(MetricsFile(metrics_file, app_data.data_file, daemon.timer_state))
+        metrics.start()
+    rprint(f"\nTimer daemon listening on {daemon.sock_path}\n")
+    try:
+        asyncio.run(daemon.serve())
+    except DaemonError as e:
+        sys.stderr.write(f"\n{e}\n")
+        return 1
+    finally:
+        if metrics:
+            metrics.stop()
+    return 0
+
+
+class DaemonClient:
+    """Send commands to a running TimerDaemon. The connection is opened by
+    the first command and kept open for later commands.
+    """
+
+    def __init__(self, sock_path: Path, timeout: float = CLIENT_TIMEOUT) -> None:
+        self.sock_path = sock_path
+        self.timeout = timeout
+        self._sock: socket.socket | None = None
+        self._file = None
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(str(self.sock_path))
+        except OSError as e:
+            sock.close()
+            raise DaemonError(f"Cannot connect to daemon at '{self.sock_path}': {e}") from e
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+
+    def command(self, line: str) -> dict:
+        """Send a command line and return the response."""
+        if self._sock is None:
+            self.connect()
+        #  A line break in a task or reason would end the command early.
+        line = " ".join(line.splitlines())
+        try:
+            self._file.write(line.encode() + b"\n")
+            self._file.flush()
+            reply = self._file.readline()
+        except OSError as e:
+            self.close()
+            raise DaemonError(f"Connection to daemon failed: {e}") from e
+        if not reply:
+            self.close()
+            raise DaemonError("Daemon closed the connection.")
+        return json.loads(reply)
+
+    def close(self) -> None:
+        if self._file:
+            with contextlib.suppress(OSError):
+                self._file.close()
+            self._file = None
+        if self._sock:
+            self._sock.close()
+            self._sock = None
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+#  Columns of the version 2 data file (AppData converts version 1 files when
+#  it is initialized).
+DATA_FIELDS = ("version", "started", "date", "time", "action", "message", "duration", "notes")
+
+#  Stored lines are decoded so they can be saved as JSON, and must encode
+#  back to the same bytes.
+LINE_ENCODING = "utf-8"
+LINE_ERRORS = "surrogateescape"
+
+#  Bytes read at a time when reading back from the end of the data file.
+TAIL_CHUNK = 64 * 1024
+
+#  Rows are appended in time order, but rows synced from another computer
+#  may be out of place. Reading rows by date stops only after this many rows
+#  in a row are outside the dates being read.
+OUT_OF_ORDER_ROWS = 50
+
+
+class DataLine(NamedTuple):
+    """A row of the data file, with the byte offsets of its line."""
+
+    row: dict
+    start: int
+    end: int
+    raw: bytes
+
+
+@dataclass
+class DataCursor:
+    """A position in the data file, after the line last_line.
+
+    Rows are only appended to the data file, so a cursor stays valid while
+    last_line is still found just before offset. If the file was replaced or
+    rewritten, it is not, and the file must be read from the start.
+    """
+
+    offset: int = 0
+    last_line: str = ""
+
+    @classmethod
+    def after(cls, line: DataLine) -> DataCursor:
+        return cls(line.end, line.raw.decode(LINE_ENCODING, LINE_ERRORS))
+
+    def is_valid(self, data_file: Path) -> bool:
+        if self.offset == 0:
+            return True
+        raw = self.last_line.encode(LINE_ENCODING, LINE_ERRORS)
+        if self.offset < len(raw):
+            return False
+        try:
+            with data_file.open("rb") as f:
+                f.seek(self.offset - len(raw))
+                return f.read(len(raw)) == raw
+        except OSError:
+            return False
+
+    def as_dict(self) -> dict:
+        return {"offset": self.offset, "last_line": self.last_line}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> DataCursor:
+        return cls(int(data.get("offset", 0)), str(data.get("last_line", "")))
+
+
+def iter_data_rows(data_file: Path, offset: int = 0, partial_last: bool = False) -> Iterator[DataLine]:
+    """Yield the rows of the data file from the byte offset (which must be at
+    the start of a line).
+
+    The header line is skipped. A last line without a line ending is not
+    yielded, since it may be in the middle of being written, unless
+    partial_last is True (for reading the file as it is, as an export does).
+    """
+    if not data_file.exists():
+        return
+    with data_file.open("rb") as f:
+        f.seek(offset)
+        pos = offset
+        for raw in f:
+            start = pos
+            pos += len(raw)
+            if not (raw.endswith(b"\n") or partial_last):
+                break
+            if start == 0:
+                continue
+            row = parse_line(raw)
+            if row is not None:
+                yield DataLine(row, start, pos, raw)
+
+
+def parse_line(raw: bytes) -> dict | None:
+    """Return a line of the data file as a row, or None if it has too few
+    columns.
+    """
+    values = next(csv.reader([raw.decode(LINE_ENCODING, errors="replace")]))
+    if len(values) < len(DATA_FIELDS):
+        return None
+    return dict(zip(DATA_FIELDS, values, strict=False))
+
+
+def tail_offset(data_file: Path, since_date: str) -> int:
+    """Return the offset of a line in the data file from which all rows
+    dated since_date ('YYYY-MM-DD') or later can be read.
+
+    Rows are appended in time order, so the file is read back from the end,
+    TAIL_CHUNK bytes at a time, only until OUT_OF_ORDER_ROWS rows in a row
+    with an earlier date are found. The offset is the start of the last of
+    those rows (or 0). Each chunk is split into lines once; only the part
+    line at its start is carried over to be read with the next chunk.
+    """
+    try:
+        pos = data_file.stat().st_size
+    except OSError:
+        return 0
+    earlier_rows = 0
+    with data_file.open("rb") as f:
+        carry = b""
+        while pos > 0:
+            read_size = min(TAIL_CHUNK, pos)
+            pos -= read_size
+            f.seek(pos)
+            lines = (f.read(read_size) + carry).split(b"\n")
+            line_start = pos
+            if pos > 0:
+                #  The first piece may be part of a line.
+                carry = lines[0] + b"\n"
+                line_start += len(carry)
+                lines = lines[1:]
+            #  The last piece is not a complete line.
+            starts = []
+            for raw in lines[:-1]:
+                starts.append(line_start)
+                line_start += len(raw) + 1
+            for raw, start in zip(reversed(lines[:-1]), reversed(starts), strict=True):
+                row = parse_line(raw) if start > 0 else None
+                if row is None:
+                    continue
+                if row["date"] >= since_date:
+                    earlier_rows = 0
+                    continue
+                earlier_rows += 1
+                if earlier_rows >= OUT_OF_ORDER_ROWS:
+                    return start
+    return 0
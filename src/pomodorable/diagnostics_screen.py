@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from rich.console import Group
+from rich.table import Table
+from rich.text import Text
+from textual.binding import Binding
+from textual.containers import Horizontal, Vertical, VerticalScroll
+from textual.screen import ModalScreen
+from textual.widgets import Button, Static
+
+from pomodorable.io_timing import bucket_labels, io_timings
+
+if TYPE_CHECKING:
+    from rich.console import RenderableType
+    from textual.app import ComposeResult
+
+    from pomodorable.io_timing import LatencyHistogram
+
+#  Width of the longest bar in a histogram.
+BAR_WIDTH = 40
+
+
+def histogram_table(histogram: LatencyHistogram) -> Table:
+    """Return a table with a bar for each bucket, from the first to the last
+    bucket with any times.
+    """
+    counts = histogram.bucket_counts()
+    used = [i for i, n in enumerate(counts) if n]
+    table = Table(title=histogram.label, title_justify="left", show_header=False, box=None)
+    table.add_column(justify="right")
+    table.add_column()
+    table.add_column(justify="right")
+    if not used:
+        return table
+    most = max(counts)
+    labels = bucket_labels()
+    for i in range(used[0], used[-1] + 1):
+        table.add_row(labels[i], "█" * round(counts[i] / most * BAR_WIDTH), str(counts[i]))
+    return table
+
+
+def timings_renderable(histograms: list[LatencyHistogram]) -> RenderableType:
+    if not histograms:
+        return Text("No writes have been timed yet.")
+    summary = Table()
+    summary.add_column("Operation")
+    for heading in ("Count", "Last ms", "p50 ms", "p95 ms", "Max ms"):
+        summary.add_column(heading, justify="right")
+    for h in histograms:
+        summary.add_row(
+            h.label,
+            str(h.count),
+            f"{h.last_ms:.1f}",
+            f"{h.percentile(50):.1f}",
+            f"{h.percentile(95):.1f}",
+            f"{h.max_ms():.1f}",
+        )
+    return Group(summary, *(histogram_table(h) for h in histograms))
+
+
+class DiagnosticsScreen(ModalScreen[str]):
+    """Latency histograms of the writes to the data and output files, and
+    the saves of the configuration and MRU lists (see io_timing).
+    """
+
+    BINDINGS = [
+        ("escape", "cancel", "Cancel"),
+        Binding("ctrl+s", "screenshot", "Screenshot", show=False),
+    ]
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="diag-dialog"):
+            yield Static("Diagnostics: I/O Latency", id="diag-title")
+            with VerticalScroll(id="diag-scroll"):
+                yield Static(id="diag-timings")
+            with Horizontal(classes="diag-buttons"):
+                yield Button("Refresh", id="diag-refresh")
+                yield Button("Close", id="diag-close")
+
+    def on_mount(self) -> None:
+        self.show_timings()
+        self.query_one("#diag-close").focus()
+
+    def show_timings(self) -> None:
+        self.query_one("#diag-timings", Static).update(timings_renderable(io_timings.histograms()))
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        btn = event.button.id
+        if btn == "diag-refresh":
+            event.stop()
+            self.show_timings()
+        elif btn == "diag-close":
+            event.stop()
+            self.dismiss("")
+
+    def action_screenshot(self) -> None:
+        self.app.take_screenshot()
+
+    def action_cancel(self) -> None:
+        self.dismiss("")
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from pomodorable.app_utils import get_date_from_str
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+#  A filter spec is a string of letters, optionally followed by options:
+#
+#    LETTERS[;option=value]...
+#
+#  The letters may be left out (as in "task=report;min=10").
+#  Letters exclude actions (F Finish, P Pause, R Pause without a reason,
+#  X Stop) or set a format flag (D blank repeated dates). Options exclude
+#  whole sessions:
+#
+#    task=REGEX    Task matches the regular expression (not case-sensitive).
+#    min=MINUTES   Time on task is at least MINUTES.
+#    from=DATE     Started on or after DATE (YYYY-MM-DD or YY-MM-DD).
+#    to=DATE       Started on or before DATE.
+#    after=HH:MM   Started at or after the time of day.
+#    before=HH:MM  Started before the time of day.
+
+OPTION_SEPARATOR = ";"
+
+#  Actions excluded by each letter.
+LETTER_ACTIONS = {"F": "Finish", "P": "Pause", "X": "Stop"}
+
+TIME_PATTERN = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)$")
+
+
+def split_filter_spec(spec: str) -> tuple[str, str]:
+    """Return the letters of a filter spec, and the options (with their
+    leading separator, or an empty string).
+    """
+    letters, sep, options = spec.partition(OPTION_SEPARATOR)
+    if "=" in letters:
+        #  No letters, only options.
+        return "", f"{OPTION_SEPARATOR}{spec}"
+    return letters.strip(), f"{sep}{options}"
+
+
+def normalize_filter_spec(spec: str) -> str:
+    """Return the spec with the letters in upper case. Options are not
+    changed, since a task pattern may depend on case.
+    """
+    letters, options = split_filter_spec(spec)
+    return f"{letters.upper()}{options}"
+
+
+def checked_filter_spec(spec: str) -> str:
+    """Return the spec normalized, or only its letters if the options are
+    not valid (the error is logged).
+    """
+    spec = normalize_filter_spec(spec)
+    try:
+        compile_filter(spec)
+    except ValueError as e:
+        logging.error("Ignoring filter options: %s", e)
+        return split_filter_spec(spec)[0]
+    return spec
+
+
+@dataclass(frozen=True)
+class ExportFilter:
+    """A compiled filter spec.
+
+    row_ok is a single predicate for the action letters. session_ok is a
+    single predicate for all the options, or None if there are none.
+    """
+
+    row_ok: Callable[[dict], bool]
+    session_ok: Callable[[list[dict]], bool] | None
+    blank_same_date: bool
+
+    def apply(self, data_rows: Iterable[dict], filter_rows: bool = True) -> Iterator[dict]:
+        """Yield the rows that pass the filter, reading data_rows as they
+        are needed. With filter_rows False, only whole sessions are excluded
+        (for the Time Sheet, which needs every action of a session).
+        """
+        if self.session_ok is None:
+            for row in data_rows:
+                if not filter_rows or self.row_ok(row):
+                    yield row
+            return
+
+        #  Only the rows of one session are held at a time.
+        session: list[dict] = []
+        for row in data_rows:
+            if row["action"] == "Start" and session:
+                yield from self._session_rows(session, filter_rows)
+                session = []
+            session.append(row)
+        if session:
+            yield from self._session_rows(session, filter_rows)
+
+    def _session_rows(self, session: list[dict], filter_rows: bool) -> Iterator[dict]:
+        if self.session_ok(session):
+            for row in session:
+                if not filter_rows or self.row_ok(row):
+                    yield row
+
+
+def _row_predicate(letters: str) -> Callable[[dict], bool]:
+    excluded = frozenset(action for letter, action in LETTER_ACTIONS.items() if letter in letters)
+    need_reason = "R" in letters
+
+    def row_ok(row: dict) -> bool:
+        action = row["action"]
+        if action in excluded:
+            return False
+        return not (need_reason and action == "Pause" and not row["message"])
+
+    return row_ok
+
+
+def _option_check(name: str, value: str) -> Callable[[list[dict]], bool]:
+    #  A session's first row is its Start row, except for rows before the
+    #  first Start in the data read, which are grouped without one.
+    if name == "task":
+        try:
+            pattern = re.compile(value, re.IGNORECASE)
+        except re.error as e:
+            msg = f"Invalid task pattern '{value}': {e}"
+            raise ValueError(msg) from None
+        return lambda session: session[0]["action"] == "Start" and pattern.search(session[0]["message"]) is not None
+
+    if name == "min":
+        if not value.isdigit():
+            msg = f"Invalid minimum minutes '{value}'"
+            raise ValueError(msg)
+        min_seconds = int(value) * 60
+
+        #  Imported here since output_csv imports this module.
+        from pomodorable.output_csv import iter_task_sessions  # noqa: PLC0415
+
+        def long_enough(session: list[dict]) -> bool:
+            sessions = list(iter_task_sessions(session))
+            return bool(sessions) and sessions[0].focus_seconds >= min_seconds
+
+        return long_enough
+
+    if name in {"from", "to"}:
+        day = get_date_from_str(value)
+        if day is None:
+            msg = f"Invalid date '{value}'"
+            raise ValueError(msg)
+        day_str = day.strftime("%Y-%m-%d")
+        if name == "from":
+            return lambda session: session[0]["date"] >= day_str
+        return lambda session: session[0]["date"] <= day_str
+
+    if name in {"after", "before"}:
+        match = TIME_PATTERN.match(value)
+        if match is None:
+            msg = f"Invalid time '{value}'"
+            raise ValueError(msg)
+        time_str = f"{int(match[1]):02d}:{match[2]}:00"
+        if name == "after":
+            return lambda session: session[0]["time"] >= time_str
+        return lambda session: session[0]["time"] < time_str
+
+    msg = f"Unknown filter option '{name}'"
+    raise ValueError(msg)
+
+
+@lru_cache(maxsize=32)
+def compile_filter(spec: str) -> ExportFilter:
+    """Compile a filter spec (see the top of this module) once, for use by
+    all exporters. Raise ValueError if an option is not valid.
+    """
+    letters, options = split_filter_spec(spec)
+    letters = letters.upper()
+    checks = []
+    for option in options.split(OPTION_SEPARATOR):
+        if not option.strip():
+            continue
+        name, sep, value = option.partition("=")
+        if not sep:
+            msg = f"Filter option '{option}' must be name=value"
+            raise ValueError(msg)
+        checks.append(_option_check(name.strip().lower(), value.strip()))
+
+    session_ok = None
+    if checks:
+
+        def session_ok(session: list[dict]) -> bool:
+            return all(check(session) for check in checks)
+
+    return ExportFilter(_row_predicate(letters), session_ok, "D" in letters)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+#  inotify event masks (from <sys/inotify.h>).
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+EVENT_BUFFER_SIZE = 4096
+
+
+def file_signature(path: Path) -> tuple[int, int] | None:
+    """Return (mtime_ns, size) for the file, or None if it does not exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class _Inotify:
+    """Minimal inotify watch on the directory containing a file, using the
+    C library through ctypes. Watching the directory (rather than the file)
+    also catches files replaced by a rename, as editors and scripts do.
+    """
+
+    def __init__(self, fd: int, name: bytes) -> None:
+        self.fd = fd
+        self.name = name
+
+    @classmethod
+    def create(cls, path: Path) -> _Inotify | None:
+        """Return an _Inotify for path, or None if inotify is not available."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            if libc.inotify_add_watch(fd, os.fsencode(path.parent), WATCH_MASK) < 0:
+                os.close(fd)
+                return None
+        except (OSError, AttributeError):
+            logging.exception("inotify is not available")
+            return None
+        return cls(fd, os.fsencode(path.name))
+
+    def read_events(self) -> bool:
+        """Read all pending events. Return True if any were for the watched
+        file name (or if events were lost).
+        """
+        found = False
+        while True:
+            try:
+                data = os.read(self.fd, EVENT_BUFFER_SIZE)
+            except BlockingIOError:
+                break
+            except OSError:
+                return True
+            if not data:
+                break
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                start = offset + EVENT_HEADER.size
+                name = data[start : start + length].rstrip(b"\0")
+                if name == self.name or mask & IN_Q_OVERFLOW:
+                    found = True
+                offset = start + length
+        return found
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Detect changes to a file by its (mtime, size) signature.
+
+    Where inotify is available, the file is only checked after the
+    directory reports activity for that file name, so changed() costs one
+    non-blocking read. Otherwise changed() calls stat on the file.
+    """
+
+    def __init__(self, path: Path, use_inotify: bool = True) -> None:
+        self.path = path
+        self._signature = file_signature(path)
+        self._inotify = _Inotify.create(path) if use_inotify else None
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def changed(self) -> bool:
+        """Return True if the file changed since the last call (or since the
+        watcher was created). Does not block.
+        """
+        if self._inotify is not None and not self._inotify.read_events():
+            return False
+        signature = file_signature(self.path)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return True
+
+    def wait(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for the file to change. Return True if
+        it changed. May return False before the timeout when there was
+        activity for other files in the same directory.
+        """
+        if self._inotify is not None:
+            select.select([self._inotify.fd], [], [], timeout)
+        else:
+            time.sleep(timeout)
+        return self.changed()
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
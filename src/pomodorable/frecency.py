@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import heapq
+import math
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from pomodorable.data_reader import iter_data_rows
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+#  A use counts half as much after this many seconds (two weeks).
+HALF_LIFE_SECONDS = 14 * 24 * 60 * 60
+
+#  The heap is rebuilt from the scores when it has this many times as many
+#  items as there are entries (as for the TimerEngine heap).
+HEAP_COMPACT_FACTOR = 2
+HEAP_COMPACT_MIN = 64
+
+#  Actions whose message is a task, and actions whose message is a reason.
+TASK_ACTIONS = ("Start",)
+REASON_ACTIONS = ("Pause",)
+
+
+def use_score(when: datetime) -> float:
+    """Return the score of a single use at the given time.
+
+    A score is log2 of the sum of 2 ** (t / HALF_LIFE_SECONDS) over the times
+    t of each use. Decaying all scores by the same factor does not change
+    their order, so scores never need to be recomputed as time passes, and a
+    use a half-life later is worth twice as much.
+    """
+    return when.timestamp() / HALF_LIFE_SECONDS
+
+
+def add_use(score: float | None, use: float) -> float:
+    """Return the score with another use (from use_score) added."""
+    if score is None:
+        return use
+    high, low = max(score, use), min(score, use)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def scan_history(data_file: Path) -> tuple[dict[str, float], dict[str, float]]:
+    """Return the scores of all tasks and of all pause reasons in the data
+    file, read in one pass. Stop reasons are not used, as for the MRU list.
+    """
+    tasks: dict[str, float] = {}
+    reasons: dict[str, float] = {}
+    for line in iter_data_rows(data_file):
+        row = line.row
+        text = row["message"].strip()
+        if not text:
+            continue
+        if row["action"] in TASK_ACTIONS:
+            scores = tasks
+        elif row["action"] in REASON_ACTIONS:
+            scores = reasons
+        else:
+            continue
+        try:
+            when = datetime.fromisoformat(f"{row['date']}T{row['time']}")
+        except ValueError:
+            continue
+        scores[text] = add_use(scores.get(text), use_score(when))
+    return tasks, reasons
+
+
+class FrecencyRanking:
+    """Frecency scores of entries, with a heap for getting the top entries.
+
+    When a score is raised, the new score is pushed and the old heap item is
+    left in place. Items that no longer match the entry's score are dropped
+    when they reach the top, and the heap is rebuilt when there are too many.
+    """
+
+    def __init__(self) -> None:
+        self.scores: dict[str, float] = {}
+        #  Casefolded entries, for filtering.
+        self.keys: dict[str, str] = {}
+        self._heap: list[tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def set_score(self, text: str, score: float) -> None:
+        if text not in self.keys:
+            self.keys[text] = text.casefold()
+        self.scores[text] = score
+        heapq.heappush(self._heap, (-score, text))
+        if len(self._heap) > max(HEAP_COMPACT_MIN, HEAP_COMPACT_FACTOR * len(self.scores)):
+            self._heap = [(-score, text) for text, score in self.scores.items()]
+            heapq.heapify(self._heap)
+
+    def use(self, text: str, when: datetime) -> float:
+        """Add a use of the entry at the given time. Return its new score."""
+        score = add_use(self.scores.get(text), use_score(when))
+        self.set_score(text, score)
+        return score
+
+    def top(self, count: int) -> list[str]:
+        """Return up to count entries with the highest scores, highest first.
+
+        Each entry takes O(log n) to find (plus any old items dropped on the
+        way), and the entries found are pushed back for the next call.
+        """
+        found: list[tuple[float, str]] = []
+        while self._heap and len(found) < count:
+            item = heapq.heappop(self._heap)
+            score, text = item
+            if self.scores.get(text) != -score or (found and item == found[-1]):
+                continue
+            found.append(item)
+        for item in found:
+            heapq.heappush(self._heap, item)
+        return [text for _, text in found]
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from textual.suggester import Suggester
+
+from pomodorable.frecency import add_use, use_score
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+
+class _TrieNode:
+    __slots__ = ("best", "best_score", "children", "edge")
+
+    def __init__(self, edge: str) -> None:
+        #  Characters on the edge from the parent node.
+        self.edge = edge
+        #  Child nodes by the first character of their edge.
+        self.children: dict[str, _TrieNode] = {}
+        #  Highest scoring entry below this node.
+        self.best = ""
+        self.best_score = float("-inf")
+
+
+class PrefixTrie:
+    """Radix tree of casefolded entries, where each node keeps the highest
+    scoring entry below it, so the best completion of a prefix is found in
+    time proportional to the length of the prefix.
+
+    Scores may only increase (as frecency scores do when an entry is used),
+    which keeps each node's best entry correct when an entry is added again.
+    """
+
+    def __init__(self) -> None:
+        self._root = _TrieNode("")
+        self.scores: dict[str, float] = {}
+
+    @classmethod
+    def from_scores(cls, scores: dict[str, float]) -> PrefixTrie:
+        """Return a trie of the entries with the given scores (see frecency)."""
+        trie = cls()
+        for text, score in scores.items():
+            trie.add(text, score)
+        return trie
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def add(self, text: str, score: float) -> None:
+        """Add the entry, or raise its score if it is already in the trie."""
+        if score <= self.scores.get(text, float("-inf")):
+            return
+        self.scores[text] = score
+        key = text.casefold()
+        node = self._root
+        self._set_best(node, text, score)
+        i = 0
+        while i < len(key):
+            child = node.children.get(key[i])
+            if child is None:
+                child = _TrieNode(key[i:])
+                node.children[key[i]] = child
+                self._set_best(child, text, score)
+                return
+            common = 0
+            limit = min(len(child.edge), len(key) - i)
+            while common < limit and child.edge[common] == key[i + common]:
+                common += 1
+            if common < len(child.edge):
+                #  Split the edge at the end of the common part.
+                middle = _TrieNode(child.edge[:common])
+                middle.best = child.best
+                middle.best_score = child.best_score
+                child.edge = child.edge[common:]
+                middle.children[child.edge[0]] = child
+                node.children[key[i]] = middle
+                child = middle
+            node = child
+            self._set_best(node, text, score)
+            i += common
+
+    @staticmethod
+    def _set_best(node: _TrieNode, text: str, score: float) -> None:
+        if score > node.best_score:
+            node.best = text
+            node.best_score = score
+
+    def best(self, prefix: str) -> str | None:
+        """Return the highest scoring entry starting with the casefolded
+        prefix, or None.
+        """
+        node = self._root
+        i = 0
+        while i < len(prefix):
+            child = node.children.get(prefix[i])
+            if child is None:
+                return None
+            rest = prefix[i:]
+            if rest.startswith(child.edge):
+                i += len(child.edge)
+            elif not child.edge.startswith(rest):
+                return None
+            else:
+                i = len(prefix)
+            node = child
+        return node.best or None
+
+
+class HistorySuggester(Suggester):
+    """Suggest the completion of an input from past entries, ranked by
+    frecency (how often and how recently each entry was used).
+    """
+
+    def __init__(self) -> None:
+        #  The cache is cleared when entries are added.
+        super().__init__(use_cache=True, case_sensitive=False)
+        self.trie = PrefixTrie()
+
+    def set_trie(self, trie: PrefixTrie) -> None:
+        self.trie = trie
+        self.cache.clear()
+
+    def add(self, text: str, when: datetime) -> None:
+        """Add a use of the entry at the given time."""
+        text = text.strip()
+        if not text:
+            return
+        self.trie.add(text, add_use(self.trie.scores.get(text), use_score(when)))
+        self.cache.clear()
+
+    async def get_suggestion(self, value: str) -> str | None:
+        if not value:
+            return None
+        return self.trie.best(value)
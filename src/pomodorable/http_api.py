@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import sys
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qs, urlsplit
+
+from rich import print as rprint
+
+from pomodorable.app_utils import get_date_from_str
+from pomodorable.output_csv import iter_task_sessions
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from pomodorable.app_data import AppData
+
+API_HOST = "127.0.0.1"
+API_PORT_DEFAULT = 8787
+
+#  Sessions per chunk of a streamed response.
+STREAM_BATCH = 200
+
+REQUEST_TIMEOUT = 10.0
+MAX_REQUEST_LINE = 8192
+MAX_HEADERS = 100
+
+#  Host names accepted in the Host header. A page on another domain that
+#  resolves to 127.0.0.1 (DNS rebinding) still sends its own host name.
+ALLOWED_HOSTS = {"localhost", "127.0.0.1"}
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    500: "Internal Server Error",
+}
+
+
+def session_as_dict(session) -> dict:
+    """Return a TaskSession as a dictionary for JSON output."""
+    data = session.as_dict()
+    data["finished"] = session.finished
+    data["stopped"] = session.stopped
+    data["extend_minutes"] = int(session.extend_seconds / 60)
+    return data
+
+
+def add_to_totals(totals_dict: dict, session: dict) -> None:
+    totals_dict["sessions"] += 1
+    totals_dict["finished"] += session["finished"]
+    totals_dict["stopped"] += session["stopped"]
+    totals_dict["task_minutes"] += session["task_minutes"]
+    totals_dict["pause_minutes"] += session["pause_minutes"]
+
+
+def totals(sessions: Iterable[dict]) -> dict:
+    result = {"sessions": 0, "finished": 0, "stopped": 0, "task_minutes": 0, "pause_minutes": 0}
+    for session in sessions:
+        add_to_totals(result, session)
+    return result
+
+
+def iter_sessions(app_data: AppData, from_date: datetime | None, to_date: datetime | None) -> Iterator[dict]:
+    """Yield the sessions started from from_date to to_date (inclusive; None
+    for no limit) as they are read from the data file, in file order.
+
+    Only the rows of the date range are read (see AppData.iter_rows_for_dates),
+    and no more than one session is held at a time. The rows of the day after
+    to_date are read too, for the end of a session that runs past midnight.
+    """
+    end_date = None if to_date is None else to_date + timedelta(days=1)
+    since = "" if from_date is None else from_date.strftime("%Y-%m-%d")
+    until = "9999-12-31" if to_date is None else to_date.strftime("%Y-%m-%d")
+    for session in iter_task_sessions(app_data.iter_rows_for_dates(from_date, end_date)):
+        data = session_as_dict(session)
+        if since <= data["date"] <= until:
+            yield data
+
+
+def host_allowed(host: str | None) -> bool:
+    """Return True if the Host header value (with optional port) names localhost."""
+    if not host:
+        return False
+    name = host.rsplit(":", 1)[0] if host.count(":") == 1 else host
+    return name.lower() in ALLOWED_HOSTS
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def date_param(query: dict, name: str) -> datetime | None:
+    """Return the query parameter as a date, or None if not given."""
+    values = query.get(name)
+    if not values:
+        return None
+    value = get_date_from_str(values[0])
+    if value is None:
+        raise HttpError(400, f"Invalid date for '{name}': {values[0]}")
+    return value
+
+
+class HttpApi:
+    """Read-only JSON API for the session history in the data file.
+
+        GET /sessions?from=YYYY-MM-DD&to=YYYY-MM-DD
+        GET /today
+        GET /summary?from=YYYY-MM-DD&to=YYYY-MM-DD
+
+    Each request reads only the rows of its date range from the data file,
+    on a worker thread. /sessions is streamed in chunks as the file is read,
+    so a large range is not held in memory. The server only binds to
+    localhost, and rejects requests with a Host header naming any other host.
+    """
+
+    def __init__(self, app_data: AppData) -> None:
+        self.app_data = app_data
+
+    async def serve(self, port: int = API_PORT_DEFAULT, ready: asyncio.Future | None = None) -> None:
+        """Serve requests until cancelled. If given, 'ready' is set to the
+        port number once the server is listening (useful with port 0).
+        """
+        server = await asyncio.start_server(self._handle_client, host=API_HOST, port=port)
+        bound_port = server.sockets[0].getsockname()[1]
+        logging.info("http api: listening on %s:%d", API_HOST, bound_port)
+        if ready is not None:
+            ready.set_result(bound_port)
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            method, target = await asyncio.wait_for(self._read_request(reader), REQUEST_TIMEOUT)
+            await self._respond(writer, method, target)
+        except HttpError as e:
+            await self._send_json(writer, e.status, {"error": str(e)})
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception:
+            logging.exception("http api: request failed")
+            with contextlib.suppress(ConnectionError):
+                await self._send_json(writer, 500, {"error": "Internal server error"})
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple[str, str]:
+        try:
+            request_line = await reader.readline()
+        except ValueError as e:
+            #  The line is longer than the reader's buffer limit.
+            raise HttpError(400, "Request line too long") from e
+        if len(request_line) > MAX_REQUEST_LINE:
+            raise HttpError(400, "Request line too long")
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:  # noqa: PLR2004
+            raise HttpError(400, "Malformed request")
+        #  Only the Host header is used, but all must be read before responding.
+        host = None
+        for _ in range(MAX_HEADERS):
+            try:
+                line = await reader.readline()
+            except ValueError as e:
+                raise HttpError(400, "Header line too long") from e
+            if line in {b"\r\n", b"\n", b""}:
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "host":
+                host = value.strip()
+        else:
+            raise HttpError(400, "Too many headers")
+        if not host_allowed(host):
+            raise HttpError(403, f"Host not allowed: {host}")
+        return parts[0], parts[1]
+
+    async def _respond(self, writer: asyncio.StreamWriter, method: str, target: str) -> None:
+        if method not in {"GET", "HEAD"}:
+            raise HttpError(405, f"Method not allowed: {method}")
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        head_only = method == "HEAD"
+
+        if url.path == "/sessions":
+            sessions = iter_sessions(self.app_data, date_param(query, "from"), date_param(query, "to"))
+            await self._send_stream(writer, self._stream_array(sessions), head_only)
+        elif url.path == "/today":
+            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            sessions = await asyncio.to_thread(lambda: list(iter_sessions(self.app_data, today, today)))
+            await self._send_json(
+                writer,
+                200,
+                {"date": today.strftime("%Y-%m-%d"), "totals": totals(sessions), "sessions": sessions},
+                head_only,
+            )
+        elif url.path == "/summary":
+            sessions = iter_sessions(self.app_data, date_param(query, "from"), date_param(query, "to"))
+            await self._send_json(writer, 200, await asyncio.to_thread(self._summary, sessions), head_only)
+        else:
+            raise HttpError(404, f"Not found: {url.path}")
+
+    @staticmethod
+    def _summary(sessions: Iterable[dict]) -> dict:
+        """Return the totals of the sessions, and of each day. Only the
+        totals are kept as the sessions are read.
+        """
+        all_days = totals([])
+        by_date: dict[str, dict] = {}
+        for session in sessions:
+            add_to_totals(all_days, session)
+            add_to_totals(by_date.setdefault(session["date"], totals([])), session)
+        return {
+            "totals": all_days,
+            "days": [{"date": date, **by_date[date]} for date in sorted(by_date)],
+        }
+
+    @staticmethod
+    def _stream_array(sessions: Iterator[dict]) -> Iterator[bytes]:
+        """Yield the JSON array of sessions in chunks of STREAM_BATCH."""
+        yield b"["
+        first = True
+        while batch := list(islice(sessions, STREAM_BATCH)):
+            text = ",".join(json.dumps(s) for s in batch)
+            yield (text if first else f",{text}").encode()
+            first = False
+        yield b"]\n"
+
+    @staticmethod
+    def _headers(status: int, extra: str) -> bytes:
+        return (
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"{extra}"
+            "Connection: close\r\n\r\n"
+        ).encode("latin-1")
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, data: dict, head_only: bool = False) -> None:
+        body = json.dumps(data).encode() + b"\n"
+        writer.write(self._headers(status, f"Content-Length: {len(body)}\r\n"))
+        if not head_only:
+            writer.write(body)
+        await writer.drain()
+
+    async def _send_stream(self, writer: asyncio.StreamWriter, chunks: Iterator[bytes], head_only: bool) -> None:
+        writer.write(self._headers(200, "Transfer-Encoding: chunked\r\n"))
+        if not head_only:
+            #  Each chunk is read from the data file on a worker thread.
+            while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                writer.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+                #  Wait for the client to read each chunk, so a slow client
+                #  does not make the whole response buffer in memory.
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def run_http_api(app_data: AppData, port: int) -> int:
+    """Run the HTTP API in the foreground until interrupted. Return the exit code."""
+    api = HttpApi(app_data)
+    rprint(f"\nServing session history at http://{API_HOST}:{port}/ (Ctrl+C to stop)\n")
+    try:
+        asyncio.run(api.serve(port))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        sys.stderr.write(f"\nCannot start HTTP API on port {port}: {e}\n")
+        return 1
+    return 0
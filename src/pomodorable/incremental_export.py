@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import logging
+from typing import TYPE_CHECKING
+
+from pomodorable.data_reader import DataCursor, iter_data_rows
+from pomodorable.output_csv import write_to_sessions_csv, write_to_timesheet_csv
+from pomodorable.rollups import END_ACTIONS
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+EXPORT_CURSORS_FILE = "pomodorable-exports.json"
+EXPORT_CURSORS_VERSION = 1
+
+
+def row_stamp(row: dict) -> str:
+    """Return the date and time of a row as 'YYYY-MM-DDTHH:MM:SS'."""
+    return f"{row['date']}T{row['time']}"
+
+
+class ExportProgress:
+    """Where an export target is up to: a cursor after the last row read, and
+    the last session exported (the watermark), as the date and time of the
+    row that ended it and its 'started' value.
+
+    The cursor is used to seek to the new rows. If the data file was rotated
+    or rewritten, so the cursor is not valid, the file is read from the start
+    and sessions up to the watermark are skipped, so no session is exported
+    twice. Whole sessions are compared, so a session started in the same
+    second another ended is not skipped.
+    """
+
+    def __init__(self, cursor: DataCursor, last_row: str = "", last_started: str = "") -> None:
+        self.cursor = cursor
+        self.last_row = last_row
+        self.last_started = last_started
+        self.sessions = 0
+
+    def as_dict(self) -> dict:
+        return {"cursor": self.cursor.as_dict(), "last_row": self.last_row, "last_started": self.last_started}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> ExportProgress:
+        return cls(
+            DataCursor.from_dict(data.get("cursor", {})),
+            str(data.get("last_row", "")),
+            str(data.get("last_started", "")),
+        )
+
+    def exported(self, end_row: dict) -> bool:
+        """Return True if the session ended by end_row is at or before the
+        watermark.
+        """
+        return (row_stamp(end_row), end_row["started"]) <= (self.last_row, self.last_started)
+
+
+class IncrementalExport:
+    """Append the sessions added to the data file since the last export to
+    each target file, keeping the progress of each target in a JSON file.
+
+    Only ended sessions are exported (a session that is still running is
+    exported by a later run), so the rows of a session are not split between
+    runs.
+    """
+
+    def __init__(self, data_file: Path, cursors_file: Path) -> None:
+        self.data_file = data_file
+        self.cursors_file = cursors_file
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            data = json.loads(self.cursors_file.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError):
+            logging.exception("Cannot read export cursors file '%s'", self.cursors_file)
+            return {}
+        if data.get("version") != EXPORT_CURSORS_VERSION:
+            return {}
+        return data["targets"]
+
+    def _save(self, targets: dict[str, dict]) -> None:
+        data = {"version": EXPORT_CURSORS_VERSION, "targets": targets}
+        tmp_file = self.cursors_file.with_suffix(".tmp")
+        try:
+            tmp_file.write_text(json.dumps(data, indent=2))
+            tmp_file.replace(self.cursors_file)
+        except OSError:
+            logging.exception("Cannot write export cursors file '%s'", self.cursors_file)
+
+    def _new_rows(self, progress: ExportProgress, skip_exported: bool) -> Iterator[dict]:
+        """Yield the rows of the sessions ended after the progress cursor,
+        moving the cursor (and watermark) past each session as it is yielded.
+
+        If skip_exported is True (when reading from the start after the data
+        file was rewritten), sessions up to the watermark are skipped.
+        """
+        pending: list[dict] = []
+        for line in iter_data_rows(self.data_file, progress.cursor.offset):
+            row = line.row
+            pending.append(row)
+            if row["action"] not in END_ACTIONS:
+                continue
+            if skip_exported and progress.exported(row):
+                #  Already exported before the data file was rewritten.
+                pending = []
+                progress.cursor = DataCursor.after(line)
+                continue
+            yield from pending
+            pending = []
+            progress.cursor = DataCursor.after(line)
+            progress.last_row = row_stamp(row)
+            progress.last_started = row["started"]
+            progress.sessions += 1
+
+    def export(self, target: Path, filters: str, do_timesheet: bool) -> int:
+        """Append the sessions ended since the last export to target, in the
+        Sessions CSV or Time Sheet layout. Return the number of sessions read
+        (including any excluded by the filters).
+        """
+        key = str(target.resolve())
+        targets = self._load()
+        progress = ExportProgress.from_dict(targets.get(key, {}))
+        skip_exported = False
+        if not target.exists():
+            #  A new target, or one that was removed, gets all sessions.
+            progress = ExportProgress(DataCursor())
+        elif not progress.cursor.is_valid(self.data_file):
+            logging.info("Data file changed. Reading all rows after %s for '%s'.", progress.last_row, target)
+            progress.cursor = DataCursor()
+            skip_exported = bool(progress.last_row)
+
+        rows = self._new_rows(progress, skip_exported)
+        if do_timesheet:
+            write_to_timesheet_csv(target, rows, filters)
+        else:
+            write_to_sessions_csv(target, filters, rows)
+
+        if targets.get(key) != progress.as_dict():
+            targets[key] = progress.as_dict()
+            self._save(targets)
+        return progress.sessions
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+OP_DATA_CSV = "data_csv"
+OP_RUNNING_CSV = "running_csv"
+OP_DAILY_CSV = "daily_csv"
+OP_DAILY_MD = "daily_md"
+OP_CONFIG = "config"
+OP_MRU = "mru"
+
+OP_LABELS = {
+    OP_DATA_CSV: "Data CSV append",
+    OP_RUNNING_CSV: "Running CSV",
+    OP_DAILY_CSV: "Daily CSV",
+    OP_DAILY_MD: "Daily Markdown",
+    OP_CONFIG: "Config save",
+    OP_MRU: "MRU save",
+}
+
+#  Upper bounds (milliseconds) of the histogram buckets. The last bucket is
+#  for times over the last bound.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+#  Number of the latest times kept for each operation.
+LATENCY_WINDOW = 500
+
+
+def bucket_labels() -> list[str]:
+    return [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+
+
+def bucket_index(ms: float) -> int:
+    return bisect.bisect_left(LATENCY_BUCKETS_MS, ms)
+
+
+class LatencyHistogram:
+    """Times of the latest LATENCY_WINDOW calls of an operation, with the
+    count, total time, and bucket counts of all calls.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.count = 0
+        self.total_ms = 0.0
+        self.last_ms = 0.0
+        self.total_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._window: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    @property
+    def label(self) -> str:
+        return OP_LABELS.get(self.name, self.name)
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.last_ms = ms
+        self.total_buckets[bucket_index(ms)] += 1
+        self._window.append(ms)
+
+    def bucket_counts(self) -> list[int]:
+        """Return the number of times in the window in each bucket (see
+        bucket_labels).
+        """
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for ms in self._window:
+            counts[bucket_index(ms)] += 1
+        return counts
+
+    def percentile(self, pct: float) -> float:
+        """Return the time at the percentile of the times in the window."""
+        if not self._window:
+            return 0.0
+        ordered = sorted(self._window)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def max_ms(self) -> float:
+        return max(self._window, default=0.0)
+
+    def summary(self) -> str:
+        return (
+            f"{self.label}: count={self.count} last={self.last_ms:.1f}ms p50={self.percentile(50):.1f}ms "
+            f"p95={self.percentile(95):.1f}ms max={self.max_ms():.1f}ms"
+        )
+
+
+class IoTimings:
+    """Latency histograms of the writes to the data file and output files,
+    and the saves of the configuration and MRU lists.
+    """
+
+    def __init__(self) -> None:
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(name)
+            histogram.add(seconds * 1000)
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        """Record the time taken by the body of the with statement, whether
+        or not it raises an exception.
+        """
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0)
+
+    def histograms(self) -> list[LatencyHistogram]:
+        """Return the histograms, in the order of OP_LABELS, then by name."""
+        order = list(OP_LABELS)
+        with self._lock:
+            histograms = list(self._histograms.values())
+        return sorted(histograms, key=lambda h: (order.index(h.name) if h.name in order else len(order), h.name))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms = {}
+
+    def log_summary(self) -> None:
+        """Write a line for each operation timed to the log."""
+        for histogram in self.histograms():
+            buckets = " ".join(
+                f"{label}:{n}" for label, n in zip(bucket_labels(), histogram.bucket_counts(), strict=True) if n
+            )
+            logging.info("I/O timing %s [%s]", histogram.summary(), buckets)
+
+
+#  Shared by the process, so writes by AppData, AppConfig, and MRUList are
+#  recorded together.
+io_timings = IoTimings()
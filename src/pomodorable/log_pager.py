@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import gzip
+from typing import TYPE_CHECKING
+
+from pomodorable.app_logging import ARCHIVE_SUFFIX
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+LOG_PAGE_SIZE = 100
+READ_BLOCK_SIZE = 8192
+
+#  Messages shown in the app's log panel are written to the log file by
+#  PomodorableApp.say, so the formatter puts this text before the message.
+SAY_MARKER = " (ui say): "
+
+
+class LogPager:
+    """Read pages of log panel entries from a log file or archive.
+
+    Pages of a log file are read backward from a byte offset, so only the
+    current page is held in memory no matter how large the log file gets.
+    A compressed archive (from a previous day) cannot be read backward, so
+    its entries are read once and the offsets are entry numbers.
+    """
+
+    def __init__(self, log_file: Path, page_size: int = LOG_PAGE_SIZE) -> None:
+        self.log_file = log_file
+        self.page_size = page_size
+        self._marker = SAY_MARKER.encode()
+        self._archive_entries: list[str] | None = None
+
+    def _as_entry(self, line: bytes) -> str | None:
+        """Return the log line as 'YYYY-MM-DD HH:MM:SS - message', or None if
+        the line was not written by PomodorableApp.say.
+        """
+        head, sep, msg = line.partition(self._marker)
+        if not sep:
+            return None
+        # The timestamp is the first 19 characters (asctime without msecs).
+        stamp = head[:19].decode(errors="replace")
+        text = msg.rstrip(b"\r\n").decode(errors="replace")
+        return f"{stamp} - {text}"
+
+    def read_page(self, before: int | None = None) -> tuple[list[str], int]:
+        """Return a tuple of (entries, start_offset).
+
+        entries is a list of up to page_size entries, oldest first, from the
+        lines that end at or before the byte offset 'before' (the end of the
+        file if None).
+
+        start_offset is the offset of the first line read. Pass it as 'before'
+        to read the next older page. When it is 0 there are no older entries.
+        """
+        if not self.log_file.exists():
+            return [], 0
+        if self.log_file.name.endswith(ARCHIVE_SUFFIX):
+            return self._read_archive_page(before)
+
+        entries = []
+        with self.log_file.open("rb") as f:
+            pos = f.seek(0, 2) if before is None else before
+            start = pos
+            pending = b""
+            while pos > 0 and len(entries) < self.page_size:
+                size = min(READ_BLOCK_SIZE, pos)
+                pos -= size
+                f.seek(pos)
+                pending = f.read(size) + pending
+
+                #  Take complete lines from the end of the pending bytes. The
+                #  first line is only complete when the start of the file has
+                #  been read.
+                while pending and len(entries) < self.page_size:
+                    nl = pending.rfind(b"\n", 0, len(pending) - 1)
+                    if nl < 0 and pos > 0:
+                        break
+                    line = pending[nl + 1 :]
+                    pending = pending[: nl + 1]
+                    start = pos + nl + 1
+                    entry = self._as_entry(line)
+                    if entry is not None:
+                        entries.append(entry)
+
+        entries.reverse()
+        return entries, start
+
+    def _read_archive_page(self, before: int | None) -> tuple[list[str], int]:
+        if self._archive_entries is None:
+            with gzip.open(self.log_file, "rb") as f:
+                self._archive_entries = [entry for line in f if (entry := self._as_entry(line)) is not None]
+        end = len(self._archive_entries) if before is None else before
+        start = max(0, end - self.page_size)
+        return self._archive_entries[start:end], start
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from textual.binding import Binding
+from textual.containers import Horizontal, Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Button, RichLog, Static
+
+from pomodorable.log_pager import LogPager
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from textual.app import ComposeResult
+
+
+class LogScreen(ModalScreen[str]):
+    """Scrollback for the log panel, paged from the log files.
+
+    log_files is the current log file followed by the files and archives of
+    previous days, newest first. After the oldest page of one file, Older
+    shows the newest page of the next file.
+    """
+
+    def __init__(self, log_files: list[Path]) -> None:
+        self.log_files = log_files
+        self.pager = LogPager(log_files[0])
+        #  Stack of (file index, 'before' offset) for the pages shown, newest
+        #  page first. None is the end of the file.
+        self._pages: list[tuple[int, int | None]] = []
+        self._next_before: int = 0
+        super().__init__()
+
+    BINDINGS = [
+        ("escape", "cancel", "Cancel"),
+        Binding("ctrl+s", "screenshot", "Screenshot", show=False),
+    ]
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="log-dialog"):
+            yield Static("Log History", id="log-title")
+            yield RichLog(id="log-history", markup=False)
+            with Horizontal(classes="log-buttons"):
+                yield Button("Older", id="log-older")
+                yield Button("Newer", id="log-newer")
+                yield Button("Close", id="log-close")
+
+    def on_mount(self) -> None:
+        self.show_page(0, None)
+        self.query_one("#log-close").focus()
+
+    def _has_older(self) -> bool:
+        return self._next_before > 0 or self._pages[-1][0] + 1 < len(self.log_files)
+
+    def show_page(self, file_index: int, before: int | None) -> None:
+        log_file = self.log_files[file_index]
+        if self.pager.log_file != log_file:
+            #  Only the pager of the file shown is kept.
+            self.pager = LogPager(log_file)
+        entries, self._next_before = self.pager.read_page(before)
+        self._pages.append((file_index, before))
+        title = "Log History" if file_index == 0 else f"Log History ({log_file.name})"
+        self.query_one("#log-title", Static).update(title)
+        log = self.query_one("#log-history", RichLog)
+        log.clear()
+        if not entries:
+            log.write("(no entries)")
+        for entry in entries:
+            log.write(entry)
+        self.query_one("#log-older").disabled = not self._has_older()
+        self.query_one("#log-newer").disabled = len(self._pages) < 2  # noqa: PLR2004
+
+    def show_older(self) -> None:
+        file_index = self._pages[-1][0]
+        if self._next_before > 0:
+            self.show_page(file_index, self._next_before)
+        elif file_index + 1 < len(self.log_files):
+            self.show_page(file_index + 1, None)
+
+    def show_newer(self) -> None:
+        if len(self._pages) > 1:
+            self._pages.pop()
+            self.show_page(*self._pages.pop())
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        btn = event.button.id
+        if btn == "log-older":
+            event.stop()
+            self.show_older()
+        elif btn == "log-newer":
+            event.stop()
+            self.show_newer()
+        elif btn == "log-close":
+            event.stop()
+            self.dismiss("")
+
+    def action_screenshot(self) -> None:
+        self.app.take_screenshot()
+
+    def action_cancel(self) -> None:
+        self.dismiss("")
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+import os
+import threading
+from typing import TYPE_CHECKING
+
+from pomodorable.app_utils import hms_to_sec
+from pomodorable.data_reader import DataCursor, iter_data_rows
+from pomodorable.io_timing import LATENCY_BUCKETS_MS, io_timings
+from pomodorable.session_timer import STATE_PAUSED, STATE_READY, STATE_RUNNING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+METRICS_SUFFIX = ".prom"
+
+#  Seconds between checks for changed metrics. The file is only written when
+#  a value has changed.
+METRICS_INTERVAL = 10.0
+
+METRICS_STATES = (STATE_READY, STATE_RUNNING, STATE_PAUSED)
+
+#  Data file actions counted, and the metric for each.
+ACTION_METRICS = {
+    "Start": "pomodorable_sessions_started_total",
+    "Finish": "pomodorable_sessions_finished_total",
+    "Stop": "pomodorable_sessions_stopped_total",
+}
+
+
+def metric_lines(name: str, kind: str, help_text: str, samples: list[tuple[str, float]]) -> list[str]:
+    """Return the lines for a metric in the Prometheus text format. Each
+    sample is (labels, value), where labels is '' or '{name="value",...}'.
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+    return lines
+
+
+def write_seconds_lines() -> list[str]:
+    """Return the lines for the write latency histogram of each operation in
+    io_timings, with cumulative buckets in seconds.
+    """
+    name = "pomodorable_write_seconds"
+    lines = [
+        f"# HELP {name} Time taken to write to the data file, output files, configuration, and MRU lists.",
+        f"# TYPE {name} histogram",
+    ]
+    for histogram in io_timings.histograms():
+        target = f'target="{histogram.name}"'
+        buckets = list(histogram.total_buckets)
+        total = 0
+        for bound, n in zip((*LATENCY_BUCKETS_MS, None), buckets, strict=True):
+            total += n
+            le = "+Inf" if bound is None else str(bound / 1000)
+            lines.append(f'{name}_bucket{{{target},le="{le}"}} {total}')
+        lines.append(f"{name}_sum{{{target}}} {histogram.total_ms / 1000}")
+        lines.append(f"{name}_count{{{target}}} {total}")
+    return lines
+
+
+class MetricsFile:
+    """Write session counts, the timer state, write latencies, and the size
+    of the data file to a file for the Prometheus node_exporter textfile
+    collector.
+
+    The counts are totals from the data file, so they do not reset when the
+    application is restarted. Only the rows appended since the last check
+    are read. The file is replaced atomically, and only when a value has
+    changed, so an idle timer does not write to the disk.
+    """
+
+    def __init__(self, metrics_file: Path, data_file: Path, get_state: Callable[[], str]) -> None:
+        self.metrics_file = metrics_file
+        self.data_file = data_file
+        self.get_state = get_state
+        self._cursor = DataCursor()
+        self._counts: dict[str, int] = {}
+        self._pause_seconds = 0
+        self._rows = 0
+        self._last_text = ""
+        #  A failed write is only logged until the next successful one.
+        self._write_failed = False
+
+    def _read_rows(self) -> None:
+        """Add the rows appended to the data file since the last read to the
+        totals. If the data file was replaced or rewritten, count again.
+        """
+        if not self._cursor.is_valid(self.data_file):
+            self._cursor = DataCursor()
+            self._counts = {}
+            self._pause_seconds = 0
+            self._rows = 0
+        for line in iter_data_rows(self.data_file, self._cursor.offset):
+            row = line.row
+            self._rows += 1
+            if row["action"] in ACTION_METRICS:
+                self._counts[row["action"]] = self._counts.get(row["action"], 0) + 1
+            elif row["action"] == "Pause" and row["duration"]:
+                with contextlib.suppress(ValueError):
+                    self._pause_seconds += hms_to_sec(row["duration"])
+            self._cursor = DataCursor.after(line)
+
+    def metrics_text(self) -> str:
+        self._read_rows()
+        state = self.get_state()
+        lines = []
+        for action, name in ACTION_METRICS.items():
+            help_text = f"Sessions with a {action} action in the data file."
+            lines.extend(metric_lines(name, "counter", help_text, [("", self._counts.get(action, 0))]))
+        lines.extend(
+            metric_lines(
+                "pomodorable_pause_seconds_total",
+                "counter",
+                "Seconds paused, from the Pause actions in the data file.",
+                [("", self._pause_seconds)],
+            )
+        )
+        lines.extend(
+            metric_lines(
+                "pomodorable_state",
+                "gauge",
+                "Current state of the timer (1 for the current state).",
+                [(f'{{state="{s}"}}', int(s == state)) for s in METRICS_STATES],
+            )
+        )
+        size = self.data_file.stat().st_size if self.data_file.exists() else 0
+        lines.extend(metric_lines("pomodorable_data_file_bytes", "gauge", "Size of the data file.", [("", size)]))
+        lines.extend(
+            metric_lines(
+                "pomodorable_data_file_rows", "gauge", "Rows in the data file (not the header).", [("", self._rows)]
+            )
+        )
+        lines.extend(write_seconds_lines())
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> bool:
+        """Write the metrics file if any value changed since it was last
+        written. Return True if the file was written.
+        """
+        text = self.metrics_text()
+        if text == self._last_text:
+            return False
+        #  The collector only reads files ending in .prom, so it never sees
+        #  the temporary file.
+        tmp_file = self.metrics_file.with_name(f"{self.metrics_file.name}.{os.getpid()}.tmp")
+        try:
+            tmp_file.write_text(text)
+            tmp_file.replace(self.metrics_file)
+        except OSError:
+            if not self._write_failed:
+                logging.exception("Cannot write metrics file '%s'", self.metrics_file)
+            self._write_failed = True
+            tmp_file.unlink(missing_ok=True)
+            return False
+        self._last_text = text
+        self._write_failed = False
+        return True
+
+    def _try_write(self) -> None:
+        """Write the metrics, logging any error (such as from reading the
+        data file) instead of raising it, so the run loop keeps going.
+        """
+        try:
+            self.write()
+        except Exception:
+            if not self._write_failed:
+                logging.exception("Cannot write metrics file '%s'", self.metrics_file)
+            self._write_failed = True
+
+    def run(self, stop: threading.Event, interval: float = METRICS_INTERVAL) -> None:
+        """Write the metrics now and after each interval, until stop is set,
+        then once more for the final state.
+        """
+        logging.info("Writing metrics to '%s'", self.metrics_file)
+        self._try_write()
+        while not stop.wait(interval):
+            self._try_write()
+        self._try_write()
+
+
+class MetricsThread:
+    """Run a MetricsFile on a background thread."""
+
+    def __init__(self, metrics: MetricsFile) -> None:
+        self.metrics = metrics
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=metrics.run, args=(self._stop,), name="metrics-file", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
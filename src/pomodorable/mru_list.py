@@ -1,7 +1,11 @@
 import csv
 import logging
+from datetime import datetime
 from pathlib import Path
 
+from pomodorable.frecency import HEAP_COMPACT_FACTOR, HEAP_COMPACT_MIN, FrecencyRanking
+from pomodorable.io_timing import OP_MRU, io_timings
+
 MRU_LIST_MAX = 20
 
 
@@ -13,11 +17,24 @@ class MRUList:
         self._mru_task = []
         self._mru_reason = []
         self._csv_file = data_path / "mru_lists.csv"
+        self._rankings = {"task": FrecencyRanking(), "reason": FrecencyRanking()}
+        self._frecency_file = data_path / "mru_frecency.csv"
+        #  Scores changed since the last save.
+        self._frecency_rows = []
+        #  Set by load() when there is no frecency file yet. Changed scores
+        #  are not saved until seed_frecency() is called, since the scores
+        #  from the data file include those uses.
+        self._needs_seed = False
 
     # CSV file format: List,Text
     # Where:
     #   'List is the list name: 'task' or 'reason'
     #   'Text is from the respective input field'
+    #
+    # Frecency file format: List,Score,Text
+    # Rows are appended as scores change, and the latest (highest) score for
+    # an entry is used. The file is rewritten with one row per entry when it
+    # is loaded with too many old rows.
 
     def load(self) -> None:
         if self._csv_file.exists():
@@ -33,27 +50,89 @@ class MRUList:
                             self._mru_reason.append(row[1])
             except Exception:
                 logging.exception("Error loading MRU list.")
+        self._load_frecency()
 
-    def save(self) -> None:
-        with self._csv_file.open("w", newline="") as file:
+    def _load_frecency(self) -> None:
+        if not self._frecency_file.exists():
+            self._needs_seed = True
+            return
+        row_count = 0
+        try:
+            with self._frecency_file.open(newline="") as file:
+                for row in csv.reader(file):
+                    if len(row) < 3 or row[0] not in self._rankings:  # noqa: PLR2004
+                        continue
+                    row_count += 1
+                    ranking = self._rankings[row[0]]
+                    score = float(row[1])
+                    if score > ranking.scores.get(row[2], float("-inf")):
+                        ranking.set_score(row[2], score)
+        except Exception:
+            logging.exception("Error loading MRU frecency scores.")
+            return
+        entry_count = sum(len(ranking) for ranking in self._rankings.values())
+        if row_count > max(HEAP_COMPACT_MIN, HEAP_COMPACT_FACTOR * entry_count):
+            self._write_frecency()
+
+    def _write_frecency(self) -> None:
+        """Write the frecency file with one row for each entry."""
+        with self._frecency_file.open("w", newline="") as file:
             writer = csv.writer(file, quoting=csv.QUOTE_ALL)
-            for item in self._mru_task:
-                writer.writerow(["task", item])
-            for item in self._mru_reason:
-                writer.writerow(["reason", item])
+            for name, ranking in self._rankings.items():
+                for text, score in ranking.scores.items():
+                    writer.writerow([name, f"{score:.6f}", text])
+        self._frecency_rows = []
+
+    def has_frecency(self) -> bool:
+        return not self._needs_seed
+
+    def seed_frecency(self, tasks: dict[str, float], reasons: dict[str, float]) -> None:
+        """Set the frecency scores from the task and reason scores of all
+        rows in the data file (from scan_history), and write the frecency
+        file.
+        """
+        for name, scores in (("task", tasks), ("reason", reasons)):
+            ranking = self._rankings[name]
+            for text, score in scores.items():
+                if score > ranking.scores.get(text, float("-inf")):
+                    ranking.set_score(text, score)
+        self._write_frecency()
+        self._needs_seed = False
+
+    def save(self) -> None:
+        with io_timings.timed(OP_MRU):
+            with self._csv_file.open("w", newline="") as file:
+                writer = csv.writer(file, quoting=csv.QUOTE_ALL)
+                for item in self._mru_task:
+                    writer.writerow(["task", item])
+                for item in self._mru_reason:
+                    writer.writerow(["reason", item])
+            if self._needs_seed:
+                self._frecency_rows = []
+            elif self._frecency_rows:
+                with self._frecency_file.open("a", newline="") as file:
+                    writer = csv.writer(file, quoting=csv.QUOTE_ALL)
+                    writer.writerows(self._frecency_rows)
+                self._frecency_rows = []
+
+    def _use(self, name: str, text: str, when: datetime | None) -> None:
+        score = self._rankings[name].use(text, when or datetime.now())
+        self._frecency_rows.append([name, f"{score:.6f}", text])
 
-    def add_task(self, task: str) -> None:
+    def add_task(self, task: str, when: datetime | None = None) -> None:
         if not task:
             return
+        self._use("task", task, when)
         if task in self._mru_task:
             self._mru_task.remove(task)
         self._mru_task.insert(0, task)
         if len(self._mru_task) > MRU_LIST_MAX:
             self._mru_task = self._mru_task[:MRU_LIST_MAX]
 
-    def add_reason(self, reason: str) -> None:
+    def add_reason(self, reason: str, when: datetime | None = None) -> None:
         if not reason:
             return
+        self._use("reason", reason, when)
         if reason in self._mru_reason:
             self._mru_reason.remove(reason)
         self._mru_reason.insert(0, reason)
@@ -65,3 +144,25 @@ class MRUList:
 
     def get_reasons(self) -> str:
         return list(self._mru_reason)
+
+    def top_tasks(self, count: int = MRU_LIST_MAX) -> list[str]:
+        """Return the tasks with the highest frecency scores."""
+        return self._rankings["task"].top(count)
+
+    def top_reasons(self, count: int = MRU_LIST_MAX) -> list[str]:
+        """Return the reasons with the highest frecency scores."""
+        return self._rankings["reason"].top(count)
+
+    @property
+    def task_ranking(self) -> FrecencyRanking:
+        return self._rankings["task"]
+
+    @property
+    def reason_ranking(self) -> FrecencyRanking:
+        return self._rankings["reason"]
+
+    def task_scores(self) -> dict[str, float]:
+        return dict(self._rankings["task"].scores)
+
+    def reason_scores(self) -> dict[str, float]:
+        return dict(self._rankings["reason"].scores)
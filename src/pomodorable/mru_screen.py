@@ -5,41 +5,118 @@ from typing import TYPE_CHECKING
 from textual.binding import Binding
 from textual.containers import Grid
 from textual.screen import ModalScreen
-from textual.widgets import Button, Label, Select
+from textual.widgets import Button, Input, Label, OptionList
 
 if TYPE_CHECKING:
     from textual.app import ComposeResult
 
+    from pomodorable.frecency import FrecencyRanking
+
+#  Most entries shown in the list at once. Typing in the filter finds others,
+#  and a note under the list says how many are not shown.
+MRU_SCREEN_MAX = 100
+
+
+class EntryFilter:
+    """Entries of a FrecencyRanking containing a filter text, highest score
+    first, matched against the ranking's casefolded entries.
+
+    When the filter text is extended (as it is while typing), only the
+    entries that matched the previous text are checked again.
+
+    match_count is the number of entries that matched the last filter text,
+    which may be more than were returned.
+    """
+
+    def __init__(self, ranking: FrecencyRanking) -> None:
+        self.ranking = ranking
+        self._text: str | None = None
+        self._matches: list[str] = []
+        self.match_count = 0
+
+    def matches(self, text: str, count: int = MRU_SCREEN_MAX) -> list[str]:
+        text = text.strip().casefold()
+        if not text:
+            self._text = None
+            self.match_count = len(self.ranking)
+            return self.ranking.top(count)
+        keys = self.ranking.keys
+        if self._text is not None and text.startswith(self._text):
+            self._matches = [entry for entry in self._matches if text in keys[entry]]
+        else:
+            self._matches = [entry for entry, key in keys.items() if text in key]
+            self._matches.sort(key=self.ranking.scores.__getitem__, reverse=True)
+        self._text = text
+        self.match_count = len(self._matches)
+        return self._matches[:count]
+
 
 class MRUScreen(ModalScreen[str]):
-    def __init__(self, mru_list: list[str]) -> None:
-        self.mru_list = mru_list
+    def __init__(self, ranking: FrecencyRanking) -> None:
+        self.entry_filter = EntryFilter(ranking)
         super().__init__()
 
     BINDINGS = [
         ("escape", "cancel", "Cancel"),
+        ("down", "focus_list", "List"),
         Binding("ctrl+s", "screenshot", "Screenshot", show=False),
     ]
 
     def compose(self) -> ComposeResult:
         yield Grid(
             Label("Select from recent inputs:"),
-            Select.from_values(self.mru_list),
+            Input(id="mru-filter", placeholder="(type to filter)"),
+            OptionList(*self.entry_filter.matches(""), id="mru-options", markup=False),
+            Label(self._more_text(), id="mru-more"),
             Button("Back", id="btn-back"),
             id="dialog",
         )
 
+    def on_mount(self) -> None:
+        options = self.query_one(OptionList)
+        if options.option_count:
+            options.highlighted = 0
+        self.query_one("#mru-filter").focus()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        event.stop()
+        options = self.query_one(OptionList)
+        options.clear_options()
+        options.add_options(self.entry_filter.matches(event.value))
+        if options.option_count:
+            options.highlighted = 0
+        self.query_one("#mru-more", Label).update(self._more_text())
+
+    def _more_text(self) -> str:
+        """Return a note saying the list is truncated, or '' if it is not."""
+        count = self.entry_filter.match_count
+        if count <= MRU_SCREEN_MAX:
+            return ""
+        return f"First {MRU_SCREEN_MAX} of {count} shown. Type to filter."
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        event.stop()
+        self.close_screen()
+
+    def on_option_list_option_selected(self, event: OptionList.OptionSelected) -> None:
+        event.stop()
+        self.dismiss(str(event.option.prompt))
+
     def close_screen(self) -> None:
-        s: Select = self.query_one(Select)
-        if s.is_blank():
+        """Close with the highlighted entry, if any."""
+        options = self.query_one(OptionList)
+        if options.highlighted is None:
             self.dismiss("")
         else:
-            self.dismiss(s.value)
+            self.dismiss(str(options.get_option_at_index(options.highlighted).prompt))
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "btn-back":
             self.close_screen()
 
+    def action_focus_list(self) -> None:
+        self.query_one(OptionList).focus()
+
     def action_screenshot(self) -> None:
         self.app.take_screenshot()
 
@@ -5,9 +5,11 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
     from pathlib import Path
 
 from pomodorable.app_utils import hms_to_sec
+from pomodorable.export_filter import compile_filter
 
 
 def get_start_msg(row_notes: str, row_duration: str):
@@ -18,14 +20,11 @@ def get_start_msg(row_notes: str, row_duration: str):
     return ""
 
 
-def write_to_sessions_csv(csv_file: Path, filters: str, data_rows: list[dict], start_num: int = 0) -> None:
+def write_to_sessions_csv(csv_file: Path, filters: str, data_rows: Iterable[dict], start_num: int = 0) -> None:
     #  Note: Output CSV layout is different from the Data CSV.
 
-    exclude_pause_all = "P" in filters
-    exclude_pause_no_reason = "R" in filters
-    exclude_stop = "X" in filters
-    exclude_finish = "F" in filters
-    blank_same_date = "D" in filters
+    export_filter = compile_filter(filters)
+    blank_same_date = export_filter.blank_same_date
 
     #  Write the header row when the file is created.
     if not csv_file.exists():
@@ -43,7 +42,7 @@ def write_to_sessions_csv(csv_file: Path, filters: str, data_rows: list[dict], s
     with csv_file.open("a", newline="") as f:
         writer = csv.writer(f)
         last_date = None
-        for row in data_rows:
+        for row in export_filter.apply(data_rows):
             action = row["action"]
             row_date = row["date"]
             shown_date = "" if blank_same_date and last_date is not None and row_date == last_date else row_date
@@ -71,10 +70,6 @@ def write_to_sessions_csv(csv_file: Path, filters: str, data_rows: list[dict], s
                     session_num += 1
                 last_date = row_date
             elif action == "Pause":
-                if exclude_pause_all:
-                    continue
-                if exclude_pause_no_reason and len(row_message) == 0:
-                    continue
                 if row_notes == "extended":
                     out_act = "E"
                     out_msg = "Pause (extended)"
@@ -90,8 +85,6 @@ def write_to_sessions_csv(csv_file: Path, filters: str, data_rows: list[dict], s
                     row_message,
                 ]
             elif action == "Stop":
-                if exclude_stop:
-                    continue
                 out_row = [
                     shown_date,
                     "X",
@@ -101,8 +94,6 @@ def write_to_sessions_csv(csv_file: Path, filters: str, data_rows: list[dict], s
                     row_message,
                 ]
             elif action == "Finish":
-                if exclude_finish:
-                    continue
                 out_row = [
                     shown_date,
                     "F",
@@ -125,19 +116,27 @@ class TaskSession:
         self.task_seconds = hms_to_sec(duration)
         self.pause_seconds = 0
         self.extend_seconds = 0
+        self.extensions = 0
+        #  Pause and stop reasons, as given.
+        self.reason_list: list[str] = []
+        self.stopped = False
+        self.finished = False
 
     def pause(self, message: str, duration: str, notes: str) -> None:
         if notes == "extended":
             act = "Extend"
             self.extend_seconds += hms_to_sec(duration)
+            self.extensions += 1
         else:
             act = "Resume"
             self.pause_seconds += hms_to_sec(duration)
         if message:
             self.reasons += f"{act}: {message} | "
+            self.reason_list.append(message)
 
     def stop(self, stop_date: str, stop_time: str, message: str) -> None:
         self.stop_time = stop_time
+        self.stopped = True
 
         start_datetime: datetime = datetime.strptime(f"{self.date} {self.start_time}", "%Y-%m-%d %H:%M:%S")
 
@@ -150,11 +149,18 @@ class TaskSession:
 
         if message:
             self.reasons += f"STOP: {message}"
+            self.reason_list.append(message)
         else:
             self.reasons += "STOP"
 
     def finish(self, finish_time: str) -> None:
         self.stop_time = finish_time
+        self.finished = True
+
+    @property
+    def focus_seconds(self) -> int:
+        """Seconds on task, not counting pauses (not rounded to minutes)."""
+        return int(self.task_seconds - self.pause_seconds)
 
     def as_dict(self):
         """Return a dictionary with the session data for writing to a CSV file."""
@@ -177,7 +183,35 @@ class TaskSession:
         }
 
 
-def write_to_timesheet_csv(csv_file: Path, data_rows: list[dict]) -> None:
+def iter_task_sessions(data_rows: Iterable[dict]) -> Iterator[TaskSession]:
+    """Yield a TaskSession for each session (from a Start action) in the
+    data rows. Rows before the first Start are skipped.
+    """
+    session: TaskSession = None
+    for row in data_rows:
+        action = row["action"]
+        if action == "Start":
+            if session is not None:
+                yield session
+            session = TaskSession(row["date"], row["time"], row["message"], row["duration"])
+        elif session is None:
+            continue
+        elif action == "Pause":
+            session.pause(row["message"], row["duration"], row["notes"])
+        elif action == "Stop":
+            session.stop(row["date"], row["time"], row["message"])
+        elif action == "Finish":
+            session.finish(row["time"])
+            yield session
+            session = None
+    if session is not None:
+        yield session
+
+
+def write_to_timesheet_csv(csv_file: Path, data_rows: Iterable[dict], filters: str = "") -> None:
+    """Append a row for each session in the data rows. Only the session
+    options of the filter spec apply (the action letters do not).
+    """
     header = "date,start_time,stop_time,task_minutes,pause_minutes,task,notes"
 
     #  Write the header row when the file is created.
@@ -187,21 +221,5 @@ def write_to_timesheet_csv(csv_file: Path, data_rows: list[dict]) -> None:
     #  Append data rows.
     with csv_file.open("a", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=header.split(","))
-        session: TaskSession = None
-        for row in data_rows:
-            action = row["action"]
-            if action == "Start":
-                if session is not None:
-                    writer.writerow(session.as_dict())
-                session = TaskSession(row["date"], row["time"], row["message"], row["duration"])
-            elif action == "Pause":
-                session.pause(row["message"], row["duration"], row["notes"])
-            elif action == "Stop":
-                session.stop(row["date"], row["time"], row["message"])
-            elif action == "Finish":
-                session.finish(row["time"])
-                if session is not None:
-                    writer.writerow(session.as_dict())
-                session = None
-        if session is not None:
+        for session in iter_task_sessions(compile_filter(filters).apply(data_rows, filter_rows=False)):
             writer.writerow(session.as_dict())
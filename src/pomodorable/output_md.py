@@ -2,19 +2,18 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
+from pomodorable.export_filter import compile_filter
+
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from pathlib import Path
 
 TASK_HEADING_MARKER = "- **"
 
 
-def rows_as_md(filters: str, data_rows: list[dict]) -> list[str]:
-    exclude_pause_all = "P" in filters
-    exclude_pause_no_reason = "R" in filters
-    exclude_stop = "X" in filters
-    exclude_finish = "F" in filters
+def rows_as_md(filters: str, data_rows: Iterable[dict]) -> list[str]:
     md = []
-    for row in data_rows:
+    for row in compile_filter(filters).apply(data_rows):
         row_time = row["time"]
         # Remove seconds from time (HH:MM:SS to HH:MM).
         if row_time.count(":") == 2:  # noqa: PLR2004
@@ -33,21 +32,13 @@ def rows_as_md(filters: str, data_rows: list[dict]) -> list[str]:
             md.append(f"    - Start {row_time}{add_msg}")
 
         elif row["action"] == "Pause":
-            if exclude_pause_all:
-                continue
-            if exclude_pause_no_reason and not row["message"]:
-                continue
             act = f"extend {row['duration']}" if row["notes"] == "extended" else "resume"
             md.append(f"    - Pause {row_time} '{row['message']}' ({act})")
 
         elif row["action"] == "Stop":
-            if exclude_stop:
-                continue
             md.append(f"    - STOP {row_time} '{row['message']}'")
 
         elif row["action"] == "Finish":
-            if exclude_finish:
-                continue
             md.append(f"    - Finish {row_time} ({row['notes']})")
     return md
 
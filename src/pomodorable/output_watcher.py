@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from rich import print as rprint
+
+from pomodorable.data_reader import DataCursor, iter_data_rows, tail_offset
+from pomodorable.file_watcher import FileWatcher
+from pomodorable.rollups import END_ACTIONS
+
+if TYPE_CHECKING:
+    from pomodorable.app_data import AppData
+
+#  Seconds without further changes to the data file before the outputs are
+#  written, so a burst of rows (such as from a sync tool) is handled at once.
+WATCH_DEBOUNCE = 0.5
+
+#  Longest time changes are held back while the data file keeps changing.
+WATCH_DEBOUNCE_MAX = 5.0
+
+#  Seconds to wait for a change at a time (also the polling interval where
+#  inotify is not available).
+WATCH_INTERVAL = 1.0
+
+#  Rows are kept in memory for this many of the latest dates, for writing the
+#  daily markdown file without reading the data file again.
+WATCH_DAYS_KEPT = 3
+
+
+class OutputWatcher:
+    """Write the daily CSV, running CSV, and daily markdown outputs for rows
+    appended to the data file by another instance or a sync tool.
+
+    Only the bytes appended since the last check are read. The rows of a
+    session are written to the CSV outputs when it ends (as the application
+    does), and the markdown section is written again for each date with new
+    rows.
+
+    If the data file was rewritten (such as by a sync tool merging files),
+    the sessions for the latest dates are compared with those already seen,
+    and outputs are written for the new ones.
+    """
+
+    def __init__(self, app_data: AppData) -> None:
+        self.app_data = app_data
+        self.data_file = app_data.data_file
+        self._cursor = DataCursor()
+        #  Rows of the current session, not written to the CSV outputs yet.
+        self._pending: list[dict] = []
+        self._day_rows: dict[str, list[dict]] = {}
+        self._seek_end()
+
+    def _seek_end(self) -> None:
+        """Start at the end of the data file, with the rows of a session that
+        has not ended yet as pending. Only rows since yesterday are read.
+        """
+        self._cursor = DataCursor()
+        self._pending = []
+        self._day_rows = {}
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        for line in iter_data_rows(self.data_file, tail_offset(self.data_file, yesterday)):
+            self._pending.append(line.row)
+            if line.row["action"] in END_ACTIONS:
+                self._pending = []
+            if line.row["date"] >= yesterday:
+                self._day_rows.setdefault(line.row["date"], []).append(line.row)
+            self._cursor = DataCursor.after(line)
+
+    def _load_day(self, day: str, end: int) -> list[dict]:
+        """Return the rows for a date that are before the byte offset end."""
+        rows = []
+        for line in iter_data_rows(self.data_file, tail_offset(self.data_file, day)):
+            if line.start >= end or line.row["date"] > day:
+                break
+            if line.row["date"] == day:
+                rows.append(line.row)
+        return rows
+
+    def _write_session(self, rows: list[dict]) -> None:
+        self.app_data.write_session_to_running_csv(rows)
+        self.app_data.write_session_to_daily_csv(rows)
+
+    def _write_days(self, days: set[str]) -> None:
+        """Write the markdown for the dates, and drop all but the rows of the
+        latest WATCH_DAYS_KEPT dates.
+        """
+        if self.app_data.get_daily_md_path():
+            for day in sorted(days):
+                self.app_data.write_day_to_daily_md(day, self._day_rows[day])
+        for day in sorted(self._day_rows)[:-WATCH_DAYS_KEPT]:
+            del self._day_rows[day]
+
+    def check(self) -> int:
+        """Read the rows appended since the last check and write the outputs
+        they affect. Return the number of sessions written to the CSV outputs.
+        """
+        if not self._cursor.is_valid(self.data_file):
+            logging.info("Data file changed. Writing outputs for rows not seen before.")
+            return self._check_rewritten()
+
+        new_rows = []
+        for line in iter_data_rows(self.data_file, self._cursor.offset):
+            new_rows.append(line.row)
+            self._cursor = DataCursor.after(line)
+        if not new_rows:
+            return 0
+
+        sessions = 0
+        for row in new_rows:
+            self._pending.append(row)
+            if row["action"] in END_ACTIONS:
+                self._write_session(self._pending)
+                self._pending = []
+                sessions += 1
+
+        days = {row["date"] for row in new_rows}
+        for day in days:
+            day_rows = self._day_rows.get(day)
+            if day_rows is None:
+                self._day_rows[day] = self._load_day(day, self._cursor.offset)
+            else:
+                day_rows.extend(row for row in new_rows if row["date"] == day)
+        self._write_days(days)
+        return sessions
+
+    def _check_rewritten(self) -> int:
+        """Read the rows of the rewritten data file for the dates kept in
+        memory (or since yesterday), and write the outputs for what changed.
+        Return the number of sessions written to the CSV outputs.
+
+        Sessions are identified by their 'started' value. A session is only
+        written to the CSV outputs if no row ending it was seen before, so
+        editing the rows of a session already written does not write it
+        again. The markdown is written again for each date whose rows changed.
+        """
+        since = min(self._day_rows, default=(datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d"))
+        old_day_rows = self._day_rows
+        written = {row["started"] for rows in old_day_rows.values() for row in rows if row["action"] in END_ACTIONS}
+        self._cursor = DataCursor()
+        self._day_rows = {}
+        session: list[dict] = []
+        sessions = 0
+        for line in iter_data_rows(self.data_file, tail_offset(self.data_file, since)):
+            row = line.row
+            self._cursor = DataCursor.after(line)
+            session.append(row)
+            if row["date"] >= since:
+                self._day_rows.setdefault(row["date"], []).append(row)
+            if row["action"] in END_ACTIONS:
+                if row["date"] >= since and row["started"] not in written:
+                    self._write_session(session)
+                    sessions += 1
+                session = []
+        self._pending = session
+        self._write_days({day for day, rows in self._day_rows.items() if old_day_rows.get(day) != rows})
+        return sessions
+
+    def run(self, stop: threading.Event, use_inotify: bool = True) -> None:
+        """Check for new rows each time the data file changes, until stop is
+        set. Changes are handled after the file has been quiet for
+        WATCH_DEBOUNCE seconds, or at most WATCH_DEBOUNCE_MAX seconds after
+        the first change.
+        """
+        watcher = FileWatcher(self.data_file, use_inotify=use_inotify)
+        try:
+            while not stop.is_set():
+                if not watcher.wait(WATCH_INTERVAL):
+                    continue
+                first_change = time.monotonic()
+                while time.monotonic() - first_change < WATCH_DEBOUNCE_MAX and watcher.wait(WATCH_DEBOUNCE):
+                    pass
+                sessions = self.check()
+                if sessions:
+                    logging.info("Wrote %s sessions to outputs.", sessions)
+        finally:
+            watcher.close()
+
+
+def run_output_watcher(app_data: AppData) -> int:
+    """Run the output watcher in the foreground until interrupted. Return the
+    exit code.
+    """
+    if not app_data.data_file.exists():
+        sys.stderr.write(f"\nData file not found: {app_data.data_file}\n")
+        return 1
+    rprint(f"\nWriting outputs for rows added to {app_data.data_file} (Ctrl+C to stop)\n")
+    with contextlib.suppress(KeyboardInterrupt):
+        OutputWatcher(app_data).run(threading.Event())
+    return 0
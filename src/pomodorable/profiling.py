@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import cProfile
+import functools
+import logging
+import sys
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pomodorable.app_utils import str_true
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from types import FrameType
+
+PROFILE_PREFIX = "pomodorable-profile"
+PSTATS_SUFFIX = ".pstats"
+COLLAPSED_SUFFIX = ".collapsed"
+
+#  Seconds between samples of the stack of a profiled thread.
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+#  Setting value for sampling the stack only, without cProfile.
+PROFILE_SAMPLE_ONLY = "sample"
+
+
+@dataclass(frozen=True)
+class ProfileSetting:
+    #  Names of AppData methods to profile. If empty, the whole run is
+    #  profiled.
+    hot_paths: tuple[str, ...] = ()
+    sample_only: bool = False
+
+
+def parse_profile_setting(value: str) -> ProfileSetting | None:
+    """Return the profiling setting for a POMODORABLE_PROFILE value, or None
+    if profiling is off.
+
+    The value is a comma-separated list. A 'true' value ('1', 'y', ...)
+    profiles the whole run. 'sample' uses the stack sampler only. Any other
+    items are names of AppData methods to profile instead of the whole run.
+    """
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    if not items or (len(items) == 1 and items[0].lower() in ["0", "false", "n", "no"]):
+        return None
+    sample_only = any(item.lower() == PROFILE_SAMPLE_ONLY for item in items)
+    hot_paths = tuple(item for item in items if item.lower() != PROFILE_SAMPLE_ONLY and not str_true(item))
+    return ProfileSetting(hot_paths=hot_paths, sample_only=sample_only)
+
+
+def frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def collapsed_stack(frame: FrameType) -> str:
+    """Return the stack of frame in collapsed format (outermost call first,
+    separated by semicolons).
+    """
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Count the stacks of the registered threads, sampled on a background
+    thread every interval seconds.
+
+    The counts are written in the collapsed stack format read by flame graph
+    tools (such as flamegraph.pl and speedscope).
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._threads: set[int] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add_thread(self, ident: int) -> None:
+        with self._lock:
+            self._threads.add(ident)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+
+    def remove_thread(self, ident: int) -> None:
+        with self._lock:
+            self._threads.discard(ident)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                idents = tuple(self._threads)
+            if not idents:
+                continue
+            frames = sys._current_frames()  # noqa: SLF001
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.stacks[collapsed_stack(frame)] += 1
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write(self, out_file: Path) -> None:
+        with out_file.open("w") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    """Profile one thread at a time with cProfile and the stack sampler.
+
+    Calls to start and stop may be nested (a profiled hot path calling
+    another). While one thread is profiled, calls from other threads are not.
+    """
+
+    def __init__(self, out_dir: Path, sample_only: bool = False) -> None:
+        self.out_dir = out_dir
+        self.started = datetime.now()
+        self._profile = None if sample_only else cProfile.Profile()
+        self._sampler = StackSampler()
+        self._lock = threading.Lock()
+        self._owner: int | None = None
+        self._depth = 0
+        self._calls = 0
+        self._saved = False
+
+    def start(self) -> bool:
+        """Start profiling the calling thread. Return False if another thread
+        is being profiled (or the profile was saved).
+        """
+        ident = threading.get_ident()
+        with self._lock:
+            if self._saved or self._owner not in (None, ident):
+                return False
+            self._owner = ident
+            self._depth += 1
+            if self._depth > 1:
+                return True
+            self._calls += 1
+        if self._profile is not None:
+            self._profile.enable()
+        self._sampler.add_thread(ident)
+        return True
+
+    def stop(self) -> None:
+        with self._lock:
+            if not self._depth:
+                #  The profile was saved during the call.
+                return
+            self._depth -= 1
+            if self._depth:
+                return
+            ident = self._owner
+            self._owner = None
+        if self._profile is not None:
+            self._profile.disable()
+        self._sampler.remove_thread(ident)
+
+    def wrap(self, func: Callable) -> Callable:
+        """Return func wrapped to be profiled when called."""
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.start():
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.stop()
+
+        return wrapper
+
+    def save(self) -> list[Path]:
+        """Stop profiling and write the .pstats and .collapsed files to the
+        output folder. Return the files written.
+
+        If the whole run is profiled, this must be called from the profiled
+        thread. Only the first call writes the files.
+        """
+        with self._lock:
+            if self._saved:
+                return []
+            self._saved = True
+            ident = self._owner
+            active = self._depth > 0
+            self._depth = 0
+            self._owner = None
+        if active:
+            if self._profile is not None:
+                self._profile.disable()
+            self._sampler.remove_thread(ident)
+        self._sampler.close()
+
+        if not self._calls:
+            logging.info("Nothing was profiled.")
+            return []
+        stem = f"{PROFILE_PREFIX}-{self.started.strftime('%Y%m%d-%H%M%S')}"
+        files = []
+        if self._profile is not None:
+            pstats_file = self.out_dir / f"{stem}{PSTATS_SUFFIX}"
+            self._profile.dump_stats(pstats_file)
+            files.append(pstats_file)
+        collapsed_file = self.out_dir / f"{stem}{COLLAPSED_SUFFIX}"
+        self._sampler.write(collapsed_file)
+        files.append(collapsed_file)
+        logging.info("Profile written to %s", ", ".join(str(f) for f in files))
+        return files
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import logging
+from datetime import date
+from typing import TYPE_CHECKING
+
+from pomodorable.data_reader import DataCursor, iter_data_rows
+from pomodorable.output_csv import iter_task_sessions
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from pomodorable.output_csv import TaskSession
+
+ROLLUP_FILE = "pomodorable-rollups.json"
+ROLLUP_VERSION = 2
+
+#  Totals kept for each task on each day, in this order. The minutes are
+#  counted as in the Time Sheet export; the seconds are not rounded.
+TOTAL_FIELDS = (
+    "sessions",
+    "finished",
+    "stopped",
+    "task_minutes",
+    "pause_minutes",
+    "focus_seconds",
+    "pause_seconds",
+    "extensions",
+)
+
+PERIOD_DAY = "day"
+PERIOD_WEEK = "week"
+PERIOD_TASK = "task"
+PERIODS = (PERIOD_DAY, PERIOD_WEEK, PERIOD_TASK)
+
+NO_TASK = "(no task)"
+
+#  Number of reasons in a day summary.
+TOP_REASONS = 3
+
+#  A session has ended when one of these actions is written.
+END_ACTIONS = ("Finish", "Stop")
+
+
+def iter_ended_sessions(data_file: Path, offset: int) -> Iterator[tuple[list[TaskSession], DataCursor]]:
+    """Yield the sessions ended by each Finish or Stop row after the byte
+    offset, with a cursor after that row. Usually there is one session, but
+    a session that was started and never ended comes before the next one.
+
+    Rows of a session that has not ended yet are not yielded.
+    """
+    pending: list[dict] = []
+    for line in iter_data_rows(data_file, offset):
+        pending.append(line.row)
+        if line.row["action"] in END_ACTIONS:
+            yield list(iter_task_sessions(pending)), DataCursor.after(line)
+            pending = []
+
+
+def session_totals(session: TaskSession) -> list[int]:
+    """Return the totals for one session, in TOTAL_FIELDS order."""
+    data = session.as_dict()
+    return [
+        1,
+        int(session.finished),
+        int(session.stopped),
+        data["task_minutes"],
+        data["pause_minutes"],
+        session.focus_seconds,
+        int(session.pause_seconds),
+        session.extensions,
+    ]
+
+
+def add_totals(target: list[int], values: list[int]) -> None:
+    for i, value in enumerate(values):
+        target[i] += value
+
+
+def week_of(day: str) -> str:
+    """Return the ISO week of a 'YYYY-MM-DD' date as 'YYYY-Www'."""
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class SessionRollups:
+    """Session totals for each task on each day, and the number of times
+    each pause or stop reason was given on each day, saved in the data folder.
+
+    The saved totals include every session that has ended (with Finish or
+    Stop), with a cursor after the row that ended the last one. An update
+    reads the data file from the cursor, so after a session is written only
+    the rows of that session are read. A session in progress is not counted
+    until it ends.
+
+    The totals can always be rebuilt from the data file, and check compares
+    them with a rebuild.
+    """
+
+    def __init__(self, data_file: Path, rollup_file: Path) -> None:
+        self.data_file = data_file
+        self.rollup_file = rollup_file
+        self.days: dict[str, dict[str, list[int]]] = {}
+        self.reasons: dict[str, dict[str, int]] = {}
+        self._cursor = DataCursor()
+        self._loaded = False
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            data = json.loads(self.rollup_file.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logging.exception("Cannot read rollup file '%s'", self.rollup_file)
+            return
+        if data.get("version") != ROLLUP_VERSION:
+            logging.info("Rollup file version changed. Rebuilding rollups.")
+            return
+        self.days = data["days"]
+        self.reasons = data["reasons"]
+        self._cursor = DataCursor.from_dict(data["cursor"])
+
+    def _save(self) -> None:
+        data = {
+            "version": ROLLUP_VERSION,
+            "cursor": self._cursor.as_dict(),
+            "days": self.days,
+            "reasons": self.reasons,
+        }
+        tmp_file = self.rollup_file.with_suffix(".tmp")
+        try:
+            tmp_file.write_text(json.dumps(data, separators=(",", ":")))
+            tmp_file.replace(self.rollup_file)
+        except OSError:
+            logging.exception("Cannot write rollup file '%s'", self.rollup_file)
+
+    def _add_session(self, session: TaskSession) -> None:
+        tasks = self.days.setdefault(session.date, {})
+        add_totals(tasks.setdefault(session.task or NO_TASK, [0] * len(TOTAL_FIELDS)), session_totals(session))
+        if session.reason_list:
+            reasons = self.reasons.setdefault(session.date, {})
+            for reason in session.reason_list:
+                reasons[reason] = reasons.get(reason, 0) + 1
+
+    def _read_new_rows(self) -> bool:
+        """Add the sessions that ended after the cursor. Return True if any
+        were added.
+        """
+        added = False
+        for sessions, cursor in iter_ended_sessions(self.data_file, self._cursor.offset):
+            for session in sessions:
+                self._add_session(session)
+            self._cursor = cursor
+            added = True
+        return added
+
+    def reset(self) -> None:
+        """Forget all totals, so the next update reads the whole data file."""
+        self.days = {}
+        self.reasons = {}
+        self._cursor = DataCursor()
+
+    def update(self) -> dict[str, dict[str, list[int]]]:
+        """Bring the totals up to date with the data file. Return the totals
+        as {date: {task: [values in TOTAL_FIELDS order]}}.
+        """
+        if not self._loaded:
+            self._load()
+        if not self._cursor.is_valid(self.data_file):
+            logging.info("Data file changed. Rebuilding rollups.")
+            self.reset()
+        if self._read_new_rows():
+            self._save()
+        return self.days
+
+    def rebuild(self) -> dict[str, dict[str, list[int]]]:
+        """Compute the totals again from the whole data file, and save them."""
+        self._loaded = True
+        self.reset()
+        self._read_new_rows()
+        self._save()
+        return self.days
+
+    def check(self) -> list[str]:
+        """Compare the saved totals, brought up to date, with totals computed
+        from the whole data file. Return the dates that differ.
+        """
+        self.update()
+        rebuilt = SessionRollups(self.data_file, self.rollup_file)
+        rebuilt._loaded = True
+        rebuilt._read_new_rows()
+        dates = sorted(set(self.days) | set(rebuilt.days) | set(self.reasons) | set(rebuilt.reasons))
+        return [
+            day
+            for day in dates
+            if self.days.get(day) != rebuilt.days.get(day) or self.reasons.get(day) != rebuilt.reasons.get(day)
+        ]
+
+    def day_summary(self, day: str) -> dict:
+        """Return the totals of all tasks for a 'YYYY-MM-DD' date, with the
+        most frequent reasons given that day.
+        """
+        totals = [0] * len(TOTAL_FIELDS)
+        for values in self.days.get(day, {}).values():
+            add_totals(totals, values)
+        reasons = self.reasons.get(day, {})
+        top = sorted(reasons, key=lambda reason: reasons[reason], reverse=True)[:TOP_REASONS]
+        return {"date": day, **dict(zip(TOTAL_FIELDS, totals, strict=True)), "top_reasons": top}
+
+
+def summarize(
+    days: dict[str, dict[str, list[int]]],
+    period: str,
+    since: str | None = None,
+    until: str | None = None,
+) -> list[tuple[str, list[int]]]:
+    """Return (key, totals) for each day, week, or task, for the days from
+    since to until ('YYYY-MM-DD', inclusive, None for no limit).
+
+    Days and weeks are in date order. Tasks are ordered by task minutes,
+    most first.
+    """
+    result: dict[str, list[int]] = {}
+    for day in sorted(days):
+        if (since and day < since) or (until and day > until):
+            continue
+        for task, values in days[day].items():
+            if period == PERIOD_DAY:
+                key = day
+            elif period == PERIOD_WEEK:
+                key = week_of(day)
+            else:
+                key = task
+            add_totals(result.setdefault(key, [0] * len(TOTAL_FIELDS)), values)
+    items = list(result.items())
+    if period == PERIOD_TASK:
+        items.sort(key=lambda item: item[1][TOTAL_FIELDS.index("task_minutes")], reverse=True)
+    return items
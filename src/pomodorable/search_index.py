@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import json
+import logging
+import re
+from typing import TYPE_CHECKING
+
+from pomodorable.data_reader import DataCursor
+from pomodorable.output_csv import iter_task_sessions
+from pomodorable.rollups import iter_ended_sessions
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from pomodorable.output_csv import TaskSession
+
+SEARCH_INDEX_FILE = "pomodorable-search.json"
+SEARCH_INDEX_VERSION = 1
+
+#  Default number of sessions returned by a search.
+SEARCH_LIMIT = 25
+
+#  Fields of a session in the index, in this order.
+SESSION_FIELDS = ("date", "start_time", "task", "notes", "finished")
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Return the lowercase words in text."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """Inverted index of the words in session tasks and pause or stop
+    reasons, saved in the data folder.
+
+    Sessions are numbered in the order they are in the data file, and each
+    word maps to the sorted list of numbers of the sessions it is in, so the
+    most recent matches are at the end of each list.
+
+    As for SessionRollups, the index includes every session that has ended,
+    with a cursor after the row that ended the last one, so an update only
+    reads the rows written since.
+
+    AppData adds each session it writes from the rows it has in memory (see
+    add_ended_session), without reading the data file. Those changes are
+    saved later, by flush() or the next update(), since the saved cursor
+    still lets a later update read any sessions that were not saved.
+    """
+
+    def __init__(self, data_file: Path, index_file: Path) -> None:
+        self.data_file = data_file
+        self.index_file = index_file
+        self.sessions: list[list] = []
+        self.postings: dict[str, list[int]] = {}
+        self._cursor = DataCursor()
+        self._loaded = False
+        #  Sessions were added since the index was saved.
+        self._dirty = False
+        #  Sorted words, for prefix matching. Built when first needed.
+        self._words: list[str] | None = None
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            data = json.loads(self.index_file.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            logging.exception("Cannot read search index '%s'", self.index_file)
+            return
+        if data.get("version") != SEARCH_INDEX_VERSION:
+            logging.info("Search index version changed. Rebuilding search index.")
+            return
+        self.sessions = data["sessions"]
+        self.postings = data["postings"]
+        self._cursor = DataCursor.from_dict(data["cursor"])
+
+    def _save(self) -> None:
+        data = {
+            "version": SEARCH_INDEX_VERSION,
+            "cursor": self._cursor.as_dict(),
+            "sessions": self.sessions,
+            "postings": self.postings,
+        }
+        tmp_file = self.index_file.with_suffix(".tmp")
+        try:
+            tmp_file.write_text(json.dumps(data, separators=(",", ":")))
+            tmp_file.replace(self.index_file)
+        except OSError:
+            logging.exception("Cannot write search index '%s'", self.index_file)
+            return
+        self._dirty = False
+
+    def _add_session(self, session: TaskSession) -> None:
+        number = len(self.sessions)
+        data = session.as_dict()
+        self.sessions.append([session.date, session.start_time, session.task, data["notes"], session.finished])
+        words = set(tokenize(session.task))
+        for reason in session.reason_list:
+            words.update(tokenize(reason))
+        for word in words:
+            postings = self.postings.get(word)
+            if postings is None:
+                self.postings[word] = [number]
+                self._words = None
+            else:
+                postings.append(number)
+
+    def _read_new_rows(self) -> bool:
+        """Add the sessions that ended after the cursor. Return True if any
+        were added.
+        """
+        added = False
+        for sessions, cursor in iter_ended_sessions(self.data_file, self._cursor.offset):
+            for session in sessions:
+                self._add_session(session)
+            self._cursor = cursor
+            added = True
+        return added
+
+    def reset(self) -> None:
+        """Forget all sessions, so the next update reads the whole data file."""
+        self.sessions = []
+        self.postings = {}
+        self._cursor = DataCursor()
+        self._words = None
+
+    def _catch_up(self) -> bool:
+        """Add the sessions in the data file after the cursor (all of them if
+        the cursor is no longer valid). Return True if the index changed.
+        """
+        if not self._loaded:
+            self._load()
+        if not self._cursor.is_valid(self.data_file):
+            logging.info("Data file changed. Rebuilding search index.")
+            self.reset()
+            self._dirty = True
+        return self._read_new_rows()
+
+    def update(self) -> None:
+        """Bring the index up to date with the data file, and save it if it
+        changed.
+        """
+        if self._catch_up() or self._dirty:
+            self._save()
+
+    def add_ended_session(self, rows: list[dict], start: int | None, cursor: DataCursor) -> None:
+        """Add a session just appended to the data file, from its rows.
+
+        start is the byte offset of its first row (None if not known), and
+        cursor is after its last row. If the index does not end at start
+        (such as when another instance wrote sessions since), the data file
+        is read from the index cursor instead. The index is not saved here.
+        """
+        if not self._loaded:
+            self._load()
+        if start is not None and start == self._cursor.offset and self._cursor.is_valid(self.data_file):
+            for session in iter_task_sessions(rows):
+                self._add_session(session)
+            self._cursor = cursor
+            self._dirty = True
+        elif self._catch_up():
+            self._dirty = True
+
+    def flush(self) -> None:
+        """Save the index if sessions were added since it was saved."""
+        if self._dirty:
+            self._save()
+
+    def _matches(self, word: str) -> set[int]:
+        """Return the numbers of the sessions with a word starting with word."""
+        if self._words is None:
+            self._words = sorted(self.postings)
+        result: set[int] = set()
+        i = bisect.bisect_left(self._words, word)
+        while i < len(self._words) and self._words[i].startswith(word):
+            result.update(self.postings[self._words[i]])
+            i += 1
+        return result
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list[dict]:
+        """Return the sessions with all the words in query (each word may be
+        the start of a word in the session), most recent first.
+
+        Only sessions already added (by update() or add_ended_session) are
+        searched, so typing a query does not check the data file on each
+        change.
+        """
+        if not self._loaded:
+            self._load()
+        words = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not words:
+            return []
+        found: set[int] | None = None
+        for word in words:
+            matches = self._matches(word)
+            found = matches if found is None else found & matches
+            if not found:
+                return []
+        numbers = heapq.nlargest(limit, found, key=lambda n: (self.sessions[n][0], self.sessions[n][1], n))
+        return [dict(zip(SESSION_FIELDS, self.sessions[n], strict=True)) for n in numbers]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from textual.binding import Binding
+from textual.containers import Horizontal, Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Button, DataTable, Input, Static
+
+if TYPE_CHECKING:
+    from textual.app import ComposeResult
+
+    from pomodorable.search_index import SearchIndex
+
+
+class SearchScreen(ModalScreen[str]):
+    """Search the session history for words in tasks and reasons.
+
+    Selecting a result closes the screen and returns its task.
+
+    The index is brought up to date once, in a thread, when the screen
+    opens. Results are shown once that is done.
+    """
+
+    def __init__(self, search_index: SearchIndex) -> None:
+        self.search_index = search_index
+        self._tasks: list[str] = []
+        self._index_ready = False
+        super().__init__()
+
+    BINDINGS = [
+        ("escape", "cancel", "Cancel"),
+        Binding("ctrl+s", "screenshot", "Screenshot", show=False),
+    ]
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="search-dialog"):
+            yield Static("Search Sessions", id="search-title")
+            yield Input(id="search-input", placeholder="(words in task or reason)")
+            yield DataTable(id="search-results", cursor_type="row")
+            with Horizontal(classes="search-buttons"):
+                yield Button("Close", id="search-close")
+
+    def on_mount(self) -> None:
+        self.query_one(DataTable).add_columns("Date", "Start", "Task", "Notes")
+        self.query_one("#search-input").focus()
+        self.run_worker(self.update_index, thread=True)
+
+    def update_index(self) -> None:
+        """Read sessions written since the last update into the index, and
+        save it. Runs in a thread.
+        """
+        try:
+            self.search_index.update()
+        except Exception:
+            logging.exception("Cannot update search index.")
+        self.app.call_from_thread(self.index_updated)
+
+    def index_updated(self) -> None:
+        if not self.is_attached:
+            #  Closed before the update finished.
+            return
+        self._index_ready = True
+        self.show_results(self.query_one(Input).value)
+
+    def show_results(self, query: str) -> None:
+        if not self._index_ready:
+            return
+        table = self.query_one(DataTable)
+        table.clear()
+        results = self.search_index.search(query)
+        self._tasks = [session["task"] for session in results]
+        for session in results:
+            table.add_row(session["date"], session["start_time"], session["task"], session["notes"])
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        event.stop()
+        self.show_results(event.value)
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        event.stop()
+        if self._tasks:
+            self.query_one(DataTable).focus()
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        event.stop()
+        self.dismiss(self._tasks[event.cursor_row])
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        if event.button.id == "search-close":
+            event.stop()
+            self.dismiss("")
+
+    def action_screenshot(self) -> None:
+        self.app.take_screenshot()
+
+    def action_cancel(self) -> None:
+        self.dismiss("")
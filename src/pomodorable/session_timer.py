@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pomodorable.app_data import AppData
+
+STATE_READY = "ready"
+STATE_RUNNING = "running"
+STATE_PAUSED = "paused"
+
+
+class TimerStateError(ValueError):
+    """Raised when an action is not valid in the timer's current state."""
+
+
+class SessionTimer:
+    """State of a pomodoro session, without a user interface.
+
+    This follows the same rules as CountdownDisplay in the Textual app, and
+    writes each action through AppData. Times are passed in (default now)
+    so the timer can be driven by a scheduler or by tests.
+    """
+
+    def __init__(self, app_data: AppData) -> None:
+        self.app_data = app_data
+        self.state = STATE_READY
+        self.task = ""
+        self.start_time: datetime | None = None
+        self.pause_time: datetime | None = None
+        self.start_seconds = 0
+        self.seconds_added = 0
+        self.last_action = ""
+
+    def _require(self, action: str, *states: str) -> None:
+        if self.state not in states:
+            raise TimerStateError(f"Cannot {action} when {self.state}.")
+
+    def remaining(self, now: datetime | None = None) -> int:
+        """Return the seconds remaining in the session."""
+        if self.state == STATE_READY:
+            return self.app_data.config.session_seconds
+        now = now or datetime.now()
+        until = self.pause_time if self.state == STATE_PAUSED else now
+        return self.start_seconds - (until - self.start_time).seconds + self.seconds_added
+
+    def deadline(self) -> datetime | None:
+        """Return the time the session finishes, or None if not running."""
+        if self.state != STATE_RUNNING:
+            return None
+        return self.start_time + timedelta(seconds=self.start_seconds + self.seconds_added)
+
+    def start(self, task: str = "", seconds: int | None = None, now: datetime | None = None) -> None:
+        self._require("start", STATE_READY)
+        seconds = seconds or self.app_data.config.session_seconds
+        self.start_time = now or datetime.now()
+        self.start_seconds = seconds
+        self.seconds_added = 0
+        self.pause_time = None
+        self.task = task
+        self.app_data.write_start(self.start_time, task, seconds)
+        self.state = STATE_RUNNING
+        self.last_action = "start"
+
+    def pause(self, now: datetime | None = None) -> None:
+        self._require("pause", STATE_RUNNING)
+        self.pause_time = now or datetime.now()
+        self.state = STATE_PAUSED
+        self.last_action = "pause"
+
+    def resume(self, reason: str = "", now: datetime | None = None) -> None:
+        """Return to running. The pause is subtracted from the session."""
+        self._require("resume", STATE_PAUSED)
+        duration = ((now or datetime.now()) - self.pause_time).seconds
+        self.app_data.write_pause(self.start_time, self.pause_time, reason, duration, False)
+        self.pause_time = None
+        self.state = STATE_RUNNING
+        self.last_action = "resume"
+
+    def extend(self, reason: str = "", now: datetime | None = None) -> None:
+        """Return to running. The pause is added to the end of the session."""
+        self._require("extend", STATE_PAUSED)
+        extend_secs = ((now or datetime.now()) - self.pause_time).seconds
+        self.seconds_added += extend_secs
+        self.app_data.write_pause(self.start_time, self.pause_time, reason, extend_secs, True)
+        self.pause_time = None
+        self.state = STATE_RUNNING
+        self.last_action = "extend"
+
+    def stop(self, reason: str = "", now: datetime | None = None) -> None:
+        self._require("stop", STATE_RUNNING, STATE_PAUSED)
+        self.app_data.write_stop(self.start_time, now or datetime.now(), reason)
+        self._reset("stop")
+
+    def finish(self, now: datetime | None = None) -> None:
+        self._require("finish", STATE_RUNNING)
+        self.app_data.write_finish(now or datetime.now(), self.start_time)
+        self._reset("finish")
+
+    def _reset(self, last_action: str) -> None:
+        self.state = STATE_READY
+        self.task = ""
+        self.start_time = None
+        self.pause_time = None
+        self.start_seconds = 0
+        self.seconds_added = 0
+        self.last_action = last_action
+
+    def status(self, now: datetime | None = None) -> dict:
+        """Return the timer state as a dictionary that can be sent as JSON."""
+        return {
+            "state": self.state,
+            "task": self.task,
+            "remaining": self.remaining(now),
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "pause_time": self.pause_time.isoformat() if self.pause_time else None,
+            "start_seconds": self.start_seconds,
+            "seconds_added": self.seconds_added,
+            "last_action": self.last_action,
+        }
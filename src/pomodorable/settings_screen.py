@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -8,18 +9,27 @@ from textual import on
 from textual.binding import Binding
 from textual.containers import Horizontal, ScrollableContainer
 from textual.screen import Screen
-from textual.validation import Function, Integer
+from textual.validation import Integer
 from textual.widgets import Button, Header, Input, Label, SelectionList, Static, Switch
 
-from pomodorable.app_config import LOG_RETENTION_MIN, AppConfig
+from pomodorable.app_config import LOG_MAX_LINES_MIN, LOG_MAX_TOTAL_MB_MIN, LOG_RETENTION_MIN, AppConfig
+from pomodorable.export_filter import split_filter_spec
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from textual.app import ComposeResult
 
+#  Seconds to wait after typing pauses before checking a path.
+PATH_CHECK_DELAY = 0.3
+
 
 class SettingOutputFilter(Static):
     def __init__(self, *args, **kwargs) -> None:
         self.initial_value = None
+        #  Session options in the filter spec are kept as they are, since only
+        #  the action letters can be selected here.
+        self._spec_options = ""
         super().__init__(*args, **kwargs)
 
     def compose(self) -> ComposeResult:
@@ -33,7 +43,8 @@ class SettingOutputFilter(Static):
         self.query_one(SelectionList).border_title = "Select actions to exclude:"
 
     def _set_options(self, value: str) -> None:
-        flags = value.upper()
+        flags, self._spec_options = split_filter_spec(value)
+        flags = flags.upper()
         items = [
             ("Finish", "F", "F" in flags),
             ("Pause (all)", "P", "P" in flags),
@@ -46,7 +57,7 @@ class SettingOutputFilter(Static):
 
     def _selections_value(self) -> str:
         sel = self.query_one(SelectionList)
-        return "".join(sorted(sel.selected))
+        return "".join(sorted(sel.selected)) + self._spec_options
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
         btn = event.button.id
@@ -163,17 +174,21 @@ class SettingInput(Static):
     @on(Input.Changed)
     def show_validation_results(self, event: Input.Changed) -> None:
         self.check_data_changed()
+        self.validate_input(event)
 
+    def validate_input(self, event: Input.Changed) -> None:
         #  If no validators are set then validation_result is None.
         if event.validation_result is None:
             return
+        self.show_warnings(event.validation_result.failure_descriptions)
 
+    def show_warnings(self, failure_descriptions: list[str]) -> None:
         wrn = self.query_one("#lbl-warn")
-        if event.validation_result.is_valid:
-            wrn.remove_class("show-warnings")
-        else:
-            wrn.update(" ".join(event.validation_result.failure_descriptions))
+        if failure_descriptions:
+            wrn.update(" ".join(failure_descriptions))
             wrn.add_class("show-warnings")
+        else:
+            wrn.remove_class("show-warnings")
 
     def initialize(self, label: str, value: str, validators: list) -> None:
         self.initial_value = value
@@ -190,6 +205,50 @@ class SettingInput(Static):
         return (changed, inp.is_valid, inp.value)
 
 
+class SettingPathInput(SettingInput):
+    """SettingInput for a file or folder path.
+
+    Checking a path can be slow (on a network mount, for example), so it is
+    not done on each keystroke. The check runs on a worker thread once typing
+    pauses, and a newer value cancels a pending check. Results are cached by
+    path string for the life of the screen.
+    """
+
+    def __init__(self, check: Callable[[str], bool], failure_description: str, *args, **kwargs) -> None:
+        self.check = check
+        self.failure_description = failure_description
+        self._results: dict[str, bool] = {}
+        super().__init__(*args, **kwargs)
+
+    def _show_result(self, is_valid: bool) -> None:
+        self.show_warnings([] if is_valid else [self.failure_description])
+
+    def validate_input(self, event: Input.Changed) -> None:
+        self.workers.cancel_group(self, "path-check")
+        if event.value in self._results:
+            self._show_result(self._results[event.value])
+        else:
+            self.run_worker(self._check_path(event.value), group="path-check", exclusive=True)
+
+    async def _check_path(self, value: str) -> None:
+        await asyncio.sleep(PATH_CHECK_DELAY)
+        is_valid = await asyncio.to_thread(self.check, value)
+        self._results[value] = is_valid
+        if self.query_one(Input).value == value:
+            self._show_result(is_valid)
+
+    def get_status(self) -> tuple[bool, bool, str]:
+        """Return a tuple of (changed, is_valid, value).
+        If the current value has not been checked yet, check it now.
+        """
+        value = self.query_one(Input).value
+        is_valid = self._results.get(value)
+        if is_valid is None:
+            is_valid = self.check(value)
+            self._results[value] = is_valid
+        return (value != self.initial_value, is_valid, value)
+
+
 class SettingsScreen(Screen[str]):
     def __init__(self, app_config: AppConfig) -> None:
         self.app_config = app_config
@@ -204,17 +263,19 @@ class SettingsScreen(Screen[str]):
         yield ScrollableContainer(
             SettingInput(id="set-minutes"),
             SettingSwitch(id="set-notify"),
-            SettingInput(id="set-wavfile"),
-            SettingInput(id="set-csv-dir-run"),
+            SettingPathInput(is_valid_file_or_empty, "File does not exist.", id="set-wavfile"),
+            SettingPathInput(is_valid_dir_or_empty, "Folder does not exist.", id="set-csv-dir-run"),
             SettingInput(id="set-csv-name-run"),
-            SettingInput(id="set-csv-dir-daily"),
+            SettingPathInput(is_valid_dir_or_empty, "Folder does not exist.", id="set-csv-dir-daily"),
             SettingOutputFilter(id="set-filter-csv", classes="set-filter"),
-            SettingInput(id="set-md-dir"),
+            SettingPathInput(is_valid_dir_or_empty, "Folder does not exist.", id="set-md-dir"),
             SettingInput(id="set-md-heading"),
             SettingSwitch(id="set-md-append"),
             SettingSwitch(id="set-md-nodup"),
             SettingOutputFilter(id="set-filter-md", classes="set-filter"),
             SettingInput(id="set-log-ret"),
+            SettingInput(id="set-log-size"),
+            SettingInput(id="set-log-lines"),
         )
         yield Horizontal(
             Button("Close", id="btn-close"),
@@ -243,13 +304,13 @@ class SettingsScreen(Screen[str]):
         self.query_one("#set-wavfile").initialize(
             "Play sound file (.wav) at end of session. Optional.",
             self.app_config.wav_file or "",
-            [Function(is_valid_file_or_empty, "File does not exist.")],
+            [],
         )
 
         self.query_one("#set-csv-dir-run").initialize(
             "Running (milti-day) CSV Folder. Leave empty to disable.",
             self.app_config.running_csv_dir or "",
-            [Function(is_valid_dir_or_empty, "Folder does not exist.")],
+            [],
         )
 
         self.query_one("#set-csv-name-run").initialize(
@@ -261,7 +322,7 @@ class SettingsScreen(Screen[str]):
         self.query_one("#set-csv-dir-daily").initialize(
             "Daily CSV Folder. Leave empty to disable.",
             self.app_config.daily_csv_dir or "",
-            [Function(is_valid_dir_or_empty, "Folder does not exist.")],
+            [],
         )
 
         self.query_one("#set-filter-csv").initialize(
@@ -273,7 +334,7 @@ class SettingsScreen(Screen[str]):
         self.query_one("#set-md-dir").initialize(
             "Daily Markdown Folder. Leave empty to disable.",
             self.app_config.daily_md_dir or "",
-            [Function(is_valid_dir_or_empty, "Folder does not exist.")],
+            [],
         )
 
         self.query_one("#set-md-heading").initialize(
@@ -311,6 +372,28 @@ class SettingsScreen(Screen[str]):
             ],
         )
 
+        self.query_one("#set-log-size").initialize(
+            "Log Files Size Limit (MB). Oldest log files are removed when the total is larger.",
+            str(self.app_config.log_max_total_mb),
+            [
+                Integer(
+                    minimum=LOG_MAX_TOTAL_MB_MIN,
+                    failure_description=f"Must be a number greater than {LOG_MAX_TOTAL_MB_MIN - 1}.",
+                )
+            ],
+        )
+
+        self.query_one("#set-log-lines").initialize(
+            "Log Panel Lines (older entries are shown in the Log History screen)",
+            str(self.app_config.log_max_lines),
+            [
+                Integer(
+                    minimum=LOG_MAX_LINES_MIN,
+                    failure_description=f"Must be a number greater than {LOG_MAX_LINES_MIN - 1}.",
+                )
+            ],
+        )
+
     def save_changes(self) -> tuple[bool, bool]:
         """Return a tuple of (has_changes, has_errors).
 
@@ -326,99 +409,112 @@ class SettingsScreen(Screen[str]):
         has_changes = False
         has_errors = False
 
-        changed, is_valid, value = self.query_one("#set-minutes").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.session_minutes = int(value)
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-notify").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.do_notify = value
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-wavfile").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.wav_file = value
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-csv-dir-run").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.running_csv_dir = value
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-csv-name-run").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.running_csv_name = value
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-csv-dir-daily").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.daily_csv_dir = value
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-filter-csv").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.filter_csv = value
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-md-dir").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.daily_md_dir = value
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-md-heading").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.daily_md_heading = value
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-md-append").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.daily_md_append = value
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-md-nodup").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.daily_md_nodup = value
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-filter-md").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.filter_md = value
-            has_changes = True
-
-        changed, is_valid, value = self.query_one("#set-log-ret").get_status()
-        if not is_valid:
-            has_errors = True
-        elif changed:
-            self.app_config.log_retention_days = int(value)
-            has_changes = True
-
-        if has_changes:
-            self.app_config.save()
+        #  Changed settings are saved once, when the batch ends.
+        with self.app_config.batch_update():
+            changed, is_valid, value = self.query_one("#set-minutes").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.session_minutes = int(value)
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-notify").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.do_notify = value
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-wavfile").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.wav_file = value
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-csv-dir-run").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.running_csv_dir = value
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-csv-name-run").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.running_csv_name = value
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-csv-dir-daily").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.daily_csv_dir = value
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-filter-csv").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.filter_csv = value
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-md-dir").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.daily_md_dir = value
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-md-heading").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.daily_md_heading = value
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-md-append").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.daily_md_append = value
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-md-nodup").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.daily_md_nodup = value
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-filter-md").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.filter_md = value
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-log-ret").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.log_retention_days = int(value)
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-log-size").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.log_max_total_mb = int(value)
+                has_changes = True
+
+            changed, is_valid, value = self.query_one("#set-log-lines").get_status()
+            if not is_valid:
+                has_errors = True
+            elif changed:
+                self.app_config.log_max_lines = int(value)
+                has_changes = True
 
         return (has_changes, has_errors)
 
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import time
+from itertools import count
+from typing import TYPE_CHECKING
+
+from pomodorable.app_utils import q_text
+from pomodorable.session_timer import SessionTimer
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from pomodorable.app_data import AppData
+
+#  Rebuild the heap when stale entries outnumber the running timers by this
+#  factor (plus a small constant so small heaps are left alone).
+HEAP_COMPACT_FACTOR = 2
+HEAP_COMPACT_MIN = 64
+
+
+class TimerEngine:
+    """Run many SessionTimers in one event loop, such as one per user on a
+    team server.
+
+    The deadlines of running timers are kept in a min-heap, and one loop
+    timer is set for the earliest deadline, so there is no polling however
+    many timers are active. Heap entries are not removed when a timer is
+    paused or stopped; an entry that no longer matches its timer's deadline
+    is skipped when it reaches the top of the heap.
+
+    Each timer writes through its own AppData, from app_data_factory(user).
+    on_finish(user, timer) is called after a session is finished.
+    """
+
+    def __init__(
+        self,
+        app_data_factory: Callable[[str], AppData],
+        on_finish: Callable[[str, SessionTimer], None] | None = None,
+    ) -> None:
+        self._app_data_factory = app_data_factory
+        self._on_finish = on_finish
+        self.timers: dict[str, SessionTimer] = {}
+        self._heap: list[tuple[float, int, str]] = []
+        #  The current heap entry for each running timer.
+        self._entries: dict[str, tuple[float, int, str]] = {}
+        self._seq = count()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._handle_at: float | None = None
+
+    @property
+    def running_count(self) -> int:
+        return len(self._entries)
+
+    def start(self, loop: asyncio.AbstractEventLoop | None = None) -> None:
+        """Start finishing sessions on the loop (default the running loop)."""
+        self._loop = loop or asyncio.get_running_loop()
+        self._rearm()
+
+    def stop(self) -> None:
+        if self._handle:
+            self._handle.cancel()
+        self._handle = None
+        self._handle_at = None
+        self._loop = None
+
+    def get_timer(self, user: str) -> SessionTimer:
+        timer = self.timers.get(user)
+        if timer is None:
+            timer = SessionTimer(self._app_data_factory(user))
+            self.timers[user] = timer
+        return timer
+
+    def handle_command(self, user: str, line: str) -> dict:
+        """Run one command for the user's timer and return the response.
+
+        The commands are described in TimerDaemon.
+        """
+        command, _, arg = line.strip().partition(" ")
+        arg = arg.strip()
+        if command != "status":
+            logging.info("timer%s: %s", q_text(user), line.strip())
+        timer = self.get_timer(user)
+        try:
+            if command == "status":
+                pass
+            elif command == "start":
+                start_session(timer, arg)
+            elif command == "pause":
+                timer.pause()
+            elif command == "resume":
+                timer.resume(arg)
+            elif command == "extend":
+                timer.extend(arg)
+            elif command == "stop":
+                timer.stop(arg)
+            else:
+                raise ValueError(f"Unknown command: '{command}'")
+        except (ValueError, OSError) as e:
+            response = {"ok": False, "error": str(e)}
+        else:
+            self.schedule(user)
+            response = {"ok": True, **timer.status()}
+        if user:
+            response["user"] = user
+        errors = timer.app_data.retrieve_error_list()
+        if errors:
+            response["errors"] = errors
+        return response
+
+    def schedule(self, user: str) -> None:
+        """Update the heap after the user's timer changed state."""
+        deadline = self.timers[user].deadline()
+        if deadline is None:
+            self._entries.pop(user, None)
+            return
+        when = deadline.timestamp()
+        current = self._entries.get(user)
+        if current and current[0] == when:
+            return
+        entry = (when, next(self._seq), user)
+        self._entries[user] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > HEAP_COMPACT_FACTOR * len(self._entries) + HEAP_COMPACT_MIN:
+            self._compact()
+        self._rearm()
+
+    def _is_current(self, entry: tuple[float, int, str]) -> bool:
+        return self._entries.get(entry[2]) is entry
+
+    def _compact(self) -> None:
+        self._heap = [entry for entry in self._heap if self._is_current(entry)]
+        heapq.heapify(self._heap)
+
+    def _rearm(self) -> None:
+        """Set the loop timer for the earliest current deadline."""
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+        when = self._heap[0][0] if self._heap else None
+        if when == self._handle_at:
+            return
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        self._handle_at = None
+        if when is None or self._loop is None:
+            return
+        self._handle = self._loop.call_later(max(0.0, when - time.time()), self._fire)
+        self._handle_at = when
+
+    def _fire(self) -> None:
+        self._handle = None
+        self._handle_at = None
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if not self._is_current(entry):
+                continue
+            user = entry[2]
+            del self._entries[user]
+            timer = self.timers[user]
+            logging.info("timer%s: finished%s", q_text(user), q_text(timer.task))
+            try:
+                timer.finish()
+            except Exception:
+                logging.exception("Failed to finish session for%s", q_text(user))
+                continue
+            if self._on_finish:
+                self._on_finish(user, timer)
+        self._rearm()
+
+
+def start_session(timer: SessionTimer, arg: str) -> None:
+    """Start the timer from the 'start' command argument: [--seconds N] [task]"""
+    seconds = None
+    if arg.startswith("--seconds"):
+        _, _, rest = arg.partition(" ")
+        value, _, arg = rest.strip().partition(" ")
+        if not value.isdigit() or int(value) == 0:
+            raise ValueError(f"Invalid seconds: '{value}'")
+        seconds = int(value)
+    timer.start(arg.strip(), seconds)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pomodorable.app_utils import minutes_as_hm
+from pomodorable.data_reader import iter_data_rows, tail_offset
+from pomodorable.output_csv import iter_task_sessions
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from pathlib import Path
+
+    from pomodorable.output_csv import TaskSession
+
+
+class TodayTotals:
+    """Sessions and focus time for the current day, kept in memory.
+
+    The totals are seeded from the rows at the end of the data file (read
+    back only as far as the first row of an earlier day). After that, each
+    session is added as it ends, so the data file is not read again until
+    the next day. As in the other totals, a session counts for the day it
+    was started.
+    """
+
+    def __init__(self, data_file: Path) -> None:
+        self.data_file = data_file
+        self.day = ""
+        self.sessions = 0
+        self.finished = 0
+        self.focus_seconds = 0
+
+    def _reset(self, day: str) -> None:
+        self.day = day
+        self.sessions = 0
+        self.finished = 0
+        self.focus_seconds = 0
+
+    def seed(self, now: datetime) -> None:
+        """Set the totals for the date of now from the end of the data file."""
+        self._reset(now.strftime("%Y-%m-%d"))
+        offset = tail_offset(self.data_file, self.day)
+        for session in iter_task_sessions(line.row for line in iter_data_rows(self.data_file, offset)):
+            self.add(session)
+
+    def roll_over(self, now: datetime) -> bool:
+        """Start new totals if the date of now is a new day. Return True if
+        the totals were reset.
+
+        The data file is not read, since no sessions have ended on the new
+        day yet.
+        """
+        day = now.strftime("%Y-%m-%d")
+        if day == self.day:
+            return False
+        self._reset(day)
+        return True
+
+    def add(self, session: TaskSession | None) -> None:
+        """Add a session that has ended, if it was started today."""
+        if session is None or session.date != self.day:
+            return
+        self.sessions += 1
+        self.finished += int(session.finished)
+        self.focus_seconds += session.focus_seconds
+
+    def as_text(self) -> str:
+        return f"Today: {self.finished} finished, {minutes_as_hm(self.focus_seconds // 60)} focus"
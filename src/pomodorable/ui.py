@@ -24,10 +24,20 @@ from textual.widgets import (
 from pomodorable.about_screen import AboutScreen
 from pomodorable.app_data import AppData, sec_to_hms
 from pomodorable.app_utils import q_text
+from pomodorable.daemon import DaemonClient, DaemonError
+from pomodorable.diagnostics_screen import DiagnosticsScreen
+from pomodorable.file_watcher import FileWatcher
+from pomodorable.frecency import scan_history
+from pomodorable.history_suggester import HistorySuggester, PrefixTrie
+from pomodorable.log_screen import LogScreen
+from pomodorable.metrics_file import MetricsFile, MetricsThread
 from pomodorable.mru_screen import MRUScreen
 from pomodorable.quit_screen import QuitScreen
+from pomodorable.search_screen import SearchScreen
+from pomodorable.session_timer import STATE_PAUSED, STATE_READY, STATE_RUNNING
 from pomodorable.settings_screen import SettingsScreen
 from pomodorable.timerbar import TimerBar
+from pomodorable.today_totals import TodayTotals
 
 faulthandler.enable()
 
@@ -38,6 +48,18 @@ FIVE_MINUTES = 5 * ONE_MINUTE
 DEFAULT_SESSION_SECONDS = 25 * ONE_MINUTE
 
 UPDATE_INTERVAL = 1 / 2  # Update twice per second.
+CONFIG_CHECK_INTERVAL = 2.0  # Check for changes to the config file.
+DAEMON_SYNC_INTERVAL = 1.0  # Get the timer status when attached to a daemon.
+TODAY_CHECK_INTERVAL = 10.0  # Check for a new day for the today totals.
+
+#  Buttons that send a command to the daemon when attached.
+DAEMON_COMMANDS = {
+    "btn-start": "start",
+    "btn-pause": "pause",
+    "btn-resume": "resume",
+    "btn-extend": "extend",
+    "btn-stop": "stop",
+}
 
 
 class CountdownDisplay(Static):
@@ -187,6 +209,8 @@ class PomodorableApp(App):
         init_app_data: AppData = None,
         enable_screenshots: bool = False,
         enable_testkey: bool = False,
+        daemon_client: DaemonClient | None = None,
+        metrics_file: Path | None = None,
     ) -> None:
         if init_app_data:
             self.app_data = init_app_data
@@ -194,6 +218,18 @@ class PomodorableApp(App):
             self.app_data = AppData()
         self.do_screenshots = enable_screenshots
         self.do_testkey = enable_testkey
+        self.config_watcher: FileWatcher | None = None
+        self.daemon_client = daemon_client
+        self.metrics_file = metrics_file
+        self.metrics_thread: MetricsThread | None = None
+        #  Last timer status received from the daemon, to detect changes made
+        #  by other clients.
+        self._daemon_status: dict = {}
+        self.today = TodayTotals(self.app_data.data_file)
+        #  Completions for the task and reason inputs, loaded in a thread
+        #  when the app is mounted.
+        self.task_suggester = HistorySuggester()
+        self.reason_suggester = HistorySuggester()
         super().__init__()
 
     ENABLE_COMMAND_PALETTE = False
@@ -203,6 +239,9 @@ class PomodorableApp(App):
 
     BINDINGS = [
         ("down", "select_input", "Recent"),
+        ("ctrl+l", "log_history", "Log"),
+        ("ctrl+r", "search", "Search"),
+        ("f2", "diagnostics", "Diagnostics"),
         ("ctrl+q", "request_quit", "Quit"),
         Binding("ctrl+s", "screenshot", "Screenshot", show=False),
         Binding("ctrl+t", "testkey", "TestKey", show=False),
@@ -230,13 +269,13 @@ class PomodorableApp(App):
             id="frm-set",
         )
         yield Horizontal(
-            Input(id="input-task", placeholder="(task description)"),
+            Input(id="input-task", placeholder="(task description)", suggester=self.task_suggester),
             Button("Start", id="btn-start"),
             id="frm-start",
         )
         yield Horizontal(
             Button("Pause", id="btn-pause"),
-            Input(id="input-reason", placeholder="(reason)"),
+            Input(id="input-reason", placeholder="(reason)", suggester=self.reason_suggester),
             id="frm-pause",
         )
         yield Horizontal(
@@ -246,12 +285,13 @@ class PomodorableApp(App):
             id="frm-paused",
         )
         yield TimerBar()
-        yield RichLog(id="log", markup=True)
+        yield RichLog(id="log", markup=True, max_lines=self.app_data.config.log_max_lines)
         yield Footer()
 
     def on_mount(self) -> None:
         self.title = APP_NAME
-        self.sub_title = ""
+        self.today.seed(datetime.now())
+        self.show_today()
         self.say("Hello.")
 
         if self.app_data.do_debug:
@@ -281,6 +321,206 @@ class PomodorableApp(App):
         # over the terminal quickly.
         self.query_one(Header).query_one("HeaderIcon").tooltip = None
 
+        #  Reload the configuration when the file is changed by another
+        #  program (such as a provisioning script).
+        self.config_watcher = FileWatcher(self.app_data.config.config_file)
+        self.set_interval(CONFIG_CHECK_INTERVAL, self.check_config_file)
+        self.set_interval(TODAY_CHECK_INTERVAL, self.check_today)
+        self.run_worker(self.load_suggestions, thread=True)
+
+        if self.metrics_file:
+            metrics = MetricsFile(self.metrics_file, self.app_data.data_file, self.timer_state)
+            self.metrics_thread = MetricsThread(metrics)
+            self.metrics_thread.start()
+
+        if self.daemon_client:
+            self.say(f"Attached to timer daemon at {self.daemon_client.sock_path}")
+            self.sync_from_daemon(announce=False)
+            self.set_interval(DAEMON_SYNC_INTERVAL, self.sync_from_daemon)
+
+    def on_unmount(self) -> None:
+        if self.config_watcher:
+            self.config_watcher.close()
+            self.config_watcher = None
+        if self.daemon_client:
+            self.daemon_client.close()
+        if self.metrics_thread:
+            self.metrics_thread.stop()
+            self.metrics_thread = None
+
+    def timer_state(self) -> str:
+        """Return the state of the session (for the metrics file, which is
+        written on another thread).
+        """
+        if self.has_class("paused"):
+            return STATE_PAUSED
+        if self.has_class("running"):
+            return STATE_RUNNING
+        return STATE_READY
+
+    def daemon_command(self, line: str) -> dict | None:
+        """Send a command to the daemon. Return the status, or None if the
+        command failed.
+        """
+        try:
+            response = self.daemon_client.command(line)
+        except DaemonError as e:
+            self.say(f"Daemon error: {e}", console_text=f"[bold italic]Daemon error: {e}")
+            return None
+        for err in response.get("errors", []):
+            self.say(err, console_text=f"[bold italic]{err}")
+        if not response["ok"]:
+            self.say(response["error"], console_text=f"[bold italic]{response['error']}")
+            return None
+        return response
+
+    def sync_from_daemon(self, status: dict | None = None, announce: bool = True) -> None:
+        """Show the daemon's timer state in the countdown and widgets.
+
+        With announce, a change made by another client (such as a script
+        bound to a hotkey) is written to the log panel.
+
+        Not done while another screen is open, as for check_config_file.
+        """
+        if len(self.screen_stack) > 1:
+            return
+        if status is None:
+            status = self.daemon_command("status")
+            if status is None:
+                return
+        previous = self._daemon_status
+        self._daemon_status = status
+        changed = (status["last_action"], status["start_time"], status["pause_time"]) != (
+            previous.get("last_action"),
+            previous.get("start_time"),
+            previous.get("pause_time"),
+        )
+        if announce and changed and status["last_action"]:
+            if status["last_action"] == "finish":
+                self.say("Finished", console_text="[bold]Finished")
+            else:
+                self.say(f"{status['last_action'].capitalize()}{q_text(status['task'])} (daemon)")
+
+        countdown = self.query_one(CountdownDisplay)
+        time_ending = self.query_one("#time-ending")
+        state = status["state"]
+        if state == STATE_READY:
+            if self.has_class("running"):
+                self.remove_class("paused")
+                self.remove_class("running")
+                countdown.reset(timer_resume=True)
+                time_ending.sync_time(countdown.seconds)
+                self.update_widgets_enabled()
+                self.query_one("#input-task").focus()
+                #  The daemon wrote the session, so it is not in this
+                #  process's AppData.
+                self.today.seed(datetime.now())
+                self.show_today()
+            return
+
+        countdown.start_time = datetime.fromisoformat(status["start_time"])
+        countdown.start_seconds = status["start_seconds"]
+        countdown.seconds_added = status["seconds_added"]
+        pause_time = status["pause_time"]
+        countdown.pause_time = datetime.fromisoformat(pause_time) if pause_time else None
+        if not self.has_class("running"):
+            self.query_one("#time-started").time = countdown.start_time
+        self.add_class("running")
+        self.set_class(state == STATE_PAUSED, "paused")
+        countdown.update_countdown()
+        time_ending.sync_time(countdown.seconds)
+        if changed:
+            self.update_widgets_enabled()
+
+    def daemon_button_pressed(self, btn: str) -> None:
+        """Send the command for a timer button to the daemon."""
+        countdown = self.query_one(CountdownDisplay)
+        command = DAEMON_COMMANDS[btn]
+        reason = self.query_one("#input-reason").value
+        if btn == "btn-start":
+            task = self.query_one("#input-task").value
+            self.say(f"Start{q_text(task)}")
+            line = f"start --seconds {countdown.seconds} {task}"
+        elif btn == "btn-pause":
+            self.say("Pause...")
+            line = command
+        elif btn == "btn-stop":
+            self.say(f"STOP '{reason}'", console_text=f"[bold]STOP{q_text(reason)}")
+            line = f"{command} {reason}"
+        else:
+            self.say(f"{command.capitalize()}{q_text(reason)}")
+            line = f"{command} {reason}"
+        self.sync_from_daemon(self.daemon_command(line), announce=False)
+        if self.has_class("paused"):
+            self.query_one("#input-reason").focus()
+        elif self.has_class("running"):
+            self.query_one("#btn-pause").focus()
+        else:
+            self.query_one("#input-task").focus()
+
+    def check_config_file(self) -> None:
+        """Reload the configuration if the file changed.
+
+        Not done while another screen (such as Settings) is open. The change
+        is picked up by the next check after that screen is closed.
+        """
+        if len(self.screen_stack) > 1 or not self.config_watcher or not self.config_watcher.changed():
+            return
+        session_minutes = self.app_data.config.session_minutes
+        if self.app_data.reload_config():
+            self.config_reloaded(session_minutes_changed=session_minutes != self.app_data.config.session_minutes)
+
+    def config_reloaded(self, session_minutes_changed: bool) -> None:
+        self.say("Configuration file changed. Settings reloaded.")
+        self.query_one(RichLog).max_lines = self.app_data.config.log_max_lines
+        if session_minutes_changed and not self.has_class("running"):
+            countdown = self.query_one(CountdownDisplay)
+            countdown.reset(timer_resume=True)
+            self.query_one("#time-ending").sync_time(countdown.seconds)
+
+    def load_suggestions(self) -> None:
+        """Build the completions from the frecency scores of all past tasks
+        and reasons. Runs in a thread.
+
+        The first time, there are no saved scores, and they are set from the
+        data file (only once, after which scores are kept as entries are
+        added). The MRU list is only changed on the UI thread.
+        """
+        mru_list = self.app_data.mru_list
+        if not mru_list.has_frecency():
+            self.call_from_thread(mru_list.seed_frecency, *scan_history(self.app_data.data_file))
+        tasks, reasons = self.call_from_thread(lambda: (mru_list.task_scores(), mru_list.reason_scores()))
+        self.call_from_thread(self.suggestions_loaded, PrefixTrie.from_scores(tasks), PrefixTrie.from_scores(reasons))
+
+    def suggestions_loaded(self, task_trie: PrefixTrie, reason_trie: PrefixTrie) -> None:
+        #  Keep entries used while the tries were being built.
+        for suggester, trie in ((self.task_suggester, task_trie), (self.reason_suggester, reason_trie)):
+            for text, score in suggester.trie.scores.items():
+                trie.add(text, score)
+            suggester.set_trie(trie)
+
+    def remember_input(self, btn: str) -> None:
+        """Add the task or reason used by a timer button to the completions.
+        Stop reasons are not added, as they are not in the MRU list.
+        """
+        if btn == "btn-start":
+            self.task_suggester.add(self.query_one("#input-task").value, datetime.now())
+        elif btn in {"btn-resume", "btn-extend"}:
+            self.reason_suggester.add(self.query_one("#input-reason").value, datetime.now())
+
+    def show_today(self) -> None:
+        self.sub_title = self.today.as_text()
+
+    def check_today(self) -> None:
+        if self.today.roll_over(datetime.now()):
+            self.show_today()
+
+    def session_ended(self) -> None:
+        """Add the session just written to the today totals."""
+        self.today.roll_over(datetime.now())
+        self.today.add(self.app_data.latest_session())
+        self.show_today()
+
     def say(self, message: str, console_text: str = "") -> None:
         msg = message if console_text == "" else console_text
         self.query_one(RichLog).write(f"{datetime.now().strftime('%H:%M:%S')} - {msg}")
@@ -321,6 +561,11 @@ class PomodorableApp(App):
             return
 
         btn = event.button.id
+        self.remember_input(btn)
+        if self.daemon_client and btn in DAEMON_COMMANDS:
+            self.daemon_button_pressed(btn)
+            return
+
         if btn == "btn-reset":
             self.say("Reset")
             countdown.reset(timer_resume=True)
@@ -383,6 +628,7 @@ class PomodorableApp(App):
             reason = self.query_one("#input-reason").value
             self.say(f"STOP '{reason}'", console_text=f"[bold]STOP{q_text(reason)}")
             self.app_data.write_stop(countdown.start_time, datetime.now(), reason)
+            self.session_ended()
             self.remove_class("paused")
             self.remove_class("running")
             countdown.reset(timer_resume=True)
@@ -413,15 +659,21 @@ class PomodorableApp(App):
         self.query_one(CountdownDisplay).update_timer.resume()
 
     def settings_closed(self, msg: str) -> None:
+        self.query_one(RichLog).max_lines = self.app_data.config.log_max_lines
         self.say(msg)
         self.query_one(CountdownDisplay).update_timer.resume()
 
     def countdown_finished(self):
+        if self.daemon_client:
+            #  The daemon writes the finish and shows the notification.
+            self.sync_from_daemon()
+            return
         self.say("Finished", console_text="[bold]Finished")
         if self.has_class("running"):
             countdown = self.query_one(CountdownDisplay)
             logging.debug("countdown_finished: call write_finish")
             self.app_data.write_finish(datetime.now(), countdown.start_time)
+            self.session_ended()
             logging.debug("countdown_finished: remove classes")
             self.remove_class("paused")
             self.remove_class("running")
@@ -480,15 +732,15 @@ class PomodorableApp(App):
         """Open the MRUScreen for the focused input field."""
         if self.focused.id not in ["input-task", "input-reason"]:
             return
-        mru = None
+        ranking = None
         if self.has_class("paused"):
-            mru = self.app_data.mru_list.get_reasons()
+            ranking = self.app_data.mru_list.reason_ranking
         elif not self.has_class("running"):
-            mru = self.app_data.mru_list.get_tasks()
-        if mru:
+            ranking = self.app_data.mru_list.task_ranking
+        if ranking:
             self.query_one(CountdownDisplay).update_timer.pause()
             self.push_screen(
-                MRUScreen(mru),
+                MRUScreen(ranking),
                 self.mru_closed,
             )
 
@@ -502,6 +754,49 @@ class PomodorableApp(App):
             inp.insert_text_at_cursor(text)
         self.query_one(CountdownDisplay).update_timer.resume()
 
+    def action_log_history(self) -> None:
+        """Open the LogScreen to page through entries no longer in the log panel."""
+        if len(self.screen_stack) > 1:
+            return
+        self.query_one(CountdownDisplay).update_timer.pause()
+        self.push_screen(
+            LogScreen(self.app_data.log_files()),
+            self.log_history_closed,
+        )
+
+    def log_history_closed(self, _: str) -> None:
+        self.query_one(CountdownDisplay).update_timer.resume()
+
+    def action_search(self) -> None:
+        """Open the SearchScreen to find past sessions."""
+        if len(self.screen_stack) > 1:
+            return
+        self.query_one(CountdownDisplay).update_timer.pause()
+        self.push_screen(
+            SearchScreen(self.app_data.search_index),
+            self.search_closed,
+        )
+
+    def search_closed(self, task: str) -> None:
+        """Put the task of the selected session in the task input, if a
+        session is not running.
+        """
+        self.query_one(CountdownDisplay).update_timer.resume()
+        if task and not self.has_class("running"):
+            inp: Input = self.query_one("#input-task")
+            inp.value = task
+            inp.focus()
+
+    def action_diagnostics(self) -> None:
+        """Open the DiagnosticsScreen to see how long writes have taken."""
+        if len(self.screen_stack) > 1:
+            return
+        self.query_one(CountdownDisplay).update_timer.pause()
+        self.push_screen(DiagnosticsScreen(), self.diagnostics_closed)
+
+    def diagnostics_closed(self, _: str) -> None:
+        self.query_one(CountdownDisplay).update_timer.resume()
+
     def action_request_quit(self) -> None:
         self.push_screen(QuitScreen())
 
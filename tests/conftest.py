@@ -7,6 +7,36 @@ import pytest
 from pomodorable.app_data import AppData
 
 
+def write_session(
+    app_data: AppData,
+    start_time: datetime,
+    task: str,
+    reason: str = "",
+    *,
+    minutes: int = 25,
+    pause_minutes: int = 5,
+    pause_seconds: int = 60,
+    stop_reason: str | None = None,
+    end: bool = True,
+) -> None:
+    """Write a 25 minute session to app_data.
+
+    If a reason is given, the session is paused pause_minutes after it starts
+    for pause_seconds. The session ends minutes after it starts: it is stopped
+    if stop_reason is given, otherwise it is finished. If end is False, the
+    session is left running.
+    """
+    app_data.write_start(start_time, task, 1500)
+    if reason:
+        app_data.write_pause(start_time, start_time + timedelta(minutes=pause_minutes), reason, pause_seconds, False)
+    if not end:
+        return
+    if stop_reason is None:
+        app_data.write_finish(start_time + timedelta(minutes=minutes), start_time)
+    else:
+        app_data.write_stop(start_time, start_time + timedelta(minutes=minutes), stop_reason)
+
+
 @pytest.fixture
 def app_data_with_four_test_sessions(tmp_path) -> tuple[AppData, list[datetime]]:
     """Return an AppData instance with some test sessions written to it.
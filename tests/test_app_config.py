@@ -1,3 +1,5 @@
+import pytest
+
 from pomodorable.app_config import AppConfig
 from pomodorable.app_data import AppData
 
@@ -40,3 +42,101 @@ def test_app_config_save_load(tmp_path):
     assert config_loaded.daily_md_append is True
     assert config_loaded.log_retention_days == 7
     assert config_loaded.running_csv_name == "running.csv"
+
+
+def count_writes(app_config: AppConfig, monkeypatch) -> list:
+    writes = []
+    write_doc = app_config._write_doc
+
+    def counting_write_doc(doc):
+        writes.append(doc)
+        write_doc(doc)
+
+    monkeypatch.setattr(app_config, "_write_doc", counting_write_doc)
+    return writes
+
+
+def test_app_config_save_skips_unchanged(tmp_path, monkeypatch):
+    config_file = tmp_path / "pomodorable-config.toml"
+    app_config = AppConfig(config_file)
+    app_config.load()
+    writes = count_writes(app_config, monkeypatch)
+
+    app_config.save()
+    assert not writes
+
+    app_config.session_minutes = 30
+    app_config.save()
+    assert len(writes) == 1
+
+
+def test_app_config_batch_update_saves_once(tmp_path, monkeypatch):
+    config_file = tmp_path / "pomodorable-config.toml"
+    app_config = AppConfig(config_file)
+    app_config.load()
+    app_data = AppData(app_config, init_data_path=tmp_path)
+    writes = count_writes(app_config, monkeypatch)
+
+    with app_config.batch_update():
+        app_data.set_daily_csv_dir("/path/to/csv")
+        app_data.set_running_csv_dir("/path/to/csv2")
+        app_data.set_daily_md_dir("/path/to/md")
+        assert not writes
+    assert len(writes) == 1
+
+    config_loaded = AppConfig(config_file)
+    config_loaded.load()
+    assert config_loaded.daily_md_dir == "/path/to/md"
+
+
+def test_app_config_batch_update_rollback(tmp_path, monkeypatch):
+    config_file = tmp_path / "pomodorable-config.toml"
+    app_config = AppConfig(config_file)
+    app_config.load()
+    writes = count_writes(app_config, monkeypatch)
+
+    with pytest.raises(ValueError), app_config.batch_update():
+        app_config.daily_csv_dir = "/path/to/csv"
+        app_config.session_minutes = int("not a number")
+
+    assert app_config.daily_csv_dir == ""
+    assert not writes
+
+
+def test_app_config_save_keeps_external_changes(tmp_path):
+    config_file = tmp_path / "pomodorable-config.toml"
+    app_config = AppConfig(config_file)
+    app_config.load()
+
+    # Another program adds a setting after the file was loaded.
+    config_file.write_text(f"{config_file.read_text()}extra_setting = 'keep me'\n")
+
+    app_config.session_minutes = 30
+    app_config.save()
+    text = config_file.read_text()
+    assert "extra_setting = 'keep me'" in text
+    assert "session_minutes = 30" in text
+
+
+def test_app_config_save_retries_after_failed_write(tmp_path, monkeypatch):
+    config_file = tmp_path / "pomodorable-config.toml"
+    app_config = AppConfig(config_file)
+    app_config.load()
+    write_doc = app_config._write_doc
+    failures = [OSError("disk full")]
+
+    def failing_write_doc(doc):
+        if failures:
+            raise failures.pop()
+        write_doc(doc)
+
+    monkeypatch.setattr(app_config, "_write_doc", failing_write_doc)
+
+    app_config.session_minutes = 30
+    app_config.save()
+    assert "session_minutes = 25" in config_file.read_text()
+
+    # The failed write did not change the cached document, so the setting
+    # is still seen as changed and is written on the next save.
+    app_config.save()
+    assert "session_minutes = 30" in config_file.read_text()
@@ -3,15 +3,12 @@ from __future__ import annotations
 import logging
 from csv import DictReader
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING
-
-if TYPE_CHECKING:
-    from pathlib import Path
+from pathlib import Path
 
 import pytest
 
 from pomodorable.app_config import AppConfig
-from pomodorable.app_data import AppData
+from pomodorable.app_data import BYTES_PER_MB, AppData
 from pomodorable.app_utils import get_date_from_str
 from pomodorable.output_md import TASK_HEADING_MARKER, write_to_daily_md
 
@@ -410,9 +407,11 @@ def test_purge_log_files(tmp_path):
     app_config = AppConfig(config_file)
     app_data = AppData(init_app_config=app_config, init_data_path=tmp_path)
 
-    # Make 8 fake log files.
-    for i in range(8):
-        p = tmp_path / f"pomodorable-2024010{i + 1}.log"
+    # Make fake log files for each of the previous 8 days.
+    today = datetime.now()
+    for i in range(1, 9):
+        day = today - timedelta(days=i)
+        p = tmp_path / f"pomodorable-{day.strftime('%Y%m%d')}.log"
         p.write_text("")
 
     # Should create a new log file.
@@ -421,15 +420,18 @@ def test_purge_log_files(tmp_path):
     # Default retention days is 30. Change it to 5.
     app_data.config.log_retention_days = 5
 
-    # Run the private method to purge older log files.
+    # Run the private method to purge older log files. Files are compressed
+    # and purged in the background, so wait for that to finish.
     app_data._purge_log_files()
+    app_data._log_file_handler.join_archive()
 
-    # Check that all but 5 most recent were purged.
-    log_files = sorted(tmp_path.glob("*.log"))
-    assert len(log_files) == 5
-    assert log_files[0].name == "pomodorable-20240105.log"
-    assert log_files[-2].name == "pomodorable-20240108.log"
-    assert log_files[-1].name == app_data.log_file.name
+    # Check that files older than 5 days were purged, and the files from
+    # previous days that were kept are compressed.
+    assert sorted(tmp_path.glob("*.log")) == [app_data.log_file]
+    archives = sorted(tmp_path.glob("*.log.gz"))
+    assert len(archives) == 5
+    assert archives[0].name == f"pomodorable-{(today - timedelta(days=5)).strftime('%Y%m%d')}.log.gz"
+    assert archives[-1].name == f"pomodorable-{(today - timedelta(days=1)).strftime('%Y%m%d')}.log.gz"
 
 
 @pytest.mark.parametrize(
@@ -721,3 +723,120 @@ def test_timesheet_export_handles_stop_after_extend(tmp_path: Path):
 
     #  Pause-to-Extend time should be subtracted from Start-to-Stop.
     assert lines[4].split(",")[3] == "9"
+
+
+def test_stop_logging_writes_queued_records(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    logging.info("Queued log record")
+    app_data.stop_logging()
+    assert "Queued log record" in app_data.log_file.read_text()
+
+    # Handler is removed, so this is not written.
+    logging.info("After stop")
+    assert "After stop" not in app_data.log_file.read_text()
+
+
+def test_stop_logging_removes_exit_hook(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr("pomodorable.app_data.atexit.register", registered.append)
+    monkeypatch.setattr("pomodorable.app_data.atexit.unregister", registered.remove)
+    app_data = AppData(init_data_path=tmp_path)
+    assert registered == [app_data.stop_logging]
+    app_data.stop_logging()
+    assert registered == []
+
+
+def test_reload_config(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    old_config = app_data.config
+    assert not app_data.reload_config()
+
+    config_file = app_data.config.config_file
+    config_file.write_text(config_file.read_text().replace("session_minutes = 25", "session_minutes = 50"))
+
+    assert app_data.reload_config()
+    assert app_data.config is not old_config
+    assert app_data.config.session_minutes == 50
+    assert old_config.session_minutes == 25
+    app_data.stop_logging()
+
+
+def test_reload_config_applies_log_retention(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    handler = app_data._log_file_handler
+    handler.join_archive()
+    config_file = app_data.config.config_file
+    text = config_file.read_text()
+    text = text.replace(f"log_retention_days = {app_data.config.log_retention_days}", "log_retention_days = 45")
+    text = text.replace(f"log_max_total_mb = {app_data.config.log_max_total_mb}", "log_max_total_mb = 7")
+    config_file.write_text(text)
+
+    assert app_data.reload_config()
+    assert handler.retention_days == 45
+    assert handler.max_total_bytes == 7 * BYTES_PER_MB
+    app_data.stop_logging()
+
+
+def test_reload_config_keeps_settings_if_file_is_bad(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    old_config = app_data.config
+    config_file = app_data.config.config_file
+
+    # Half written by another program.
+    config_file.write_text('session_minutes = 50\ndaily_csv_dir = "/pa')
+    assert not app_data.reload_config()
+    assert app_data.config is old_config
+    assert config_file.exists()
+    assert not config_file.with_suffix(".bad").exists()
+
+    # Read again once the write is complete.
+    config_file.write_text('session_minutes = 50\ndaily_csv_dir = "/path"\n')
+    assert app_data.reload_config()
+    assert app_data.config.session_minutes == 50
+
+
+def test_output_dir_is_cached(tmp_path, monkeypatch):
+    app_data = AppData(init_data_path=tmp_path)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    app_data.set_daily_csv_dir(str(out_dir))
+    assert app_data.get_daily_csv_path() == out_dir
+
+    # A cached folder is not resolved again.
+    resolve_calls = []
+    resolve = Path.resolve
+
+    def counting_resolve(self, *args, **kwargs):
+        resolve_calls.append(self)
+        return resolve(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "resolve", counting_resolve)
+    assert app_data.get_daily_csv_path() == out_dir
+    assert not resolve_calls
+
+    # A changed setting is resolved.
+    app_data.set_daily_csv_dir(str(tmp_path))
+    assert app_data.get_daily_csv_path() == tmp_path
+    assert len(resolve_calls) == 1
+
+
+def test_output_write_failure_rechecks_dir(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    app_data.set_daily_csv_dir(str(out_dir))
+    assert app_data.get_daily_csv_path() == out_dir
+
+    # Remove the folder after it was cached. The write fails and the error
+    # is queued, rather than raised.
+    out_dir.rmdir()
+    start_time = datetime.fromisoformat("2024-01-02T08:30:01")
+    app_data.write_start(start_time, "Test session", 10)
+    app_data.write_finish(finish_time=start_time + timedelta(seconds=10), start_time=start_time)
+    errors = app_data.retrieve_error_list()
+    assert any("Failed to write" in err for err in errors)
+
+    # The next lookup checks the folder again.
+    assert app_data.get_daily_csv_path() is None
+    errors = app_data.retrieve_error_list()
+    assert any("Directory does not exist" in err for err in errors)
@@ -0,0 +1,69 @@
+import gzip
+import logging
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pomodorable.app_logging import DailyLogFileHandler, compress_log_file, purge_log_files
+
+
+def make_log_file(log_dir: Path, date_str: str, size: int) -> Path:
+    log_file = log_dir / f"pomodorable-{date_str}.log"
+    log_file.write_text("x" * size)
+    return log_file
+
+
+def test_compress_log_file(tmp_path: Path):
+    log_file = make_log_file(tmp_path, "20240102", 1000)
+    gz_file = compress_log_file(log_file)
+    assert gz_file == tmp_path / "pomodorable-20240102.log.gz"
+    assert not log_file.exists()
+    with gzip.open(gz_file, "rt") as f:
+        assert f.read() == "x" * 1000
+
+
+def test_purge_log_files_by_age(tmp_path: Path):
+    old = make_log_file(tmp_path, "20240101", 10)
+    kept = make_log_file(tmp_path, "20240105", 10)
+    current = make_log_file(tmp_path, "20240110", 10)
+    removed = purge_log_files(
+        tmp_path, "pomodorable", current, retention_days=7, max_total_bytes=10000, today=datetime(2024, 1, 10)
+    )
+    assert removed == [old]
+    assert kept.exists()
+    assert current.exists()
+
+
+def test_purge_log_files_by_size(tmp_path: Path):
+    oldest = make_log_file(tmp_path, "20240106", 100)
+    older = make_log_file(tmp_path, "20240107", 100)
+    newer = make_log_file(tmp_path, "20240108", 100)
+    current = make_log_file(tmp_path, "20240110", 500)
+    removed = purge_log_files(
+        tmp_path, "pomodorable", current, retention_days=30, max_total_bytes=650, today=datetime(2024, 1, 10)
+    )
+    assert removed == [oldest, older]
+    assert newer.exists()
+    assert current.exists()
+
+
+def test_handler_rolls_over_at_midnight(tmp_path: Path):
+    handler = DailyLogFileHandler(tmp_path, "pomodorable", retention_days=30, max_total_bytes=10_000_000)
+    first_file = handler.current_file
+
+    # Pretend the first file is from yesterday and that midnight has passed.
+    yesterday = datetime.now() - timedelta(days=1)
+    yesterday_file = tmp_path / f"pomodorable-{yesterday:%Y%m%d}.log"
+    handler.stream.close()
+    first_file.replace(yesterday_file)
+    handler.stream = None
+    handler.baseFilename = str(yesterday_file)
+    handler._rollover_at = 0
+
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "after midnight", None, None)
+    handler.emit(record)
+    handler.close()
+
+    assert handler.current_file == first_file
+    assert "after midnight" in first_file.read_text()
+    assert not yesterday_file.exists()
+    assert yesterday_file.with_suffix(".log.gz").exists()
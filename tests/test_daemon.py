@@ -0,0 +1,192 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from click.testing import CliRunner
+
+from pomodorable.app_data import AppData
+from pomodorable.cli import cli
+from pomodorable.daemon import DaemonClient, DaemonError, TimerDaemon, daemon_supported, socket_path
+from pomodorable.session_timer import STATE_PAUSED, STATE_READY, STATE_RUNNING, SessionTimer, TimerStateError
+from pomodorable.ui import CountdownDisplay, PomodorableApp
+
+pytestmark = pytest.mark.skipif(not daemon_supported(), reason="Requires Unix domain sockets")
+
+
+def data_actions(app_data: AppData) -> list[str]:
+    lines = (app_data.data_path / "pomodorable-data.csv").read_text().splitlines()[1:]
+    return [line.split(",")[4].strip('"') for line in lines]
+
+
+async def wait_for_socket(daemon: TimerDaemon) -> None:
+    for _ in range(100):
+        if daemon.sock_path.exists():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Daemon socket not created")
+
+
+def test_session_timer_actions(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    timer = SessionTimer(app_data)
+    t0 = datetime.fromisoformat("2024-03-04T09:00:00")
+
+    assert timer.remaining() == app_data.config.session_seconds
+    timer.start("Write report", 600, now=t0)
+    assert timer.state == STATE_RUNNING
+    assert timer.remaining(t0 + timedelta(seconds=100)) == 500
+
+    timer.pause(now=t0 + timedelta(seconds=100))
+    assert timer.state == STATE_PAUSED
+    assert timer.remaining(t0 + timedelta(seconds=400)) == 500
+
+    timer.extend("Phone", now=t0 + timedelta(seconds=160))
+    assert timer.seconds_added == 60
+    assert timer.deadline() == t0 + timedelta(seconds=660)
+
+    with pytest.raises(TimerStateError):
+        timer.start("Another task")
+
+    timer.finish(now=t0 + timedelta(seconds=660))
+    assert timer.state == STATE_READY
+    assert timer.last_action == "finish"
+    assert data_actions(app_data) == ["Start", "Pause", "Finish"]
+    app_data.stop_logging()
+
+
+async def test_daemon_round_trip(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    daemon = TimerDaemon(app_data)
+    serve_task = asyncio.create_task(daemon.serve())
+    await wait_for_socket(daemon)
+
+    def send_commands() -> list[dict]:
+        client = DaemonClient(socket_path(tmp_path))
+        try:
+            return [
+                client.command("start --seconds 300 Test daemon"),
+                client.command("pause"),
+                client.command("pause"),
+                client.command("extend Coffee"),
+                client.command("stop Done"),
+                client.command("status"),
+                client.command("bogus"),
+                client.command("shutdown"),
+            ]
+        finally:
+            client.close()
+
+    responses = await asyncio.to_thread(send_commands)
+    await asyncio.wait_for(serve_task, timeout=2)
+
+    start, pause, pause_again, extend, stop, status, bogus, _ = responses
+    assert start["ok"]
+    assert start["state"] == STATE_RUNNING
+    assert start["task"] == "Test daemon"
+    assert start["remaining"] == 300
+    assert pause["state"] == STATE_PAUSED
+    assert not pause_again["ok"]
+    assert "Cannot pause when paused" in pause_again["error"]
+    assert extend["state"] == STATE_RUNNING
+    assert stop["last_action"] == "stop"
+    assert status["state"] == STATE_READY
+    assert not bogus["ok"]
+
+    assert not daemon.sock_path.exists()
+    assert data_actions(app_data) == ["Start", "Pause", "Stop"]
+    app_data.stop_logging()
+
+
+async def test_daemon_finishes_session(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    app_data.config.do_notify = False
+    daemon = TimerDaemon(app_data)
+    serve_task = asyncio.create_task(daemon.serve())
+    await wait_for_socket(daemon)
+
+    response = daemon.handle_line("start --seconds 1 Short one")
+    assert response["state"] == STATE_RUNNING
+
+    await asyncio.sleep(1.5)
+    assert daemon.timer.state == STATE_READY
+    assert daemon.timer.last_action == "finish"
+
+    daemon.shutdown()
+    await asyncio.wait_for(serve_task, timeout=2)
+    assert data_actions(app_data) == ["Start", "Finish"]
+    app_data.stop_logging()
+
+
+async def test_attached_app_controls_daemon(tmp_path):
+    daemon_dir = tmp_path / "daemon"
+    daemon_dir.mkdir()
+    daemon_data = AppData(init_data_path=daemon_dir)
+    daemon = TimerDaemon(daemon_data)
+
+    #  The app's client blocks on the socket, so the daemon runs on its own
+    #  event loop in a thread.
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_until_complete, args=(daemon.serve(),))
+    thread.start()
+    try:
+        for _ in range(100):
+            if daemon.sock_path.exists():
+                break
+            await asyncio.sleep(0.01)
+
+        app_data = AppData(init_data_path=tmp_path)
+        app = PomodorableApp(init_app_data=app_data, daemon_client=DaemonClient(daemon.sock_path))
+        async with app.run_test() as pilot:
+            pilot.app.query_one("#input-task").value = "Attached task"
+            await pilot.click("#btn-start")
+            await pilot.pause(0.2)
+            assert pilot.app.has_class("running")
+            assert daemon.timer.state == STATE_RUNNING
+            assert daemon.timer.task == "Attached task"
+
+            #  A change made by another client is picked up by the app.
+            other = DaemonClient(daemon.sock_path)
+            assert other.command("pause")["ok"]
+            other.close()
+            await pilot.pause(1.5)
+            assert pilot.app.has_class("paused")
+            assert pilot.app.query_one(CountdownDisplay).pause_time is not None
+
+            await pilot.click("#btn-stop")
+            await pilot.pause(0.2)
+            assert not pilot.app.has_class("running")
+        app_data.stop_logging()
+
+        #  The daemon wrote the session, not the app.
+        assert data_actions(daemon_data) == ["Start", "Stop"]
+        assert not (tmp_path / "pomodorable-data.csv").exists() or data_actions(app_data) == []
+    finally:
+        loop.call_soon_threadsafe(daemon.shutdown)
+        thread.join(timeout=5)
+        loop.close()
+        daemon_data.stop_logging()
+
+
+def test_cli_send_without_daemon(tmp_path, monkeypatch):
+    monkeypatch.setenv("POMODORABLE_TEST_DATA_DIR", str(tmp_path))
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--send", "status"])
+    assert result.exit_code == 1
+
+
+def test_client_without_daemon(tmp_path):
+    client = DaemonClient(socket_path(tmp_path))
+    with pytest.raises(DaemonError):
+        client.command("status")
+
+
+def test_daemon_timer_state(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    daemon = TimerDaemon(app_data)
+    assert daemon.timer_state() == STATE_READY
+    assert daemon.handle_line("start --seconds 300 Test state")["ok"]
+    assert daemon.timer_state() == STATE_RUNNING
+    assert daemon.handle_line("pause")["ok"]
+    assert daemon.timer_state() == STATE_PAUSED
+    app_data.stop_logging()
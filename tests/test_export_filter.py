@@ -0,0 +1,130 @@
+from datetime import datetime
+
+import pytest
+from click.testing import CliRunner
+
+from pomodorable.app_config import AppConfig
+from pomodorable.app_data import AppData
+from pomodorable.cli import cli
+from pomodorable.export_filter import checked_filter_spec, compile_filter, normalize_filter_spec
+from pomodorable.output_md import rows_as_md
+from tests.conftest import write_session
+
+
+@pytest.fixture
+def app_data_with_sessions(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    write_session(
+        app_data,
+        datetime.fromisoformat("2024-03-04T08:00:00"),
+        "Write report",
+        "Call",
+        minutes=20,
+        pause_minutes=1,
+        stop_reason="Done",
+    )
+    write_session(app_data, datetime.fromisoformat("2024-03-04T13:30:00"), "Review PR", minutes=5, stop_reason="Done")
+    write_session(
+        app_data, datetime.fromisoformat("2024-03-05T09:00:00"), "Report review", minutes=30, stop_reason="Done"
+    )
+    write_session(app_data, datetime.fromisoformat("2024-03-06T16:00:00"), "Plan", stop_reason="Done")
+    yield app_data
+    app_data.stop_logging()
+
+
+def test_normalize_keeps_option_case():
+    assert normalize_filter_spec("fp;task=Fix") == "FP;task=Fix"
+    assert normalize_filter_spec("x") == "X"
+    assert compile_filter("fp;task=x") is compile_filter("fp;task=x")
+
+
+@pytest.mark.parametrize(
+    "spec",
+    ["F;min=ten", "F;task=(", "F;from=2024-13-01", "F;after=25:00", "F;color=red", "F;task"],
+)
+def test_invalid_options(spec):
+    with pytest.raises(ValueError):
+        compile_filter(spec)
+    assert checked_filter_spec(spec.lower()) == "F"
+
+
+@pytest.mark.parametrize(
+    ("spec", "tasks"),
+    [
+        ("", ["Write report", "Review PR", "Report review", "Plan"]),
+        ("X;task=report", ["Write report", "Report review"]),
+        ("task=^review", ["Review PR"]),
+        ("min=10", ["Write report", "Report review", "Plan"]),
+        ("min=20", ["Report review", "Plan"]),
+        ("from=2024-03-05", ["Report review", "Plan"]),
+        ("to=24-03-05", ["Write report", "Review PR", "Report review"]),
+        ("after=9:00;before=16:00", ["Review PR", "Report review"]),
+        ("task=re;min=10;to=2024-03-05", ["Write report", "Report review"]),
+    ],
+)
+def test_session_options(app_data_with_sessions, spec, tasks):
+    rows = list(compile_filter(spec).apply(app_data_with_sessions.get_data_rows()))
+    assert [row["message"] for row in rows if row["action"] == "Start"] == tasks
+    #  Action letters still apply to the rows of selected sessions.
+    assert any(row["action"] == "Stop" for row in rows) == ("X" not in spec)
+
+
+def test_letters_and_options_in_markdown(app_data_with_sessions):
+    md = rows_as_md("PX;task=report", app_data_with_sessions.get_data_rows())
+    assert md == [
+        "- **Write report**",
+        "    - Start 08:00",
+        "- **Report review**",
+        "    - Start 09:00",
+    ]
+
+
+def test_apply_streams_rows(app_data_with_sessions):
+    read = []
+
+    def rows():
+        for row in app_data_with_sessions.get_data_rows():
+            read.append(row)
+            yield row
+
+    selected = compile_filter("task=review").apply(rows())
+    #  Rows are read only up to the Start of the next session.
+    first = next(selected)
+    assert first["message"] == "Review PR"
+    assert len(read) == 6
+
+
+def test_cli_timesheet_with_options(app_data_with_sessions, tmp_path, monkeypatch):
+    monkeypatch.setenv("POMODORABLE_TEST_DATA_DIR", str(tmp_path))
+    out_path = tmp_path / "out"
+    out_path.mkdir()
+    args = [
+        "--csv-date",
+        "2024-03-04",
+        "--end-date",
+        "2024-03-06",
+        "--timesheet",
+        "--filters",
+        "p;min=10;before=14:00",
+        "--export-path",
+        str(out_path),
+    ]
+    runner = CliRunner()
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    lines = (out_path / "ts-20240304-20240306.csv").read_text().splitlines()
+    assert [line.split(",")[5] for line in lines[1:]] == ["Write report", "Report review"]
+
+    args[6] = "F;min=x"
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 1
+    assert "Invalid minimum minutes 'x'" in result.output
+
+
+def test_config_drops_invalid_options(tmp_path):
+    config_file = tmp_path / "pomodorable-config.toml"
+    config_file.write_text('filter_csv = "pr;task=Fix"\nfilter_md = "f;min=-1"\n')
+    config = AppConfig(config_file)
+    config.load()
+    assert config.filter_csv == "PR;task=Fix"
+    assert config.filter_md == "F"
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import pytest
+
+from pomodorable.file_watcher import FileWatcher
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_file_watcher_detects_change(tmp_path: Path, use_inotify):
+    watched = tmp_path / "watched.toml"
+    watched.write_text("a = 1\n")
+    other = tmp_path / "other.log"
+
+    watcher = FileWatcher(watched, use_inotify=use_inotify)
+    assert not watcher.changed()
+
+    other.write_text("Not the watched file.\n")
+    assert not watcher.changed()
+
+    watched.write_text("a = 12\n")
+    assert watcher.changed()
+    assert not watcher.changed()
+
+    #  Replaced by rename, as editors do.
+    tmp_file = tmp_path / "watched.tmp"
+    tmp_file.write_text("a = 123\n")
+    tmp_file.replace(watched)
+    assert watcher.wait(0.5)
+
+    watcher.close()
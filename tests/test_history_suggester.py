@@ -0,0 +1,88 @@
+import random
+import string
+import time
+from datetime import datetime, timedelta
+
+from pomodorable.app_data import AppData
+from pomodorable.frecency import HALF_LIFE_SECONDS, add_use, scan_history, use_score
+from pomodorable.history_suggester import HistorySuggester, PrefixTrie
+
+
+def test_add_use_combines_scores():
+    now = datetime.fromisoformat("2024-03-04T09:00:00")
+    once_now = use_score(now)
+    twice_a_half_life_ago = add_use(
+        use_score(now - timedelta(seconds=HALF_LIFE_SECONDS)),
+        use_score(now - timedelta(seconds=HALF_LIFE_SECONDS)),
+    )
+    assert abs(twice_a_half_life_ago - once_now) < 1e-9
+    assert add_use(once_now, use_score(now - timedelta(days=365))) > once_now
+
+
+def test_prefix_trie_best():
+    trie = PrefixTrie.from_scores({"Write report": 3.0, "Write code": 5.0, "Review": 1.0, "Wr": 0.5})
+    assert trie.best("w") == "Write code"
+    assert trie.best("write r") == "Write report"
+    assert trie.best("re") == "Review"
+    assert trie.best("wr") == "Write code"
+    assert trie.best("x") is None
+    assert trie.best("write codes") is None
+
+    #  A higher score changes the best entries along its path.
+    trie.add("Write report", 9.0)
+    assert trie.best("w") == "Write report"
+    assert trie.best("write c") == "Write code"
+    assert len(trie) == 4
+
+
+def test_prefix_trie_matches_a_linear_scan():
+    rng = random.Random(7)  # noqa: S311
+    scores = {"".join(rng.choices("abc ", k=rng.randint(1, 8))): rng.random() for _ in range(500)}
+    trie = PrefixTrie.from_scores(scores)
+    for _ in range(300):
+        prefix = "".join(rng.choices("abc ", k=rng.randint(1, 4)))
+        matches = [text for text in scores if text.startswith(prefix)]
+        expect = max(matches, key=lambda text: scores[text]) if matches else None
+        assert trie.best(prefix) == expect
+
+
+def test_prefix_trie_lookup_is_fast():
+    rng = random.Random(1)  # noqa: S311
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(2000)]
+    scores = {" ".join(rng.choices(words, k=4)): rng.random() for _ in range(30000)}
+    trie = PrefixTrie.from_scores(scores)
+    prefixes = [text[:n] for text in list(scores)[:1000] for n in (1, 5, 12)]
+    start = time.perf_counter()
+    for prefix in prefixes:
+        trie.best(prefix)
+    assert (time.perf_counter() - start) / len(prefixes) < 0.001
+
+
+async def test_history_suggester(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    t = datetime.fromisoformat("2024-03-04T09:00:00")
+    for n, task in enumerate(["Email", "Emacs config", "Email"]):
+        start_time = t + timedelta(hours=n)
+        app_data.write_start(start_time, task, 1500)
+        app_data.write_pause(start_time, start_time + timedelta(minutes=5), "Phone", 60, False)
+        app_data.write_finish(start_time + timedelta(minutes=25), start_time)
+    #  Stop reasons are not suggested.
+    start_time = t + timedelta(hours=4)
+    app_data.write_start(start_time, "Email", 1500)
+    app_data.write_stop(start_time, start_time + timedelta(minutes=5), "Meeting")
+    app_data.stop_logging()
+
+    tasks, reasons = scan_history(app_data.data_file)
+    assert sorted(tasks) == ["Emacs config", "Email"]
+    assert list(reasons) == ["Phone"]
+
+    suggester = HistorySuggester()
+    suggester.set_trie(PrefixTrie.from_scores(tasks))
+    assert await suggester.get_suggestion("em") == "Email"
+    assert await suggester.get_suggestion("") is None
+
+    #  Entries used since loading are ranked by their new scores.
+    suggester.add("Emacs config", t + timedelta(days=30))
+    assert await suggester.get_suggestion("em") == "Emacs config"
+    suggester.add("Embedded notes", t + timedelta(days=60))
+    assert await suggester.get_suggestion("emb") == "Embedded notes"
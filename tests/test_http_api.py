@@ -0,0 +1,182 @@
+import asyncio
+import json
+import urllib.error
+import urllib.request
+from datetime import datetime, timedelta
+
+import pytest
+
+from pomodorable.app_data import AppData
+from pomodorable.http_api import MAX_REQUEST_LINE, STREAM_BATCH, HttpApi
+
+
+async def start_api(app_data) -> tuple[asyncio.Task, str]:
+    api = HttpApi(app_data)
+    ready = asyncio.get_running_loop().create_future()
+    task = asyncio.create_task(api.serve(port=0, ready=ready))
+    port = await asyncio.wait_for(ready, timeout=5)
+    return task, f"http://127.0.0.1:{port}"
+
+
+async def get_json(url: str) -> object:
+    def fetch():
+        with urllib.request.urlopen(url, timeout=5) as response:  # noqa: S310
+            return json.loads(response.read())
+
+    return await asyncio.to_thread(fetch)
+
+
+async def test_sessions_and_summary(app_data_with_six_test_sessions):
+    app_data, _ = app_data_with_six_test_sessions
+    task, base = await start_api(app_data)
+    try:
+        sessions = await get_json(f"{base}/sessions")
+        assert len(sessions) == 6
+
+        day_one = await get_json(f"{base}/sessions?from=2024-02-01&to=2024-02-01")
+        assert [s["date"] for s in day_one] == ["2024-02-01"] * 3
+
+        summary = await get_json(f"{base}/summary?from=24-02-01&to=24-02-02")
+        assert summary["totals"]["sessions"] == 6
+        assert summary["totals"]["finished"] + summary["totals"]["stopped"] == 6
+        assert [d["date"] for d in summary["days"]] == ["2024-02-01", "2024-02-02"]
+
+        today = await get_json(f"{base}/today")
+        assert today["totals"]["sessions"] == 0
+
+        with pytest.raises(urllib.error.HTTPError) as e:
+            await get_json(f"{base}/sessions?from=notadate")
+        assert e.value.code == 400
+
+        with pytest.raises(urllib.error.HTTPError) as e:
+            await get_json(f"{base}/nothing")
+        assert e.value.code == 404
+    finally:
+        task.cancel()
+        app_data.stop_logging()
+
+
+async def test_sessions_written_after_start_are_served(app_data_with_four_test_sessions):
+    app_data, _ = app_data_with_four_test_sessions
+    task, base = await start_api(app_data)
+    try:
+        assert len(await get_json(f"{base}/sessions")) == 4
+
+        start_time = datetime.now().replace(microsecond=0)
+        app_data.write_start(start_time, "Today's task", 60)
+        app_data.write_finish(start_time + timedelta(seconds=60), start_time)
+
+        today = await get_json(f"{base}/today")
+        assert today["totals"]["finished"] == 1
+        assert today["sessions"][0]["task"] == "Today's task"
+        assert len(await get_json(f"{base}/sessions")) == 5
+    finally:
+        task.cancel()
+        app_data.stop_logging()
+
+
+async def test_date_range_is_read_without_whole_file(tmp_path, monkeypatch):
+    app_data = AppData(init_data_path=tmp_path)
+    t = datetime.fromisoformat("2024-05-01T08:00:00")
+    for day in range(60):
+        start_time = t + timedelta(days=day)
+        app_data.write_start(start_time, f"Day {day}", 60)
+        app_data.write_finish(start_time + timedelta(seconds=60), start_time)
+    #  The last session runs past midnight.
+    late = datetime.fromisoformat("2024-06-30T23:50:00")
+    app_data.write_start(late, "Late task", 1500)
+    app_data.write_finish(late + timedelta(minutes=25), late)
+
+    def no_full_read():
+        raise AssertionError("whole data file read")
+
+    monkeypatch.setattr(app_data, "get_data_rows", no_full_read)
+    task, base = await start_api(app_data)
+    try:
+        sessions = await get_json(f"{base}/sessions?from=2024-06-29&to=2024-06-30")
+        assert [s["task"] for s in sessions] == ["Day 59", "Late task"]
+        assert sessions[-1]["finished"]
+
+        summary = await get_json(f"{base}/summary?from=2024-06-30")
+        assert summary["totals"]["sessions"] == 1
+        assert summary["days"] == [{"date": "2024-06-30", **summary["totals"]}]
+    finally:
+        task.cancel()
+        app_data.stop_logging()
+
+
+async def test_overlong_request_line_is_bad_request(app_data_with_four_test_sessions):
+    app_data, _ = app_data_with_four_test_sessions
+    task, base = await start_api(app_data)
+    try:
+        port = int(base.rsplit(":", 1)[1])
+        for length in (MAX_REQUEST_LINE + 1, 100_000):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET /" + b"x" * length + b" HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            await writer.drain()
+            status_line = await reader.readline()
+            writer.close()
+            assert status_line.split()[1] == b"400"
+    finally:
+        task.cancel()
+        app_data.stop_logging()
+
+
+async def test_unended_session_is_not_finished(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    start_time = datetime.now().replace(microsecond=0)
+    app_data.write_start(start_time, "Finished task", 60)
+    app_data.write_finish(start_time + timedelta(seconds=60), start_time)
+    app_data.write_start(start_time + timedelta(minutes=5), "Unended task", 60)
+
+    task, base = await start_api(app_data)
+    try:
+        today = await get_json(f"{base}/today")
+        assert today["totals"]["sessions"] == 2
+        assert today["totals"]["finished"] == 1
+        assert today["totals"]["stopped"] == 0
+        assert [s["finished"] for s in today["sessions"]] == [True, False]
+    finally:
+        task.cancel()
+        app_data.stop_logging()
+
+
+async def test_rejects_host_other_than_localhost(app_data_with_four_test_sessions):
+    app_data, _ = app_data_with_four_test_sessions
+    task, base = await start_api(app_data)
+    try:
+
+        def fetch_status(host: str) -> int:
+            request = urllib.request.Request(f"{base}/today", headers={"Host": host})  # noqa: S310
+            try:
+                with urllib.request.urlopen(request, timeout=5) as response:  # noqa: S310
+                    return response.status
+            except urllib.error.HTTPError as e:
+                return e.code
+
+        assert await asyncio.to_thread(fetch_status, "evil.example.com") == 403
+        assert await asyncio.to_thread(fetch_status, "evil.example.com:8787") == 403
+        assert await asyncio.to_thread(fetch_status, "localhost:8787") == 200
+        assert await asyncio.to_thread(fetch_status, "127.0.0.1") == 200
+    finally:
+        task.cancel()
+        app_data.stop_logging()
+
+
+async def test_large_range_is_streamed(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    t = datetime.fromisoformat("2024-05-01T08:00:00")
+    count = STREAM_BATCH * 2 + 5
+    for n in range(count):
+        start_time = t + timedelta(minutes=30 * n)
+        app_data.write_start(start_time, f"Task {n}", 60)
+        app_data.write_finish(start_time + timedelta(seconds=60), start_time)
+
+    task, base = await start_api(app_data)
+    try:
+        sessions = await get_json(f"{base}/sessions")
+        assert len(sessions) == count
+        assert sessions[-1]["task"] == f"Task {count - 1}"
+    finally:
+        task.cancel()
+        app_data.stop_logging()
@@ -0,0 +1,115 @@
+import json
+from datetime import datetime, timedelta
+
+from click.testing import CliRunner
+
+from pomodorable.app_data import AppData
+from pomodorable.cli import cli
+from pomodorable.incremental_export import EXPORT_CURSORS_FILE, IncrementalExport
+from tests.conftest import write_session
+
+
+def sessions_in(csv_file):
+    return [line.split(",")[3] for line in csv_file.read_text().splitlines() if ",S," in line]
+
+
+def test_appends_only_new_sessions(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    data_file = tmp_path / "pomodorable-data.csv"
+    target = tmp_path / "export.csv"
+    export = IncrementalExport(data_file, tmp_path / EXPORT_CURSORS_FILE)
+    t = datetime.fromisoformat("2024-05-01T09:00:00")
+
+    write_session(app_data, t, "One")
+    write_session(app_data, t + timedelta(hours=1), "Two")
+    write_session(app_data, t + timedelta(hours=2), "Running", end=False)
+    assert export.export(target, "", do_timesheet=False) == 2
+    assert sessions_in(target) == ["One", "Two"]
+
+    #  The cursor is after the last ended session, so the running session is
+    #  read again when it ends.
+    saved = json.loads((tmp_path / EXPORT_CURSORS_FILE).read_text())["targets"][str(target.resolve())]
+    assert saved["last_row"] == "2024-05-01T10:25:00"
+    assert saved["cursor"]["offset"] < data_file.stat().st_size
+
+    assert export.export(target, "", do_timesheet=False) == 0
+    app_data.write_finish(t + timedelta(hours=2, minutes=25), t + timedelta(hours=2))
+    write_session(app_data, t + timedelta(hours=3), "Four")
+    assert export.export(target, "", do_timesheet=False) == 2
+    assert sessions_in(target) == ["One", "Two", "Running", "Four"]
+    assert target.read_text().count("date,act,time") == 1
+    app_data.stop_logging()
+
+
+def test_recovers_when_data_file_rewritten(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    data_file = tmp_path / "pomodorable-data.csv"
+    target = tmp_path / "export.csv"
+    export = IncrementalExport(data_file, tmp_path / EXPORT_CURSORS_FILE)
+    t = datetime.fromisoformat("2024-05-01T09:00:00")
+    write_session(app_data, t, "One")
+    write_session(app_data, t + timedelta(hours=1), "Two")
+    export.export(target, "", do_timesheet=False)
+
+    #  Rotated: older rows moved out, so the saved offset no longer matches.
+    lines = data_file.read_text().splitlines(keepends=True)
+    data_file.write_text(lines[0] + "".join(lines[3:]))
+    write_session(app_data, t + timedelta(hours=2), "Three")
+    assert export.export(target, "", do_timesheet=False) == 1
+    assert sessions_in(target) == ["One", "Two", "Three"]
+
+    #  A removed target gets all sessions again.
+    target.unlink()
+    assert export.export(target, "", do_timesheet=False) == 2
+    assert sessions_in(target) == ["Two", "Three"]
+    app_data.stop_logging()
+
+
+def test_session_started_in_the_second_another_ended(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    data_file = tmp_path / "pomodorable-data.csv"
+    target = tmp_path / "export.csv"
+    export = IncrementalExport(data_file, tmp_path / EXPORT_CURSORS_FILE)
+    t = datetime.fromisoformat("2024-05-01T09:00:00")
+    write_session(app_data, t, "One")
+    assert export.export(target, "", do_timesheet=False) == 1
+
+    #  Started in the same second One finished.
+    write_session(app_data, t + timedelta(minutes=25), "Two")
+    assert export.export(target, "", do_timesheet=False) == 1
+    assert sessions_in(target) == ["One", "Two"]
+
+    #  Also when reading from the start after the data file was rewritten.
+    write_session(app_data, t + timedelta(minutes=50), "Three")
+    lines = data_file.read_text().splitlines(keepends=True)
+    data_file.write_text(lines[0] + "".join(lines[1:]).replace("One", "First"))
+    assert export.export(target, "", do_timesheet=False) == 1
+    assert sessions_in(target) == ["One", "Two", "Three"]
+    app_data.stop_logging()
+
+
+def test_cli_append_to(tmp_path, monkeypatch):
+    monkeypatch.setenv("POMODORABLE_TEST_DATA_DIR", str(tmp_path))
+    app_data = AppData(init_data_path=tmp_path)
+    t = datetime.fromisoformat("2024-05-01T09:00:00")
+    write_session(app_data, t, "Fix bug")
+    write_session(app_data, t + timedelta(hours=1), "Write docs")
+    app_data.stop_logging()
+
+    target = tmp_path / "out" / "timesheet.csv"
+    target.parent.mkdir()
+    args = ["--append-to", str(target), "--timesheet", "--filters", "task=docs"]
+    runner = CliRunner()
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    assert "Appended 2 sessions" in result.output
+    lines = target.read_text().splitlines()
+    assert len(lines) == 2
+    assert lines[1].endswith("Write docs,")
+
+    result = runner.invoke(cli, args)
+    assert "Appended 0 sessions" in result.output
+    assert len(target.read_text().splitlines()) == 2
+
+    result = runner.invoke(cli, [*args, "--csv-date", "2024-05-01"])
+    assert result.exit_code == 1
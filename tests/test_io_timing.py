@@ -0,0 +1,101 @@
+from datetime import datetime
+
+import pytest
+from rich.console import Console
+
+from pomodorable.app_data import AppData
+from pomodorable.diagnostics_screen import BAR_WIDTH, timings_renderable
+from pomodorable.io_timing import (
+    LATENCY_BUCKETS_MS,
+    LATENCY_WINDOW,
+    OP_CONFIG,
+    OP_DAILY_CSV,
+    OP_DAILY_MD,
+    OP_DATA_CSV,
+    OP_MRU,
+    OP_RUNNING_CSV,
+    IoTimings,
+    LatencyHistogram,
+    bucket_labels,
+    io_timings,
+)
+
+
+def test_histogram_buckets_and_percentiles():
+    histogram = LatencyHistogram(OP_DATA_CSV)
+    for ms in [0.5, 1.0, 1.5, 3.0, 3000.0]:
+        histogram.add(ms)
+    counts = histogram.bucket_counts()
+    assert len(counts) == len(bucket_labels()) == len(LATENCY_BUCKETS_MS) + 1
+    assert counts[:3] == [2, 1, 1]
+    assert counts[-1] == 1
+    assert histogram.percentile(50) == 1.5
+    assert histogram.max_ms() == 3000.0
+    assert histogram.last_ms == 3000.0
+    assert histogram.label == "Data CSV append"
+
+
+def test_histogram_keeps_window():
+    histogram = LatencyHistogram("other")
+    for _ in range(LATENCY_WINDOW):
+        histogram.add(100.0)
+    histogram.add(1.0)
+    assert histogram.count == LATENCY_WINDOW + 1
+    assert sum(histogram.bucket_counts()) == LATENCY_WINDOW
+    assert histogram.label == "other"
+
+
+def test_timed_records_on_error():
+    timings = IoTimings()
+    with pytest.raises(OSError), timings.timed(OP_DAILY_CSV):
+        raise OSError
+    with timings.timed("other"):
+        pass
+    with timings.timed(OP_DATA_CSV):
+        pass
+    assert [h.name for h in timings.histograms()] == [OP_DATA_CSV, OP_DAILY_CSV, "other"]
+    timings.clear()
+    assert timings.histograms() == []
+
+
+def test_timings_renderable():
+    console = Console(width=120)
+    with console.capture() as capture:
+        console.print(timings_renderable([]))
+    assert "No writes" in capture.get()
+
+    timings = IoTimings()
+    for seconds in [0.0005, 0.0005, 0.003]:
+        timings.record(OP_MRU, seconds)
+    with console.capture() as capture:
+        console.print(timings_renderable(timings.histograms()))
+    text = capture.get()
+    assert "MRU save" in text
+    bar_line = next(line for line in text.splitlines() if "<=1ms" in line)
+    assert bar_line.count("█") == BAR_WIDTH
+    assert bar_line.split()[-1] == "2"
+    assert "<=5ms" in text
+    #  Buckets after the last used are not shown.
+    assert "<=10ms" not in text
+
+
+def test_app_data_writes_are_timed(tmp_path):
+    out_path = tmp_path / "out"
+    out_path.mkdir()
+    app_data = AppData(init_data_path=tmp_path)
+    with app_data.config.batch_update():
+        app_data.set_daily_csv_dir(str(out_path))
+        app_data.set_running_csv_dir(str(out_path))
+        app_data.set_daily_md_dir(str(out_path))
+    io_timings.clear()
+
+    t = datetime.now()
+    app_data.write_start(t, "Timed task", 1500)
+    app_data.write_finish(t, t)
+    app_data.set_running_csv_name("timed.csv")
+    counts = {h.name: h.count for h in io_timings.histograms()}
+    assert counts == {OP_DATA_CSV: 2, OP_RUNNING_CSV: 1, OP_DAILY_CSV: 1, OP_DAILY_MD: 1, OP_CONFIG: 1, OP_MRU: 1}
+
+    app_data.stop_logging()
+    assert "I/O timing Daily Markdown: count=1" in app_data.log_file.read_text()
+    io_timings.clear()
@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from pomodorable.app_logging import compress_log_file
+from pomodorable.log_pager import LogPager
+
+
+def write_test_log(log_file: Path, num_entries: int) -> None:
+    with log_file.open("w") as f:
+        for n in range(num_entries):
+            f.write(f"2024-01-02 08:30:{n % 60:02},123 INFO (ui say): Message {n}\n")
+            f.write(f"2024-01-02 08:30:{n % 60:02},124 DEBUG (ui update_widgets_enabled): Not shown {n}\n")
+
+
+def test_log_pager_reads_pages_backward(tmp_path: Path):
+    log_file = tmp_path / "test.log"
+    write_test_log(log_file, 250)
+
+    pager = LogPager(log_file, page_size=100)
+
+    entries, before = pager.read_page()
+    assert len(entries) == 100
+    assert entries[0] == "2024-01-02 08:30:30 - Message 150"
+    assert entries[-1] == "2024-01-02 08:30:09 - Message 249"
+    assert before > 0
+
+    entries, before = pager.read_page(before)
+    assert len(entries) == 100
+    assert entries[0].endswith("Message 50")
+    assert entries[-1].endswith("Message 149")
+
+    entries, before = pager.read_page(before)
+    assert len(entries) == 50
+    assert entries[0].endswith("Message 0")
+    assert entries[-1].endswith("Message 49")
+    assert before == 0
+
+
+def test_log_pager_missing_file(tmp_path: Path):
+    pager = LogPager(tmp_path / "missing.log")
+    assert pager.read_page() == ([], 0)
+
+
+def test_log_pager_reads_archive_pages(tmp_path: Path):
+    log_file = tmp_path / "test-20240102.log"
+    write_test_log(log_file, 150)
+    archive = compress_log_file(log_file)
+
+    pager = LogPager(archive, page_size=100)
+    entries, before = pager.read_page()
+    assert len(entries) == 100
+    assert entries[0].endswith("Message 50")
+    assert entries[-1].endswith("Message 149")
+    assert before == 50
+
+    entries, before = pager.read_page(before)
+    assert len(entries) == 50
+    assert entries[0].endswith("Message 0")
+    assert before == 0
@@ -0,0 +1,131 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from click.testing import CliRunner
+
+from pomodorable.app_data import AppData
+from pomodorable.cli import cli
+from pomodorable.io_timing import OP_DATA_CSV, io_timings
+from pomodorable.metrics_file import MetricsFile
+from pomodorable.session_timer import STATE_PAUSED, STATE_READY
+from tests.conftest import write_session
+
+
+def metric_values(text: str) -> dict[str, str]:
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def write_sessions(app_data: AppData, t: datetime) -> None:
+    write_session(app_data, t, "Task one", "Call", minutes=27, pause_seconds=90)
+    write_session(app_data, t + timedelta(hours=1), "Task two", minutes=3, stop_reason="Done")
+
+
+def test_metrics_text(tmp_path):
+    io_timings.clear()
+    app_data = AppData(init_data_path=tmp_path)
+    write_sessions(app_data, datetime.now().replace(hour=9, minute=0, second=0, microsecond=0))
+    state = [STATE_PAUSED]
+    metrics = MetricsFile(tmp_path / "pomodorable.prom", app_data.data_file, lambda: state[0])
+
+    values = metric_values(metrics.metrics_text())
+    assert values["pomodorable_sessions_started_total"] == "2"
+    assert values["pomodorable_sessions_finished_total"] == "1"
+    assert values["pomodorable_sessions_stopped_total"] == "1"
+    assert values["pomodorable_pause_seconds_total"] == "90"
+    assert values['pomodorable_state{state="paused"}'] == "1"
+    assert values['pomodorable_state{state="ready"}'] == "0"
+    assert values["pomodorable_data_file_rows"] == "5"
+    assert values["pomodorable_data_file_bytes"] == str(app_data.data_file.stat().st_size)
+    target = f'target="{OP_DATA_CSV}"'
+    assert values[f'pomodorable_write_seconds_bucket{{{target},le="+Inf"}}'] == "5"
+    assert values[f"pomodorable_write_seconds_count{{{target}}}"] == "5"
+    buckets = [int(v) for k, v in values.items() if k.startswith(f"pomodorable_write_seconds_bucket{{{target}")]
+    assert buckets == sorted(buckets)
+
+    #  Only the appended rows are read.
+    app_data.write_start(datetime.now(), "Task three", 1500)
+    state[0] = STATE_READY
+    values = metric_values(metrics.metrics_text())
+    assert values["pomodorable_sessions_started_total"] == "3"
+    assert values["pomodorable_data_file_rows"] == "6"
+    assert values['pomodorable_state{state="ready"}'] == "1"
+
+    #  A rewritten data file is counted again.
+    lines = app_data.data_file.read_text().splitlines(keepends=True)
+    app_data.data_file.write_text("".join(lines[:-1]).replace("Task", "Job"))
+    values = metric_values(metrics.metrics_text())
+    assert values["pomodorable_sessions_started_total"] == "2"
+    assert values["pomodorable_data_file_rows"] == "5"
+    app_data.stop_logging()
+    io_timings.clear()
+
+
+def test_metrics_file_is_written_when_changed(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    prom_file = tmp_path / "pomodorable.prom"
+    metrics = MetricsFile(prom_file, app_data.data_file, lambda: STATE_READY)
+    assert metrics.write()
+    assert not metrics.write()
+    assert "pomodorable_sessions_started_total 0" in prom_file.read_text()
+
+    app_data.write_start(datetime.now(), "Task", 1500)
+    assert metrics.write()
+    assert "pomodorable_sessions_started_total 1" in prom_file.read_text()
+    assert list(tmp_path.glob("*.tmp")) == []
+
+    #  The run loop writes at the start and when stopped.
+    prom_file.unlink()
+    metrics = MetricsFile(prom_file, app_data.data_file, lambda: STATE_READY)
+    stop = threading.Event()
+    stop.set()
+    metrics.run(stop, interval=60)
+    assert prom_file.exists()
+    app_data.stop_logging()
+
+
+def test_metrics_write_error_is_not_raised(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    metrics = MetricsFile(tmp_path / "missing" / "pomodorable.prom", app_data.data_file, lambda: STATE_READY)
+    assert not metrics.write()
+    assert not metrics.write()
+    app_data.stop_logging()
+    assert app_data.log_file.read_text().count("Cannot write metrics file") == 1
+
+
+def test_metrics_run_continues_after_error(tmp_path, monkeypatch):
+    app_data = AppData(init_data_path=tmp_path)
+    prom_file = tmp_path / "pomodorable.prom"
+    metrics = MetricsFile(prom_file, app_data.data_file, lambda: STATE_READY)
+    read_rows = metrics._read_rows
+    failures = [OSError("data file unavailable")]
+
+    def failing_read_rows():
+        if failures:
+            raise failures.pop()
+        read_rows()
+
+    monkeypatch.setattr(metrics, "_read_rows", failing_read_rows)
+    stop = threading.Event()
+    thread = threading.Thread(target=metrics.run, args=(stop, 0.01))
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not prom_file.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        thread.join()
+    assert prom_file.exists()
+    app_data.stop_logging()
+    assert app_data.log_file.read_text().count("Cannot write metrics file") == 1
+
+
+def test_cli_metrics_file_must_end_with_prom(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--metrics-file", str(tmp_path / "metrics.txt")])
+    assert result.exit_code == 1
+    assert "must end with '.prom'" in result.output
+    result = runner.invoke(cli, ["--metrics-file", str(tmp_path / "missing" / "metrics.prom")])
+    assert result.exit_code == 1
+    assert "Invalid path" in result.output
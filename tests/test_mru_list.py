@@ -1,6 +1,12 @@
+from datetime import datetime, timedelta
 from pathlib import Path
 
+import pytest
+
+from pomodorable.app_data import AppData
+from pomodorable.frecency import FrecencyRanking, scan_history
 from pomodorable.mru_list import MRU_LIST_MAX, MRUList
+from pomodorable.mru_screen import EntryFilter
 
 
 def test_mru_list(tmp_path: Path):
@@ -37,3 +43,79 @@ def test_mru_list(tmp_path: Path):
     #  If MRU_LIST_MAX is changed, these will need to be updated.
     assert tasks[0] == "task23"
     assert reasons[0] == "reason23"
+
+
+def test_mru_list_frecency(tmp_path: Path):
+    t = datetime.fromisoformat("2024-03-04T09:00:00")
+    mru_list1 = MRUList(tmp_path)
+    for n in range(80):
+        mru_list1.add_task("Daily standup", t + timedelta(hours=3 * n))
+    for n in range(MRU_LIST_MAX):
+        mru_list1.add_task(f"One-off {n}", t + timedelta(days=10, minutes=n))
+    mru_list1.add_reason("Phone", t)
+    mru_list1.save()
+
+    #  The frequent task is pushed out of the recency list, but not the
+    #  frecency ranking.
+    assert "Daily standup" not in mru_list1.get_tasks()
+    assert mru_list1.top_tasks()[0] == "Daily standup"
+    assert mru_list1.top_tasks(3)[1:] == ["One-off 19", "One-off 18"]
+
+    mru_list2 = MRUList(tmp_path)
+    mru_list2.load()
+    assert mru_list2.top_tasks() == mru_list1.top_tasks()
+    assert mru_list2.top_reasons() == ["Phone"]
+    assert mru_list2.task_scores() == pytest.approx(mru_list1.task_scores())
+
+    #  Old rows are dropped when the file is loaded.
+    assert len((tmp_path / "mru_frecency.csv").read_text().splitlines()) == len(mru_list2.task_scores()) + 1
+
+
+def test_frecency_ranking_top():
+    ranking = FrecencyRanking()
+    for n in range(200):
+        ranking.set_score(f"entry{n % 50}", float(n))
+    assert ranking.top(3) == ["entry49", "entry48", "entry47"]
+    assert ranking.top(3) == ["entry49", "entry48", "entry47"]
+    ranking.set_score("entry0", 1000.0)
+    ranking.set_score("entry0", 1000.0)
+    assert ranking.top(2) == ["entry0", "entry49"]
+    assert len(ranking.top(100)) == 50
+
+
+def test_app_data_seeds_frecency(tmp_path: Path):
+    app_data = AppData(init_data_path=tmp_path)
+    start_time = datetime.fromisoformat("2024-03-04T09:00:00")
+    for task in ["Email", "Report", "Email"]:
+        app_data.write_start(start_time, task, 1500)
+        app_data.write_finish(start_time + timedelta(minutes=25), start_time)
+        start_time += timedelta(hours=1)
+
+    #  Until the scores are seeded, they are not saved, since the seed
+    #  includes the sessions written meanwhile.
+    assert not app_data.mru_list.has_frecency()
+    assert not (tmp_path / "mru_frecency.csv").exists()
+    app_data.write_start(start_time, "Plan", 1500)
+    app_data.stop_logging()
+
+    app_data = AppData(init_data_path=tmp_path)
+    assert not app_data.mru_list.has_frecency()
+
+    app_data.mru_list.seed_frecency(*scan_history(app_data.data_file))
+    assert app_data.mru_list.has_frecency()
+    assert app_data.mru_list.top_tasks() == ["Email", "Plan", "Report"]
+    assert (tmp_path / "mru_frecency.csv").exists()
+    app_data.stop_logging()
+
+
+def test_entry_filter():
+    ranking = FrecencyRanking()
+    for score, text in enumerate(["Write report", "Review [draft]", "Email", "Weekly REVIEW"]):
+        ranking.set_score(text, float(score))
+    entry_filter = EntryFilter(ranking)
+    assert entry_filter.matches("") == ["Weekly REVIEW", "Email", "Review [draft]", "Write report"]
+    assert entry_filter.matches("re") == ["Weekly REVIEW", "Review [draft]", "Write report"]
+    assert entry_filter.matches("rev") == ["Weekly REVIEW", "Review [draft]"]
+    assert entry_filter.matches("revi", count=1) == ["Weekly REVIEW"]
+    assert entry_filter.matches("[d") == ["Review [draft]"]
+    assert entry_filter.matches("x") == []
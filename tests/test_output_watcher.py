@@ -0,0 +1,145 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from pomodorable import output_watcher
+from pomodorable.app_data import AppData
+from pomodorable.output_watcher import OutputWatcher
+from tests.conftest import write_session
+
+
+@pytest.fixture
+def watched(tmp_path):
+    """An AppData with outputs configured, and an AppData for another
+    instance, whose data rows are copied to the first (as by a sync tool).
+    """
+    out_path = tmp_path / "out"
+    out_path.mkdir()
+    (tmp_path / "mine").mkdir()
+    (tmp_path / "other").mkdir()
+    app_data = AppData(init_data_path=tmp_path / "mine")
+    app_data.set_daily_csv_dir(str(out_path))
+    app_data.set_running_csv_dir(str(out_path))
+    app_data.set_daily_md_dir(str(out_path))
+    other = AppData(init_data_path=tmp_path / "other")
+    yield app_data, other, out_path
+    app_data.stop_logging()
+    other.stop_logging()
+
+
+def sync_rows(app_data: AppData, other: AppData, done: list[int]) -> None:
+    """Append the rows of the other instance not copied yet."""
+    lines = other.data_file.read_text().splitlines(keepends=True)[1:]
+    with app_data.data_file.open("a") as f:
+        f.writelines(lines[done[0] :])
+    done[0] = len(lines)
+
+
+def test_writes_outputs_for_appended_rows(watched):
+    app_data, other, out_path = watched
+    t = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    day = t.strftime("%Y-%m-%d")
+    write_session(app_data, t, "Local task")
+
+    watcher = OutputWatcher(app_data)
+    assert watcher.check() == 0
+
+    done = [0]
+    write_session(other, t + timedelta(hours=1), "Synced task")
+    other.write_start(t + timedelta(hours=2), "Still running", 1500)
+    sync_rows(app_data, other, done)
+
+    assert watcher.check() == 1
+    daily_csv = (out_path / f"{day}.csv").read_text()
+    assert "Local task" in daily_csv
+    assert "Synced task" in daily_csv
+    assert "Still running" not in daily_csv
+    md = (out_path / f"{day}.md").read_text()
+    assert md.count("- **") == 3
+    assert "Still running" in md
+
+    other.write_finish(t + timedelta(hours=2, minutes=25), t + timedelta(hours=2))
+    sync_rows(app_data, other, done)
+    assert watcher.check() == 1
+    assert (out_path / f"{day}.csv").read_text().count("Still running") == 1
+    running_csv = (out_path / app_data.config.running_csv_name).read_text()
+    assert [line.split(",")[3] for line in running_csv.splitlines() if ",S," in line] == [
+        "Local task",
+        "Synced task",
+        "Still running",
+    ]
+
+    #  Editing a session already written does not write it again.
+    app_data.data_file.write_text(app_data.data_file.read_text().replace("Local task", "Local work item"))
+    assert watcher.check() == 0
+    daily_csv = (out_path / f"{day}.csv").read_text()
+    assert daily_csv.count("Local task") == 1
+    assert "Local work item" not in daily_csv
+    running_csv = (out_path / app_data.config.running_csv_name).read_text()
+    assert [line.split(",")[3] for line in running_csv.splitlines() if ",S," in line] == [
+        "Local task",
+        "Synced task",
+        "Still running",
+    ]
+    assert "Local work item" in (out_path / f"{day}.md").read_text()
+
+    #  A rewritten data file (rows merged in, not appended) gets outputs for
+    #  the sessions not seen before.
+    write_session(other, t + timedelta(hours=3), "Merged task")
+    merged = other.data_file.read_text().splitlines(keepends=True)[done[0] + 1 :]
+    done[0] += len(merged)
+    lines = app_data.data_file.read_text().splitlines(keepends=True)
+    app_data.data_file.write_text("".join(lines[:3] + merged + lines[3:]))
+    assert watcher.check() == 1
+    daily_csv = (out_path / f"{day}.csv").read_text()
+    assert daily_csv.count("Merged task") == 1
+    assert daily_csv.count("Local task") == 1
+    assert daily_csv.count("Synced task") == 1
+    assert "Merged task" in (out_path / f"{day}.md").read_text()
+
+    #  Then it is watched from its new end.
+    assert watcher.check() == 0
+    write_session(other, t + timedelta(hours=4), "After rewrite")
+    sync_rows(app_data, other, done)
+    assert watcher.check() == 1
+    assert "After rewrite" in (out_path / f"{day}.md").read_text()
+
+
+def test_run_debounces_changes(watched, monkeypatch):
+    app_data, other, out_path = watched
+    monkeypatch.setattr(output_watcher, "WATCH_INTERVAL", 0.05)
+    monkeypatch.setattr(output_watcher, "WATCH_DEBOUNCE", 0.2)
+    t = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    write_session(app_data, t, "Local task")
+
+    watcher = OutputWatcher(app_data)
+    checks = []
+    check = watcher.check
+
+    def counted_check():
+        checks.append(check())
+        return checks[-1]
+
+    watcher.check = counted_check
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(stop, False))
+    thread.start()
+    try:
+        time.sleep(0.1)
+        done = [0]
+        for hour in range(1, 4):
+            write_session(other, t + timedelta(hours=hour), f"Task {hour}")
+            sync_rows(app_data, other, done)
+            time.sleep(0.05)
+        deadline = time.monotonic() + 5
+        while not checks and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop.set()
+        thread.join()
+
+    #  The burst of changes was handled by one check.
+    assert checks == [3]
+    assert (out_path / f"{t.strftime('%Y-%m-%d')}.md").read_text().count("- **") == 4
@@ -0,0 +1,108 @@
+import pstats
+import time
+from datetime import datetime
+
+import pytest
+
+from pomodorable.app_data import AppData
+from pomodorable.profiling import COLLAPSED_SUFFIX, PSTATS_SUFFIX, Profiler, ProfileSetting, parse_profile_setting
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("", None),
+        ("n", None),
+        ("1", ProfileSetting()),
+        ("y", ProfileSetting()),
+        ("sample", ProfileSetting(sample_only=True)),
+        (
+            "write_session_to_output_files, cli_export_daily_csv",
+            ProfileSetting(hot_paths=("write_session_to_output_files", "cli_export_daily_csv")),
+        ),
+        ("Sample,write_finish", ProfileSetting(hot_paths=("write_finish",), sample_only=True)),
+    ],
+)
+def test_parse_profile_setting(value, expected):
+    assert parse_profile_setting(value) == expected
+
+
+def slow_part():
+    time.sleep(0.05)
+
+
+def hot_path(n):
+    slow_part()
+    return n + 1
+
+
+def test_profiler_wraps_hot_path(tmp_path):
+    profiler = Profiler(tmp_path)
+    wrapped = profiler.wrap(hot_path)
+    assert wrapped(1) == 2
+    #  Nested calls are profiled as part of the outer call.
+    assert profiler.wrap(lambda: wrapped(2))() == 3
+    slow_part()
+
+    files = profiler.save()
+    assert [f.suffix for f in files] == [PSTATS_SUFFIX, COLLAPSED_SUFFIX]
+    assert profiler.save() == []
+
+    stats = pstats.Stats(str(files[0]))
+    calls = {func[2]: counts[1] for func, counts in stats.stats.items()}
+    assert calls["hot_path"] == 2
+    #  Only called within the hot path.
+    assert calls["slow_part"] == 2
+
+    lines = files[1].read_text().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert "hot_path (test_profiling.py:" in stack
+    assert any(line.rsplit(" ", 1)[0].split(";")[-1].startswith("slow_part ") for line in lines)
+
+
+def test_profiler_sample_only(tmp_path):
+    profiler = Profiler(tmp_path, sample_only=True)
+    profiler.wrap(hot_path)(1)
+    files = profiler.save()
+    assert [f.suffix for f in files] == [COLLAPSED_SUFFIX]
+
+
+def test_nothing_profiled(tmp_path):
+    profiler = Profiler(tmp_path)
+    assert profiler.save() == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_app_data_profiles_hot_paths(tmp_path, monkeypatch):
+    monkeypatch.setenv("POMODORABLE_PROFILE", "write_start,not_a_method,_append_data_csv")
+    app_data = AppData(init_data_path=tmp_path)
+    t = datetime.now()
+    app_data.write_start(t, "Profiled task", 1500)
+    app_data.write_finish(t, t)
+    app_data.stop_logging()
+
+    pstats_files = list(tmp_path.glob(f"*{PSTATS_SUFFIX}"))
+    assert len(pstats_files) == 1
+    stats = pstats.Stats(str(pstats_files[0]))
+    names = {func[2] for func in stats.stats}
+    assert "write_start" in names
+    assert "write_finish" not in names
+    log_text = app_data.log_file.read_text()
+    assert "Cannot profile 'not_a_method'" in log_text
+    assert "Cannot profile '_append_data_csv'" in log_text
+    assert "Profile written to" in log_text
+
+
+def test_app_data_profiles_run(tmp_path, monkeypatch):
+    monkeypatch.setenv("POMODORABLE_PROFILE", "1")
+    app_data = AppData(init_data_path=tmp_path)
+    app_data.get_latest_session_rows()
+    app_data.stop_logging()
+
+    pstats_files = list(tmp_path.glob(f"*{PSTATS_SUFFIX}"))
+    assert len(pstats_files) == 1
+    names = {func[2] for func in pstats.Stats(str(pstats_files[0])).stats}
+    assert "get_latest_session_rows" in names
@@ -0,0 +1,169 @@
+import json
+from datetime import datetime, timedelta
+
+from click.testing import CliRunner
+
+from pomodorable.app_data import AppData
+from pomodorable.cli import cli
+from pomodorable.data_reader import DataCursor, iter_data_rows
+from pomodorable.rollups import PERIOD_DAY, PERIOD_TASK, PERIOD_WEEK, SessionRollups, summarize
+from tests.conftest import write_session
+
+
+def write_sessions(app_data: AppData, first_day: datetime, days: int) -> None:
+    """Write three sessions per day: two finished and one stopped."""
+    for day in range(days):
+        for n in range(3):
+            start_time = first_day + timedelta(days=day, hours=n)
+            stopped = n == 2
+            write_session(
+                app_data,
+                start_time,
+                f"Task {n % 2}",
+                "Call",
+                minutes=10 if stopped else 25,
+                pause_seconds=120,
+                stop_reason="Done" if stopped else None,
+            )
+
+
+def test_iter_data_rows_skips_partial_line(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    write_sessions(app_data, datetime.fromisoformat("2024-03-04T09:00:00"), 1)
+    with app_data.data_file.open("a") as f:
+        f.write('2,2024-03-04T12:00:00,"2024-03-04","12:00:00","Start"')
+
+    lines = list(iter_data_rows(app_data.data_file))
+    assert len(lines) == 9
+    assert lines[0].row["action"] == "Start"
+
+    cursor = DataCursor.after(lines[4])
+    assert cursor.is_valid(app_data.data_file)
+    assert [line.row for line in iter_data_rows(app_data.data_file, cursor.offset)] == [line.row for line in lines[5:]]
+    app_data.stop_logging()
+
+
+def test_rollups_updated_when_sessions_end(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    write_sessions(app_data, datetime.fromisoformat("2024-03-04T09:00:00"), 3)
+
+    #  write_finish and write_stop keep the rollup file up to date.
+    saved = json.loads((tmp_path / "pomodorable-rollups.json").read_text())
+    assert sorted(saved["days"]) == ["2024-03-04", "2024-03-05", "2024-03-06"]
+    assert saved["days"]["2024-03-04"]["Task 0"][:3] == [2, 1, 1]
+    assert saved["reasons"]["2024-03-04"] == {"Call": 3, "Done": 1}
+    assert saved["cursor"]["offset"] == app_data.data_file.stat().st_size
+
+    #  A session in progress is not counted until it ends.
+    start_time = datetime.fromisoformat("2024-03-07T09:00:00")
+    app_data.write_start(start_time, "Task 0", 1500)
+    rollups = SessionRollups(app_data.data_file, tmp_path / "pomodorable-rollups.json")
+    assert "2024-03-07" not in rollups.update()
+
+    app_data.write_finish(start_time + timedelta(minutes=25), start_time)
+    days = rollups.update()
+    assert days["2024-03-07"]["Task 0"][:3] == [1, 1, 0]
+
+    rebuilt = SessionRollups(app_data.data_file, tmp_path / "other-rollups.json").update()
+    assert days == rebuilt
+    app_data.stop_logging()
+
+
+def test_rollup_error_does_not_fail_session_write(tmp_path, monkeypatch):
+    app_data = AppData(init_data_path=tmp_path)
+
+    def failing_update():
+        raise OSError("rollup file unavailable")
+
+    monkeypatch.setattr(app_data.rollups, "update", failing_update)
+    start_time = datetime.fromisoformat("2024-03-04T09:00:00")
+    app_data.write_start(start_time, "Task", 1500)
+    app_data.write_finish(start_time + timedelta(minutes=25), start_time)
+    app_data.stop_logging()
+    assert "Cannot update rollups" in app_data.log_file.read_text()
+
+
+def test_day_summary(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    start_time = datetime.fromisoformat("2024-03-04T09:00:00")
+    app_data.write_start(start_time, "Task", 1500)
+    app_data.write_pause(start_time, start_time + timedelta(minutes=5), "Call", 120, True)
+    app_data.write_finish(start_time + timedelta(minutes=27), start_time)
+    write_sessions(app_data, datetime.fromisoformat("2024-03-04T10:00:00"), 1)
+
+    summary = app_data.rollups.day_summary("2024-03-04")
+    assert summary["sessions"] == 4
+    assert summary["finished"] == 3
+    assert summary["extensions"] == 1
+    assert summary["pause_seconds"] == 3 * 120
+    assert summary["focus_seconds"] == 3 * 1500 + 600 - 3 * 120
+    assert summary["top_reasons"] == ["Call", "Done"]
+    assert app_data.rollups.day_summary("2024-03-05")["sessions"] == 0
+    app_data.stop_logging()
+
+
+def test_check_rollups(tmp_path, monkeypatch):
+    app_data = AppData(init_data_path=tmp_path)
+    write_sessions(app_data, datetime.fromisoformat("2024-03-04T09:00:00"), 2)
+    assert app_data.rollups.check() == []
+    app_data.stop_logging()
+
+    rollup_file = tmp_path / "pomodorable-rollups.json"
+    saved = json.loads(rollup_file.read_text())
+    saved["days"]["2024-03-05"]["Task 1"][0] = 99
+    rollup_file.write_text(json.dumps(saved))
+
+    monkeypatch.setenv("POMODORABLE_TEST_DATA_DIR", str(tmp_path))
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--check-rollups"])
+    assert result.exit_code == 1
+    assert "2024-03-05" in result.output
+
+    result = runner.invoke(cli, ["--check-rollups"])
+    assert result.exit_code == 0
+
+
+def test_rollups_rebuild_when_data_file_is_replaced(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    write_sessions(app_data, datetime.fromisoformat("2024-03-04T09:00:00"), 3)
+
+    app_data.data_file.write_text(app_data.data_file.read_text().splitlines(keepends=True)[0])
+    write_sessions(app_data, datetime.fromisoformat("2024-04-01T09:00:00"), 1)
+
+    days = SessionRollups(app_data.data_file, tmp_path / "pomodorable-rollups.json").update()
+    assert sorted(days) == ["2024-04-01"]
+    app_data.stop_logging()
+
+
+def test_summarize_periods(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    #  2024-03-10 is a Sunday, the last day of ISO week 10.
+    write_sessions(app_data, datetime.fromisoformat("2024-03-09T09:00:00"), 4)
+    days = app_data.rollups.update()
+
+    by_week = summarize(days, PERIOD_WEEK)
+    assert [(key, totals[0]) for key, totals in by_week] == [("2024-W10", 6), ("2024-W11", 6)]
+
+    by_day = summarize(days, PERIOD_DAY, since="2024-03-10", until="2024-03-11")
+    assert [key for key, _ in by_day] == ["2024-03-10", "2024-03-11"]
+
+    by_task = summarize(days, PERIOD_TASK)
+    assert by_task[0][0] == "Task 0"
+    assert by_task[0][1][:3] == [8, 4, 4]
+    app_data.stop_logging()
+
+
+def test_cli_stats(tmp_path, monkeypatch):
+    app_data = AppData(init_data_path=tmp_path)
+    write_sessions(app_data, datetime.fromisoformat("2024-03-04T09:00:00"), 2)
+    app_data.stop_logging()
+
+    monkeypatch.setenv("POMODORABLE_TEST_DATA_DIR", str(tmp_path))
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--stats", "task", "--since", "2024-03-05"])
+    assert result.exit_code == 0
+    assert "Task 0" in result.output
+    assert "Total" in result.output
+
+    result = runner.invoke(cli, ["--since", "2024-03-05"])
+    assert result.exit_code == 1
@@ -0,0 +1,113 @@
+import json
+from datetime import datetime, timedelta
+
+from click.testing import CliRunner
+
+from pomodorable.app_data import AppData
+from pomodorable.cli import cli
+from pomodorable.search_index import SEARCH_INDEX_FILE, SearchIndex, tokenize
+from tests.conftest import write_session
+
+
+def test_tokenize():
+    assert tokenize("Review PR #123, then e-mail Bob") == ["review", "pr", "123", "then", "e", "mail", "bob"]
+
+
+def test_search_ranks_by_recency(tmp_path, monkeypatch):
+    app_data = AppData(init_data_path=tmp_path)
+    t = datetime.fromisoformat("2023-05-01T09:00:00")
+    write_session(app_data, t, "Write quarterly report", "Phone call")
+
+    #  Each session is added as it ends, from the rows in memory, and the
+    #  index is saved later.
+    def no_read():
+        raise AssertionError("data file read")
+
+    monkeypatch.setattr(app_data.search_index, "_read_new_rows", no_read)
+    write_session(app_data, t + timedelta(days=30), "Review report draft", minutes=10, stop_reason="")
+    write_session(app_data, t + timedelta(days=400), "Plan sprint", "Report question from Bob")
+    assert len(app_data.search_index.sessions) == 3
+    assert not (tmp_path / SEARCH_INDEX_FILE).exists()
+    monkeypatch.undo()
+    app_data.search_index.flush()
+    saved = json.loads((tmp_path / SEARCH_INDEX_FILE).read_text())
+    assert len(saved["sessions"]) == 3
+    assert saved["postings"]["report"] == [0, 1, 2]
+
+    results = app_data.search_index.search("report")
+    assert [s["date"] for s in results] == ["2024-06-04", "2023-05-31", "2023-05-01"]
+    assert results[2]["notes"] == "Resume: Phone call"
+
+    #  All words must match, and a word may be the start of a longer word.
+    assert [s["task"] for s in app_data.search_index.search("REP quart")] == ["Write quarterly report"]
+    assert [s["task"] for s in app_data.search_index.search("phone")] == ["Write quarterly report"]
+    assert app_data.search_index.search("report nothing") == []
+    assert app_data.search_index.search("  ") == []
+    assert len(app_data.search_index.search("report", limit=1)) == 1
+
+    #  The saved index matches one read from the data file.
+    rebuilt = SearchIndex(app_data.data_file, tmp_path / "other-search.json")
+    rebuilt.update()
+    assert rebuilt.sessions == app_data.search_index.sessions
+    assert rebuilt.postings == app_data.search_index.postings
+    assert rebuilt._cursor == app_data.search_index._cursor
+    app_data.stop_logging()
+
+
+def test_search_index_reads_only_new_rows(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    t = datetime.fromisoformat("2024-01-08T09:00:00")
+    write_session(app_data, t, "First task")
+
+    index = SearchIndex(app_data.data_file, tmp_path / SEARCH_INDEX_FILE)
+    index.update()
+    assert len(index.search("task")) == 1
+
+    #  A session in progress is not in the index until it ends.
+    app_data.write_start(t + timedelta(hours=1), "Second task", 1500)
+    index.update()
+    assert len(index.search("task")) == 1
+    app_data.write_finish(t + timedelta(hours=1, minutes=25), t + timedelta(hours=1))
+
+    #  Searching does not read the data file; update does.
+    assert len(index.search("task")) == 1
+    index.update()
+    assert [s["task"] for s in index.search("task")] == ["Second task", "First task"]
+
+    #  The index is rebuilt if the data file is replaced.
+    app_data.data_file.write_text(app_data.data_file.read_text().splitlines(keepends=True)[0])
+    write_session(app_data, t + timedelta(days=1), "Other work")
+    index.update()
+    assert index.search("task") == []
+    assert len(index.search("other")) == 1
+    app_data.stop_logging()
+
+
+def test_search_index_reads_sessions_written_by_others(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    other = AppData(init_data_path=tmp_path, init_logging=False)
+    t = datetime.fromisoformat("2024-01-08T09:00:00")
+    write_session(app_data, t, "First task")
+    write_session(other, t + timedelta(hours=1), "Other task")
+    write_session(app_data, t + timedelta(hours=2), "Third task")
+    assert [s["task"] for s in app_data.search_index.search("task")] == ["Third task", "Other task", "First task"]
+    app_data.stop_logging()
+
+
+def test_cli_search(tmp_path, monkeypatch):
+    app_data = AppData(init_data_path=tmp_path)
+    write_session(app_data, datetime.fromisoformat("2024-03-04T09:00:00"), "Budget spreadsheet")
+    app_data.stop_logging()
+
+    monkeypatch.setenv("POMODORABLE_TEST_DATA_DIR", str(tmp_path))
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--search", "budget"])
+    assert result.exit_code == 0
+    assert "Budget spreadsheet" in result.output
+
+    result = runner.invoke(cli, ["--search", "nothing"])
+    assert result.exit_code == 0
+    assert "No sessions found" in result.output
+
+    result = runner.invoke(cli, ["--search", " "])
+    assert result.exit_code == 1
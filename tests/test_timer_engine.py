@@ -0,0 +1,108 @@
+import asyncio
+
+from pomodorable.app_data import AppData
+from pomodorable.daemon import TimerDaemon
+from pomodorable.session_timer import STATE_PAUSED, STATE_READY, STATE_RUNNING
+from pomodorable.timer_engine import HEAP_COMPACT_MIN, TimerEngine
+
+
+def make_engine(tmp_path, finished=None):
+    def app_data_for(user):
+        user_dir = tmp_path / user
+        user_dir.mkdir(exist_ok=True)
+        return AppData(init_data_path=user_dir, init_logging=False, data_only=True)
+
+    def on_finish(user, _):
+        finished.append(user)
+
+    return TimerEngine(app_data_for, on_finish=None if finished is None else on_finish)
+
+
+async def test_engine_finishes_timers_in_deadline_order(tmp_path):
+    finished = []
+    engine = make_engine(tmp_path, finished)
+    engine.start()
+
+    assert engine.handle_command("bob", "start --seconds 2 Later")["ok"]
+    assert engine.handle_command("amy", "start --seconds 1 Sooner")["ok"]
+    assert engine.handle_command("cal", "start --seconds 1 Paused")["ok"]
+    assert engine.handle_command("cal", "pause")["state"] == STATE_PAUSED
+    assert engine.running_count == 2
+
+    await asyncio.sleep(1.3)
+    assert finished == ["amy"]
+    await asyncio.sleep(1.0)
+    assert finished == ["amy", "bob"]
+    assert engine.timers["bob"].state == STATE_READY
+    assert engine.timers["cal"].state == STATE_PAUSED
+    assert engine.running_count == 0
+    engine.stop()
+
+    data = (tmp_path / "amy" / "pomodorable-data.csv").read_text()
+    assert '"Finish"' in data
+
+
+def test_engine_drops_stale_heap_entries(tmp_path):
+    engine = make_engine(tmp_path)
+    engine.handle_command("amy", "start --seconds 600 Task")
+    for _ in range(HEAP_COMPACT_MIN * 2):
+        engine.handle_command("amy", "pause")
+        engine.handle_command("amy", "extend")
+    #  Each extend after a pause has a new deadline. Stale entries are
+    #  dropped, so the heap does not grow with the number of commands.
+    assert engine.running_count == 1
+    assert len(engine._heap) <= HEAP_COMPACT_MIN + 2
+
+
+def test_daemon_commands_for_named_users(tmp_path):
+    team_dir = tmp_path / "team"
+    team_dir.mkdir()
+    app_data = AppData(init_data_path=tmp_path)
+    daemon = TimerDaemon(app_data, team_dir=team_dir)
+
+    response = daemon.handle_line("@amy start Team task")
+    assert response["ok"]
+    assert response["user"] == "amy"
+    assert response["state"] == STATE_RUNNING
+    assert (team_dir / "amy" / "pomodorable-data.csv").exists()
+    assert daemon.timer.state == STATE_READY
+
+    assert not daemon.handle_line("@../x status")["ok"]
+    assert not daemon.handle_line("@amy shutdown")["ok"]
+
+    no_team = TimerDaemon(app_data)
+    assert "--team-dir" in no_team.handle_line("@amy status")["error"]
+    app_data.stop_logging()
+
+
+def test_team_users_only_write_session_data(tmp_path):
+    team_dir = tmp_path / "team"
+    team_dir.mkdir()
+    app_data = AppData(init_data_path=tmp_path)
+    daemon = TimerDaemon(app_data, team_dir=team_dir)
+
+    assert daemon.handle_line("@amy start Team task")["ok"]
+    assert daemon.handle_line("@amy stop")["ok"]
+    user_data = daemon.engine.timers["amy"].app_data
+    assert user_data.data_only
+    #  No settings, MRU lists, rollups or search index for the user.
+    assert sorted(p.name for p in (team_dir / "amy").iterdir()) == ["pomodorable-data.csv"]
+    app_data.stop_logging()
+
+
+def test_data_write_error_is_returned(tmp_path, monkeypatch):
+    team_dir = tmp_path / "team"
+    team_dir.mkdir()
+    app_data = AppData(init_data_path=tmp_path)
+    daemon = TimerDaemon(app_data, team_dir=team_dir)
+    assert daemon.handle_line("@amy status")["ok"]
+
+    def failing(*_):
+        raise PermissionError("Cannot write")
+
+    monkeypatch.setattr(daemon.engine.timers["amy"].app_data, "write_start", failing)
+    response = daemon.handle_line("@amy start Task")
+    assert not response["ok"]
+    assert "Cannot write" in response["error"]
+    assert daemon.engine.timers["amy"].state == STATE_READY
+    app_data.stop_logging()
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from pomodorable import data_reader
+from pomodorable.app_data import AppData
+from pomodorable.data_reader import iter_data_rows, tail_offset
+from pomodorable.today_totals import TodayTotals
+
+
+def write_day(app_data: AppData, day: datetime, sessions: int) -> None:
+    for n in range(sessions):
+        start_time = day + timedelta(hours=n)
+        app_data.write_start(start_time, f"Task {n}", 1500)
+        app_data.write_pause(start_time, start_time + timedelta(minutes=5), "Call", 60, False)
+        app_data.write_finish(start_time + timedelta(minutes=25), start_time)
+
+
+def test_tail_offset_reads_back_to_an_earlier_day(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_reader, "TAIL_CHUNK", 100)
+    monkeypatch.setattr(data_reader, "OUT_OF_ORDER_ROWS", 1)
+    app_data = AppData(init_data_path=tmp_path)
+    write_day(app_data, datetime.fromisoformat("2024-03-04T09:00:00"), 5)
+    write_day(app_data, datetime.fromisoformat("2024-03-05T09:00:00"), 3)
+
+    offset = tail_offset(app_data.data_file, "2024-03-05")
+    rows = [line.row for line in iter_data_rows(app_data.data_file, offset)]
+    assert rows[0]["date"] == "2024-03-04"
+    assert [row["date"] for row in rows[1:]] == ["2024-03-05"] * 9
+
+    #  Reading back continues past a few earlier rows out of place.
+    monkeypatch.setattr(data_reader, "OUT_OF_ORDER_ROWS", 4)
+    offset = tail_offset(app_data.data_file, "2024-03-05")
+    rows = [line.row for line in iter_data_rows(app_data.data_file, offset)]
+    assert [row["date"] for row in rows[:5]] == ["2024-03-04"] * 4 + ["2024-03-05"]
+
+    assert tail_offset(app_data.data_file, "2024-03-04") == 0
+    assert tail_offset(tmp_path / "missing.csv", "2024-03-04") == 0
+    app_data.stop_logging()
+
+
+def test_today_totals_seed_add_and_roll_over(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    day = datetime.fromisoformat("2024-03-05T09:00:00")
+    write_day(app_data, day - timedelta(days=1), 2)
+    write_day(app_data, day, 2)
+
+    today = TodayTotals(app_data.data_file)
+    today.seed(day + timedelta(hours=3))
+    assert (today.sessions, today.finished, today.focus_seconds) == (2, 2, 2 * (1500 - 60))
+    assert today.as_text() == "Today: 2 finished, 0:48 focus"
+
+    #  A stopped session counts for focus time, but not as finished.
+    start_time = day + timedelta(hours=4)
+    app_data.write_start(start_time, "Task", 1500)
+    app_data.write_stop(start_time, start_time + timedelta(minutes=10), "Done")
+    today.add(app_data.latest_session())
+    assert (today.sessions, today.finished, today.focus_seconds) == (3, 2, 2 * (1500 - 60) + 600)
+
+    assert not today.roll_over(day + timedelta(hours=14))
+    assert today.roll_over(day + timedelta(days=1))
+    assert (today.day, today.sessions, today.focus_seconds) == ("2024-03-06", 0, 0)
+
+    #  A session started before midnight counts for the day it started.
+    today.add(app_data.latest_session())
+    assert today.sessions == 0
+    app_data.stop_logging()
+
+
+def test_rows_for_date_include_rows_out_of_order(tmp_path):
+    app_data = AppData(init_data_path=tmp_path)
+    write_day(app_data, datetime.fromisoformat("2024-03-04T09:00:00"), 1)
+    write_day(app_data, datetime.fromisoformat("2024-03-05T09:00:00"), 2)
+    #  A session from the day before, synced late.
+    write_day(app_data, datetime.fromisoformat("2024-03-04T15:00:00"), 1)
+
+    rows = app_data.get_session_rows_for_date(datetime.fromisoformat("2024-03-04"))
+    assert [row["time"] for row in rows if row["action"] == "Start"] == ["09:00:00", "15:00:00"]
+    app_data.stop_logging()